@@ -2,8 +2,10 @@ package com.webautomation;
 
 import org.springframework.boot.SpringApplication;
 import org.springframework.boot.autoconfigure.SpringBootApplication;
+import org.springframework.scheduling.annotation.EnableScheduling;
 
 @SpringBootApplication
+@EnableScheduling
 public class JavaMicroserviceApplication {
     public static void main(String[] args) {
         SpringApplication.run(JavaMicroserviceApplication.class, args);
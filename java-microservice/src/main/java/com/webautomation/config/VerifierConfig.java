@@ -0,0 +1,31 @@
+package com.webautomation.config;
+
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.ThreadFactory;
+import java.util.concurrent.atomic.AtomicInteger;
+
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.context.annotation.Bean;
+import org.springframework.context.annotation.Configuration;
+
+@Configuration
+public class VerifierConfig {
+
+    /**
+     * Workers for batch verification, so request threads are released while a
+     * batch is verified. The service targets Java 17; on Java 21 this can be
+     * swapped for {@code Executors.newVirtualThreadPerTaskExecutor()}.
+     */
+    @Bean(destroyMethod = "shutdown")
+    public ExecutorService verifierExecutor(@Value("${verifier.batch.threads:0}") int threads) {
+        int size = threads > 0 ? threads : Runtime.getRuntime().availableProcessors();
+        AtomicInteger counter = new AtomicInteger();
+        ThreadFactory factory = runnable -> {
+            Thread thread = new Thread(runnable, "verifier-" + counter.incrementAndGet());
+            thread.setDaemon(true);
+            return thread;
+        };
+        return Executors.newFixedThreadPool(size, factory);
+    }
+}
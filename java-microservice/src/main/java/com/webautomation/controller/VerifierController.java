@@ -1,8 +1,19 @@
 package com.webautomation.controller;
 
+import com.webautomation.rules.RuleEngine;
+import com.webautomation.service.InstructionVerifier;
+import com.webautomation.service.Verdict;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.http.HttpStatus;
 import org.springframework.web.bind.annotation.*;
+import org.springframework.web.server.ResponseStatusException;
+import java.util.ArrayList;
+import java.util.List;
 import java.util.Map;
 import java.util.HashMap;
+import java.util.LinkedHashMap;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.ExecutorService;
 import java.time.LocalDateTime;
 import java.time.format.DateTimeFormatter;
 
@@ -11,22 +22,107 @@ import java.time.format.DateTimeFormatter;
 @CrossOrigin(origins = "*")
 public class VerifierController {
 
+    private final InstructionVerifier verifier;
+    private final RuleEngine ruleEngine;
+    private final ExecutorService verifierExecutor;
+    private final int batchMaxSize;
+    private final int batchChunkSize;
+
+    public VerifierController(
+            InstructionVerifier verifier,
+            RuleEngine ruleEngine,
+            ExecutorService verifierExecutor,
+            @Value("${verifier.batch.max-size:1000}") int batchMaxSize,
+            @Value("${verifier.batch.chunk-size:64}") int batchChunkSize) {
+        this.verifier = verifier;
+        this.ruleEngine = ruleEngine;
+        this.verifierExecutor = verifierExecutor;
+        this.batchMaxSize = batchMaxSize;
+        this.batchChunkSize = Math.max(1, batchChunkSize);
+    }
+
     @PostMapping("/verifier")
     public Map<String, Object> verify(@RequestBody Map<String, String> payload) {
         Map<String, Object> response = new HashMap<>();
-        
+
         String instruction = payload.getOrDefault("instruction", "unknown");
-        
-        response.put("verified", true);
+        Verdict verdict = verifier.verify(instruction);
+
+        response.put("verified", verdict.verified());
+        if (verdict.reason() != null) {
+            response.put("reason", verdict.reason());
+        }
         response.put("note", "Java microservice is operational");
         response.put("instruction_received", instruction);
         response.put("timestamp", LocalDateTime.now().format(DateTimeFormatter.ISO_LOCAL_DATE_TIME));
         response.put("service", "Web Automation Java Microservice");
         response.put("version", "1.0.0");
-        
+
         return response;
     }
 
+    /**
+     * Verifies many instructions in one call. The batch is split into chunks
+     * that run on the verifier executor, and results come back in request order.
+     */
+    @PostMapping("/verifier:batch")
+    public CompletableFuture<Map<String, Object>> verifyBatch(@RequestBody Map<String, List<String>> payload) {
+        List<String> instructions = payload.get("instructions");
+        if (instructions == null) {
+            throw new ResponseStatusException(HttpStatus.BAD_REQUEST, "instructions is required");
+        }
+        if (instructions.size() > batchMaxSize) {
+            throw new ResponseStatusException(HttpStatus.PAYLOAD_TOO_LARGE, "Batch exceeds " + batchMaxSize + " instructions");
+        }
+        long started = System.nanoTime();
+
+        List<CompletableFuture<List<Verdict>>> chunks = new ArrayList<>();
+        for (int from = 0; from < instructions.size(); from += batchChunkSize) {
+            List<String> chunk = instructions.subList(from, Math.min(instructions.size(), from + batchChunkSize));
+            chunks.add(CompletableFuture.supplyAsync(
+                    () -> chunk.stream().map(verifier::verify).toList(), verifierExecutor));
+        }
+
+        return CompletableFuture.allOf(chunks.toArray(new CompletableFuture[0])).thenApply(done -> {
+            List<Map<String, Object>> results = new ArrayList<>(instructions.size());
+            int verified = 0;
+            for (CompletableFuture<List<Verdict>> chunk : chunks) {
+                for (Verdict verdict : chunk.join()) {
+                    Map<String, Object> result = new LinkedHashMap<>();
+                    result.put("index", results.size());
+                    result.put("verified", verdict.verified());
+                    result.put("reason", verdict.reason());
+                    results.add(result);
+                    if (verdict.verified()) {
+                        verified++;
+                    }
+                }
+            }
+
+            Map<String, Object> response = new LinkedHashMap<>();
+            response.put("results", results);
+            response.put("count", results.size());
+            response.put("verified", verified);
+            response.put("rejected", results.size() - verified);
+            response.put("elapsed_ms", (System.nanoTime() - started) / 1_000_000.0);
+            response.put("service", "Web Automation Java Microservice");
+            response.put("version", "1.0.0");
+            return response;
+        });
+    }
+
+    @GetMapping("/verifier/rules")
+    public Map<String, Object> rules() {
+        return ruleEngine.describe();
+    }
+
+    /** Recompiles the policy rules now instead of waiting for the file watcher. */
+    @PostMapping("/verifier/rules:reload")
+    public Map<String, Object> reloadRules() {
+        ruleEngine.reload();
+        return ruleEngine.describe();
+    }
+
     @GetMapping("/health")
     public Map<String, Object> health() {
         Map<String, Object> response = new HashMap<>();
@@ -47,4 +143,3 @@ public class VerifierController {
         return response;
     }
 }
-
@@ -0,0 +1,154 @@
+package com.webautomation.rules;
+
+import java.util.ArrayDeque;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.List;
+import java.util.Map;
+import java.util.TreeMap;
+
+/**
+ * Aho-Corasick automaton over a fixed set of phrases.
+ * Built once; scanning a text is linear in its length plus the number of
+ * candidate matches, whatever the number of phrases. Matches must start and
+ * end on word boundaries, so "pin" does not match inside "spinning".
+ * Immutable and safe to share between threads.
+ */
+final class AhoCorasick {
+
+    /** Position of a phrase found in the scanned text. */
+    record Match(int pattern, int start, int end) {
+    }
+
+    // Per state: sorted transition characters and their target states
+    private final char[][] keys;
+    private final int[][] targets;
+    private final int[] fail;
+    // Phrase ending at this state, or -1
+    private final int[] output;
+    // Nearest state on the failure chain that has an output, or -1
+    private final int[] dictionaryLink;
+    private final int[] lengths;
+
+    private AhoCorasick(char[][] keys, int[][] targets, int[] fail, int[] output, int[] dictionaryLink, int[] lengths) {
+        this.keys = keys;
+        this.targets = targets;
+        this.fail = fail;
+        this.output = output;
+        this.dictionaryLink = dictionaryLink;
+        this.lengths = lengths;
+    }
+
+    /** Compiles already-normalized phrases; a phrase's index is its pattern id. Empty phrases never match. */
+    static AhoCorasick compile(List<String> phrases) {
+        List<TreeMap<Character, Integer>> children = new ArrayList<>();
+        List<Integer> outputs = new ArrayList<>();
+        children.add(new TreeMap<>());
+        outputs.add(-1);
+        int[] lengths = new int[phrases.size()];
+
+        for (int pattern = 0; pattern < phrases.size(); pattern++) {
+            String phrase = phrases.get(pattern);
+            lengths[pattern] = phrase.length();
+            if (phrase.isEmpty()) {
+                continue;
+            }
+            int state = 0;
+            for (int i = 0; i < phrase.length(); i++) {
+                Integer next = children.get(state).get(phrase.charAt(i));
+                if (next == null) {
+                    next = children.size();
+                    children.get(state).put(phrase.charAt(i), next);
+                    children.add(new TreeMap<>());
+                    outputs.add(-1);
+                }
+                state = next;
+            }
+            if (outputs.get(state) < 0) {
+                outputs.set(state, pattern);
+            }
+        }
+
+        int size = children.size();
+        char[][] keys = new char[size][];
+        int[][] targets = new int[size][];
+        int[] output = new int[size];
+        for (int state = 0; state < size; state++) {
+            TreeMap<Character, Integer> edges = children.get(state);
+            keys[state] = new char[edges.size()];
+            targets[state] = new int[edges.size()];
+            int i = 0;
+            for (Map.Entry<Character, Integer> edge : edges.entrySet()) {
+                keys[state][i] = edge.getKey();
+                targets[state][i] = edge.getValue();
+                i++;
+            }
+            output[state] = outputs.get(state);
+        }
+
+        // Breadth-first, so a state's failure target is always finished before the state itself
+        int[] fail = new int[size];
+        int[] dictionaryLink = new int[size];
+        Arrays.fill(dictionaryLink, -1);
+        ArrayDeque<Integer> queue = new ArrayDeque<>();
+        for (int child : targets[0]) {
+            queue.add(child);
+        }
+        AhoCorasick automaton = new AhoCorasick(keys, targets, fail, output, dictionaryLink, lengths);
+        while (!queue.isEmpty()) {
+            int state = queue.poll();
+            for (int i = 0; i < keys[state].length; i++) {
+                char c = keys[state][i];
+                int child = targets[state][i];
+                int f = fail[state];
+                while (f != 0 && automaton.child(f, c) < 0) {
+                    f = fail[f];
+                }
+                int target = automaton.child(f, c);
+                fail[child] = target >= 0 && target != child ? target : 0;
+                dictionaryLink[child] = output[fail[child]] >= 0 ? fail[child] : dictionaryLink[fail[child]];
+                queue.add(child);
+            }
+        }
+        return automaton;
+    }
+
+    private int child(int state, char c) {
+        int i = Arrays.binarySearch(keys[state], c);
+        return i >= 0 ? targets[state][i] : -1;
+    }
+
+    /** First match (by end position) in {@code text[0..length)}, or null. */
+    Match firstMatch(char[] text, int length) {
+        int state = 0;
+        for (int i = 0; i < length; i++) {
+            char c = text[i];
+            int next = child(state, c);
+            while (next < 0 && state != 0) {
+                state = fail[state];
+                next = child(state, c);
+            }
+            state = next < 0 ? 0 : next;
+            for (int s = output[state] >= 0 ? state : dictionaryLink[state]; s >= 0; s = dictionaryLink[s]) {
+                int pattern = output[s];
+                int start = i - lengths[pattern] + 1;
+                if (onWordBoundaries(text, length, start, i)) {
+                    return new Match(pattern, start, i);
+                }
+            }
+        }
+        return null;
+    }
+
+    private static boolean onWordBoundaries(char[] text, int length, int start, int end) {
+        boolean startOk = start == 0 || !Character.isLetterOrDigit(text[start])
+                || !Character.isLetterOrDigit(text[start - 1]);
+        boolean endOk = end == length - 1 || !Character.isLetterOrDigit(text[end])
+                || !Character.isLetterOrDigit(text[end + 1]);
+        return startOk && endOk;
+    }
+
+    int states() {
+        return keys.length;
+    }
+}
@@ -0,0 +1,136 @@
+package com.webautomation.rules;
+
+import com.webautomation.service.Verdict;
+import java.time.Instant;
+import java.util.ArrayList;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+
+/**
+ * A rule set compiled into an Aho-Corasick automaton (forbidden actions and
+ * PII keywords) plus a reversed domain trie (blocked domains). Evaluating an
+ * instruction normalizes it once and scans it once for each structure, so
+ * the cost is linear in the instruction length whatever the rule count.
+ * Immutable: a reload builds a new instance and swaps it in.
+ */
+public final class CompiledRules {
+
+    private final AhoCorasick phrases;
+    private final List<String> phraseReasons;
+    private final DomainTrie domains;
+    private final String version;
+    private final Instant loadedAt;
+
+    private CompiledRules(AhoCorasick phrases, List<String> phraseReasons, DomainTrie domains, String version) {
+        this.phrases = phrases;
+        this.phraseReasons = phraseReasons;
+        this.domains = domains;
+        this.version = version;
+        this.loadedAt = Instant.now();
+    }
+
+    public static CompiledRules compile(RuleSet rules, String version) {
+        List<String> patterns = new ArrayList<>();
+        List<String> reasons = new ArrayList<>();
+        for (String action : rules.forbiddenActions()) {
+            patterns.add(normalize(action));
+            reasons.add("forbidden action: " + action.strip());
+        }
+        for (String keyword : rules.piiKeywords()) {
+            patterns.add(normalize(keyword));
+            reasons.add("PII keyword: " + keyword.strip());
+        }
+        DomainTrie domains = new DomainTrie();
+        for (String domain : rules.blockedDomains()) {
+            domains.add(normalize(domain));
+        }
+        return new CompiledRules(AhoCorasick.compile(patterns), List.copyOf(reasons), domains, version);
+    }
+
+    public static CompiledRules empty() {
+        return compile(new RuleSet(List.of(), List.of(), List.of()), "empty");
+    }
+
+    /** Lower-cased with runs of whitespace collapsed to one space and the ends trimmed. */
+    static String normalize(String text) {
+        char[] buffer = new char[text.length()];
+        return new String(buffer, 0, normalizeInto(text, buffer));
+    }
+
+    private static int normalizeInto(String text, char[] buffer) {
+        int length = 0;
+        boolean pendingSpace = false;
+        for (int i = 0; i < text.length(); i++) {
+            char c = text.charAt(i);
+            if (Character.isWhitespace(c)) {
+                pendingSpace = length > 0;
+                continue;
+            }
+            if (pendingSpace) {
+                buffer[length++] = ' ';
+                pendingSpace = false;
+            }
+            buffer[length++] = Character.toLowerCase(c);
+        }
+        return length;
+    }
+
+    private static boolean isHostChar(char c) {
+        return (c >= 'a' && c <= 'z') || (c >= '0' && c <= '9') || c == '.' || c == '-';
+    }
+
+    public Verdict evaluate(String instruction) {
+        char[] text = new char[instruction.length()];
+        int length = normalizeInto(instruction, text);
+
+        AhoCorasick.Match match = phrases.firstMatch(text, length);
+        if (match != null) {
+            return Verdict.rejected(phraseReasons.get(match.pattern()));
+        }
+
+        // Host-like tokens: runs of [a-z0-9.-] containing a dot, as in URLs, emails and bare domains
+        int start = -1;
+        boolean dotted = false;
+        for (int i = 0; i <= length; i++) {
+            if (i < length && isHostChar(text[i])) {
+                if (start < 0) {
+                    start = i;
+                    dotted = false;
+                }
+                dotted |= text[i] == '.';
+                continue;
+            }
+            if (start >= 0 && dotted) {
+                int from = start;
+                int to = i;
+                while (from < to && (text[from] == '.' || text[from] == '-')) {
+                    from++;
+                }
+                while (to > from && (text[to - 1] == '.' || text[to - 1] == '-')) {
+                    to--;
+                }
+                String blocked = domains.match(text, from, to);
+                if (blocked != null) {
+                    return Verdict.rejected("blocked domain: " + blocked);
+                }
+            }
+            start = -1;
+        }
+        return Verdict.ok();
+    }
+
+    public String version() {
+        return version;
+    }
+
+    public Map<String, Object> describe() {
+        Map<String, Object> description = new LinkedHashMap<>();
+        description.put("version", version);
+        description.put("loaded_at", loadedAt.toString());
+        description.put("phrases", phraseReasons.size());
+        description.put("automaton_states", phrases.states());
+        description.put("blocked_domains", domains.size());
+        return description;
+    }
+}
@@ -0,0 +1,58 @@
+package com.webautomation.rules;
+
+import java.util.HashMap;
+import java.util.Map;
+
+/**
+ * Blocked domains stored as a trie of their characters read back to front,
+ * so "example.com" also blocks every subdomain such as "mail.example.com"
+ * but not "badexample.com". A lookup walks the host once from its end.
+ */
+final class DomainTrie {
+
+    private static final class Node {
+        final Map<Character, Node> children = new HashMap<>();
+        String blocked;
+    }
+
+    private final Node root = new Node();
+    private int size;
+
+    /** Adds a normalized domain; a leading "*." is accepted and means the same thing. */
+    void add(String domain) {
+        String host = domain.startsWith("*.") ? domain.substring(2) : domain;
+        while (host.startsWith(".")) {
+            host = host.substring(1);
+        }
+        if (host.isEmpty()) {
+            return;
+        }
+        Node node = root;
+        for (int i = host.length() - 1; i >= 0; i--) {
+            node = node.children.computeIfAbsent(host.charAt(i), c -> new Node());
+        }
+        if (node.blocked == null) {
+            node.blocked = host;
+            size++;
+        }
+    }
+
+    /** Blocked domain that {@code text[start..end)} is or is a subdomain of, or null. */
+    String match(char[] text, int start, int end) {
+        Node node = root;
+        for (int i = end - 1; i >= start; i--) {
+            node = node.children.get(text[i]);
+            if (node == null) {
+                return null;
+            }
+            if (node.blocked != null && (i == start || text[i - 1] == '.')) {
+                return node.blocked;
+            }
+        }
+        return null;
+    }
+
+    int size() {
+        return size;
+    }
+}
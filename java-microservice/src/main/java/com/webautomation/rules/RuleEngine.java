@@ -0,0 +1,113 @@
+package com.webautomation.rules;
+
+import com.fasterxml.jackson.databind.ObjectMapper;
+import com.webautomation.service.Verdict;
+import java.io.IOException;
+import java.io.InputStream;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.security.MessageDigest;
+import java.security.NoSuchAlgorithmException;
+import java.util.HexFormat;
+import java.util.Map;
+import java.util.concurrent.atomic.AtomicReference;
+import org.slf4j.Logger;
+import org.slf4j.LoggerFactory;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.core.io.ClassPathResource;
+import org.springframework.scheduling.annotation.Scheduled;
+import org.springframework.stereotype.Service;
+
+/**
+ * Holds the compiled policy rules and swaps in new ones without pausing traffic.
+ * <p>
+ * Rules come from {@code verifier.rules.path} when set, otherwise from the
+ * bundled {@code verifier-rules.json}. A reload compiles the new rule set off
+ * to the side and publishes it with one atomic reference swap, so every
+ * evaluation sees either the old or the new rules in full. A rules file that
+ * fails to load or compile leaves the current rules in place.
+ */
+@Service
+public class RuleEngine {
+
+    private static final Logger log = LoggerFactory.getLogger(RuleEngine.class);
+    private static final String BUNDLED_RULES = "verifier-rules.json";
+
+    private final ObjectMapper mapper;
+    private final String rulesPath;
+    private final AtomicReference<CompiledRules> current = new AtomicReference<>();
+    private volatile long lastModified = -1;
+
+    public RuleEngine(ObjectMapper mapper, @Value("${verifier.rules.path:}") String rulesPath) throws IOException {
+        this.mapper = mapper;
+        this.rulesPath = rulesPath;
+        // A broken rules file at startup is a deployment error, so let it fail the boot
+        current.set(load());
+        log.info("Loaded verifier rules {}", current.get().describe());
+    }
+
+    public Verdict evaluate(String instruction) {
+        return current.get().evaluate(instruction);
+    }
+
+    public CompiledRules rules() {
+        return current.get();
+    }
+
+    /** Recompiles the rules and publishes them atomically; returns whichever rules are live afterwards. */
+    public synchronized CompiledRules reload() {
+        try {
+            CompiledRules rules = load();
+            current.set(rules);
+            log.info("Reloaded verifier rules {}", rules.describe());
+        } catch (IOException | RuntimeException e) {
+            log.error("Keeping verifier rules {}: reload failed: {}", current.get().version(), e.getMessage());
+        }
+        return current.get();
+    }
+
+    /** Picks up edits to an external rules file. */
+    @Scheduled(fixedDelayString = "${verifier.rules.reload-interval-ms:5000}")
+    public void reloadIfChanged() {
+        if (rulesPath.isBlank()) {
+            return;
+        }
+        try {
+            if (Files.getLastModifiedTime(Path.of(rulesPath)).toMillis() != lastModified) {
+                reload();
+            }
+        } catch (IOException e) {
+            log.warn("Cannot check verifier rules file {}: {}", rulesPath, e.getMessage());
+        }
+    }
+
+    private CompiledRules load() throws IOException {
+        byte[] content;
+        if (rulesPath.isBlank()) {
+            try (InputStream in = new ClassPathResource(BUNDLED_RULES).getInputStream()) {
+                content = in.readAllBytes();
+            }
+        } else {
+            Path path = Path.of(rulesPath);
+            long modified = Files.getLastModifiedTime(path).toMillis();
+            content = Files.readAllBytes(path);
+            lastModified = modified;
+        }
+        RuleSet rules = mapper.readValue(content, RuleSet.class);
+        return CompiledRules.compile(rules, contentHash(content));
+    }
+
+    private static String contentHash(byte[] content) {
+        try {
+            return HexFormat.of().formatHex(MessageDigest.getInstance("SHA-256").digest(content)).substring(0, 16);
+        } catch (NoSuchAlgorithmException e) {
+            throw new IllegalStateException(e);
+        }
+    }
+
+    public Map<String, Object> describe() {
+        Map<String, Object> description = current.get().describe();
+        description.put("source", rulesPath.isBlank() ? "classpath:" + BUNDLED_RULES : rulesPath);
+        return description;
+    }
+}
@@ -0,0 +1,19 @@
+package com.webautomation.rules;
+
+import com.fasterxml.jackson.annotation.JsonProperty;
+import java.util.List;
+
+/**
+ * Policy rules as loaded from the rules file, before compilation.
+ */
+public record RuleSet(
+        @JsonProperty("blocked_domains") List<String> blockedDomains,
+        @JsonProperty("forbidden_actions") List<String> forbiddenActions,
+        @JsonProperty("pii_keywords") List<String> piiKeywords) {
+
+    public RuleSet {
+        blockedDomains = blockedDomains == null ? List.of() : List.copyOf(blockedDomains);
+        forbiddenActions = forbiddenActions == null ? List.of() : List.copyOf(forbiddenActions);
+        piiKeywords = piiKeywords == null ? List.of() : List.copyOf(piiKeywords);
+    }
+}
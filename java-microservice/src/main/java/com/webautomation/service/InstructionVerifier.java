@@ -0,0 +1,43 @@
+package com.webautomation.service;
+
+import com.webautomation.rules.RuleEngine;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.stereotype.Service;
+
+/**
+ * Checks that an instruction can be handed to the browser agent: a cheap
+ * structural check, then the policy rules (blocked domains, forbidden
+ * actions, PII keywords). Thread-safe, so batch requests verify items in parallel.
+ */
+@Service
+public class InstructionVerifier {
+
+    private final RuleEngine rules;
+    private final int maxLength;
+
+    public InstructionVerifier(RuleEngine rules, @Value("${verifier.max-instruction-length:2000}") int maxLength) {
+        this.rules = rules;
+        this.maxLength = maxLength;
+    }
+
+    public Verdict verify(String instruction) {
+        if (instruction == null || instruction.isBlank()) {
+            return Verdict.rejected("empty instruction");
+        }
+        if (instruction.length() > maxLength) {
+            return Verdict.rejected("instruction longer than " + maxLength + " characters");
+        }
+        boolean hasLetter = false;
+        for (int i = 0; i < instruction.length(); i++) {
+            char c = instruction.charAt(i);
+            if (Character.isISOControl(c) && c != '\n' && c != '\r' && c != '\t') {
+                return Verdict.rejected("instruction contains control characters");
+            }
+            hasLetter |= Character.isLetter(c);
+        }
+        if (!hasLetter) {
+            return Verdict.rejected("instruction has no words");
+        }
+        return rules.evaluate(instruction);
+    }
+}
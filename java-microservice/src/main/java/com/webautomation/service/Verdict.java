@@ -0,0 +1,17 @@
+package com.webautomation.service;
+
+/**
+ * Outcome of verifying one instruction; {@code reason} explains a rejection.
+ */
+public record Verdict(boolean verified, String reason) {
+
+    private static final Verdict OK = new Verdict(true, null);
+
+    public static Verdict ok() {
+        return OK;
+    }
+
+    public static Verdict rejected(String reason) {
+        return new Verdict(false, reason);
+    }
+}
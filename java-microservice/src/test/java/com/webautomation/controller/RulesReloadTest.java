@@ -0,0 +1,93 @@
+package com.webautomation.controller;
+
+import static org.hamcrest.Matchers.not;
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertFalse;
+import static org.junit.jupiter.api.Assertions.assertTrue;
+import static org.springframework.test.web.servlet.request.MockMvcRequestBuilders.post;
+import static org.springframework.test.web.servlet.result.MockMvcResultMatchers.jsonPath;
+import static org.springframework.test.web.servlet.result.MockMvcResultMatchers.status;
+
+import com.fasterxml.jackson.databind.ObjectMapper;
+import com.webautomation.rules.RuleEngine;
+import com.webautomation.service.InstructionVerifier;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import org.junit.jupiter.api.AfterEach;
+import org.junit.jupiter.api.BeforeEach;
+import org.junit.jupiter.api.Test;
+import org.junit.jupiter.api.io.TempDir;
+import org.springframework.test.web.servlet.MockMvc;
+import org.springframework.test.web.servlet.setup.MockMvcBuilders;
+
+class RulesReloadTest {
+
+    private static final String RULES = "{\"blocked_domains\": [\"example.com\"], \"forbidden_actions\": [\"wire transfer\"]}";
+
+    @TempDir
+    Path dir;
+
+    private Path rulesFile;
+    private RuleEngine engine;
+    private ExecutorService executor;
+    private MockMvc mvc;
+
+    @BeforeEach
+    void setUp() throws Exception {
+        rulesFile = dir.resolve("verifier-rules.json");
+        Files.writeString(rulesFile, RULES);
+        engine = new RuleEngine(new ObjectMapper(), rulesFile.toString());
+        executor = Executors.newSingleThreadExecutor();
+        VerifierController controller =
+                new VerifierController(new InstructionVerifier(engine, 2000), engine, executor, 1000, 64);
+        mvc = MockMvcBuilders.standaloneSetup(controller).build();
+    }
+
+    @AfterEach
+    void tearDown() {
+        executor.shutdownNow();
+    }
+
+    @Test
+    void malformedRulesFileKeepsTheCurrentRules() throws Exception {
+        String version = engine.rules().version();
+
+        Files.writeString(rulesFile, "{\"blocked_domains\": [\"evil.test\"");
+        mvc.perform(post("/java/verifier/rules:reload"))
+                .andExpect(status().isOk())
+                .andExpect(jsonPath("$.version").value(version));
+
+        assertEquals(version, engine.rules().version());
+        assertFalse(engine.evaluate("make a wire transfer").verified());
+        assertFalse(engine.evaluate("open https://mail.example.com").verified());
+        assertTrue(engine.evaluate("open https://evil.test").verified());
+    }
+
+    @Test
+    void rulesFileWithWrongTypesKeepsTheCurrentRules() throws Exception {
+        String version = engine.rules().version();
+
+        Files.writeString(rulesFile, "{\"blocked_domains\": \"evil.test\", \"forbidden_actions\": 5}");
+        mvc.perform(post("/java/verifier/rules:reload"))
+                .andExpect(status().isOk())
+                .andExpect(jsonPath("$.version").value(version));
+
+        assertFalse(engine.evaluate("make a wire transfer").verified());
+    }
+
+    @Test
+    void validRulesFileReplacesTheRules() throws Exception {
+        String version = engine.rules().version();
+
+        Files.writeString(rulesFile, "{\"forbidden_actions\": [\"delete all emails\"]}");
+        mvc.perform(post("/java/verifier/rules:reload"))
+                .andExpect(status().isOk())
+                .andExpect(jsonPath("$.version").value(not(version)))
+                .andExpect(jsonPath("$.blocked_domains").value(0));
+
+        assertTrue(engine.evaluate("make a wire transfer").verified());
+        assertFalse(engine.evaluate("delete all emails please").verified());
+    }
+}
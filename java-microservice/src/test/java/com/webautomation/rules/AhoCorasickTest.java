@@ -0,0 +1,56 @@
+package com.webautomation.rules;
+
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertNull;
+
+import java.util.List;
+import org.junit.jupiter.api.Test;
+
+class AhoCorasickTest {
+
+    private static AhoCorasick.Match scan(List<String> phrases, String text) {
+        return AhoCorasick.compile(phrases).firstMatch(text.toCharArray(), text.length());
+    }
+
+    @Test
+    void findsPhraseThatOverlapsAnotherCandidate() {
+        // "card number" starts inside "credit card", which never completes
+        List<String> phrases = List.of("credit card", "card number");
+        assertEquals(new AhoCorasick.Match(1, 10, 20), scan(phrases, "enter the card number"));
+    }
+
+    @Test
+    void reportsSuffixPhraseReachedThroughDictionaryLinks() {
+        List<String> phrases = List.of("she", "he", "hers");
+        assertEquals(new AhoCorasick.Match(1, 4, 5), scan(phrases, "ask he"));
+        assertEquals(new AhoCorasick.Match(0, 0, 2), scan(phrases, "she sells"));
+        assertEquals(new AhoCorasick.Match(2, 4, 7), scan(phrases, "not hers"));
+    }
+
+    @Test
+    void prefersLongerPhraseEndingAtTheSamePlace() {
+        assertEquals(new AhoCorasick.Match(0, 3, 10), scan(List.of("password", "word"), "my password"));
+    }
+
+    @Test
+    void requiresWordBoundaries() {
+        assertNull(scan(List.of("pin"), "spinning wheel"));
+        assertNull(scan(List.of("he", "she", "hers"), "ushers"));
+        assertNull(scan(List.of("ssn"), "lessn"));
+        assertEquals(new AhoCorasick.Match(0, 4, 6), scan(List.of("pin"), "the pin code"));
+        assertEquals(new AhoCorasick.Match(0, 0, 2), scan(List.of("ssn"), "ssn:123-45-6789"));
+    }
+
+    @Test
+    void phrasesWithPunctuationMatchInsideWords() {
+        // Boundaries only apply where the phrase itself starts or ends with a letter or digit
+        assertEquals(new AhoCorasick.Match(0, 4, 9), scan(List.of("rm -rf"), "run rm -rf /"));
+        assertEquals(new AhoCorasick.Match(0, 6, 8), scan(List.of("-rf"), "run rm-rf /"));
+    }
+
+    @Test
+    void emptyPhrasesNeverMatch() {
+        assertNull(scan(List.of(""), "anything"));
+        assertEquals(1, AhoCorasick.compile(List.of("")).states());
+    }
+}
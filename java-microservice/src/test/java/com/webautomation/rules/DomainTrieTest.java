@@ -0,0 +1,63 @@
+package com.webautomation.rules;
+
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertNull;
+
+import org.junit.jupiter.api.Test;
+
+class DomainTrieTest {
+
+    private static String match(DomainTrie trie, String host) {
+        return trie.match(host.toCharArray(), 0, host.length());
+    }
+
+    private static DomainTrie blocking(String... domains) {
+        DomainTrie trie = new DomainTrie();
+        for (String domain : domains) {
+            trie.add(domain);
+        }
+        return trie;
+    }
+
+    @Test
+    void blocksDomainAndItsSubdomains() {
+        DomainTrie trie = blocking("example.com");
+        assertEquals("example.com", match(trie, "example.com"));
+        assertEquals("example.com", match(trie, "mail.example.com"));
+        assertEquals("example.com", match(trie, "a.b.example.com"));
+    }
+
+    @Test
+    void doesNotBlockLookalikes() {
+        DomainTrie trie = blocking("example.com");
+        assertNull(match(trie, "evil-example.com"));
+        assertNull(match(trie, "badexample.com"));
+        assertNull(match(trie, "example.com.evil.net"));
+        assertNull(match(trie, "example.co"));
+        assertNull(match(trie, "com"));
+    }
+
+    @Test
+    void wildcardPrefixMeansTheSameDomain() {
+        DomainTrie trie = blocking("*.example.org", "example.org", ".example.org");
+        assertEquals(1, trie.size());
+        assertEquals("example.org", match(trie, "example.org"));
+        assertEquals("example.org", match(trie, "www.example.org"));
+    }
+
+    @Test
+    void reportsTheBroadestBlockedParent() {
+        DomainTrie trie = blocking("example.com", "mail.example.com");
+        assertEquals("example.com", match(trie, "mail.example.com"));
+        assertEquals("example.com", match(trie, "www.example.com"));
+        assertEquals(2, trie.size());
+    }
+
+    @Test
+    void matchesTheGivenSliceOnly() {
+        DomainTrie trie = blocking("example.com");
+        char[] text = "visit evil-example.com or example.com now".toCharArray();
+        assertNull(trie.match(text, 6, 22));
+        assertEquals("example.com", trie.match(text, 26, 37));
+    }
+}
@@ -0,0 +1,90 @@
+package com.webautomation.rules;
+
+import com.webautomation.service.Verdict;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.Random;
+import java.util.concurrent.TimeUnit;
+import org.openjdk.jmh.annotations.Benchmark;
+import org.openjdk.jmh.annotations.BenchmarkMode;
+import org.openjdk.jmh.annotations.Fork;
+import org.openjdk.jmh.annotations.Measurement;
+import org.openjdk.jmh.annotations.Mode;
+import org.openjdk.jmh.annotations.OutputTimeUnit;
+import org.openjdk.jmh.annotations.Param;
+import org.openjdk.jmh.annotations.Scope;
+import org.openjdk.jmh.annotations.Setup;
+import org.openjdk.jmh.annotations.State;
+import org.openjdk.jmh.annotations.Warmup;
+import org.openjdk.jmh.runner.Runner;
+import org.openjdk.jmh.runner.RunnerException;
+import org.openjdk.jmh.runner.options.OptionsBuilder;
+
+/**
+ * Instructions verified per second against a synthetic policy of
+ * {@code rules} phrases and as many blocked domains.
+ * <p>
+ * Run with:
+ * <pre>
+ * mvn test-compile exec:java -Dexec.classpathScope=test \
+ *     -Dexec.mainClass=com.webautomation.rules.RuleEngineBenchmark
+ * </pre>
+ */
+@State(Scope.Benchmark)
+@BenchmarkMode(Mode.Throughput)
+@OutputTimeUnit(TimeUnit.SECONDS)
+@Warmup(iterations = 3, time = 1)
+@Measurement(iterations = 5, time = 1)
+@Fork(1)
+public class RuleEngineBenchmark {
+
+    private static final String[] WORDS = {
+        "open", "search", "for", "the", "latest", "news", "about", "weather", "in", "london", "and",
+        "summarize", "first", "three", "results", "click", "login", "button", "go", "to", "my", "inbox",
+    };
+
+    @Param({"100", "10000"})
+    public int rules;
+
+    @Param({"80", "1000"})
+    public int instructionLength;
+
+    private CompiledRules compiled;
+    private String[] instructions;
+    private int next;
+
+    @Setup
+    public void setUp() {
+        Random random = new Random(42);
+        List<String> phrases = new ArrayList<>();
+        List<String> domains = new ArrayList<>();
+        for (int i = 0; i < rules; i++) {
+            phrases.add("forbidden phrase " + i + " " + WORDS[random.nextInt(WORDS.length)]);
+            domains.add("blocked-" + i + ".example");
+        }
+        compiled = CompiledRules.compile(new RuleSet(domains, phrases, List.of("credit card number")), "benchmark");
+
+        // Mostly clean instructions with a URL, as real traffic is; every tenth one is rejected
+        instructions = new String[1024];
+        for (int i = 0; i < instructions.length; i++) {
+            StringBuilder text = new StringBuilder("go to https://www.site-" + i + ".com/page and ");
+            while (text.length() < instructionLength) {
+                text.append(WORDS[random.nextInt(WORDS.length)]).append(' ');
+            }
+            if (i % 10 == 0) {
+                text.append("visit blocked-").append(random.nextInt(rules)).append(".example");
+            }
+            instructions[i] = text.toString();
+        }
+    }
+
+    @Benchmark
+    public Verdict evaluate() {
+        next = (next + 1) & (instructions.length - 1);
+        return compiled.evaluate(instructions[next]);
+    }
+
+    public static void main(String[] args) throws RunnerException {
+        new Runner(new OptionsBuilder().include(RuleEngineBenchmark.class.getSimpleName()).build()).run();
+    }
+}
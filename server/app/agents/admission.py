@@ -0,0 +1,119 @@
+import json
+import logging
+import math
+import os
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.utils.token_bucket import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Retry-After for clients whose bucket never refills (a rate of zero)
+MAX_RETRY_AFTER = 3600
+
+
+class AdmissionRejected(Exception):
+    """Raised when a client is over its submission rate; carries a Retry-After hint"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(min(self.retry_after, MAX_RETRY_AFTER))))
+
+
+class AdmissionController:
+    """Per-client token buckets in front of task submission.
+
+    Every client gets ``rate_per_minute`` submissions with bursts up to
+    ``burst``; interactive submissions draw from a separate bucket
+    (``interactive_rate_per_minute`` / ``interactive_burst``) so a client's
+    batch work cannot lock out its own voice commands. Batches are checked
+    up front and charged afterwards for the items actually queued, which may
+    overdraw the bucket: a large batch goes through whole and the client's
+    following submissions wait until the debt is paid off. ``weights`` gives
+    each client its share in the task manager's fair queue.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float = 60.0,
+        burst: float = 20.0,
+        interactive_rate_per_minute: float = 30.0,
+        interactive_burst: float = 5.0,
+        weights: Optional[Dict[str, float]] = None,
+        max_clients: int = 10000,
+    ):
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.interactive_rate_per_minute = interactive_rate_per_minute
+        self.interactive_burst = interactive_burst
+        self.weights = weights or {}
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[Tuple[str, bool], TokenBucket]" = OrderedDict()
+        self._admitted = 0
+        self._rejected = 0
+
+    def weight(self, client_id: str) -> float:
+        return float(self.weights.get(client_id, self.weights.get("default", 1.0)))
+
+    def _bucket(self, client_id: str, interactive: bool) -> TokenBucket:
+        key = (client_id, interactive)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if interactive:
+                bucket = TokenBucket(self.interactive_rate_per_minute, self.interactive_burst)
+            else:
+                bucket = TokenBucket(self.rate_per_minute, self.burst)
+            self._buckets[key] = bucket
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        self._buckets.move_to_end(key)
+        return bucket
+
+    def admit(self, client_id: str, interactive: bool = False):
+        """Admit one submission; raises ``AdmissionRejected`` if the client is over its rate"""
+        bucket = self._bucket(client_id, interactive)
+        wait = bucket.wait_time(1)
+        if wait > 0:
+            self._rejected += 1
+            raise AdmissionRejected(f"Client '{client_id}' is over its submission rate", wait)
+        bucket.take(1)
+        self._admitted += 1
+
+    def check(self, client_id: str, interactive: bool = False):
+        """Raise ``AdmissionRejected`` unless the client has at least one submission left"""
+        bucket = self._bucket(client_id, interactive)
+        wait = bucket.wait_time(1)
+        if wait > 0:
+            self._rejected += 1
+            raise AdmissionRejected(f"Client '{client_id}' is over its submission rate", wait)
+
+    def charge(self, client_id: str, count: int, interactive: bool = False):
+        """Charge ``count`` submissions that were queued after ``check``"""
+        if count <= 0:
+            return
+        self._bucket(client_id, interactive).charge(count)
+        self._admitted += count
+
+    def stats(self) -> dict:
+        return {
+            "clients": len({client_id for client_id, _ in self._buckets}),
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+        }
+
+
+def load_weights() -> Dict[str, float]:
+    """Per-client fair-queue weights from the CLIENT_WEIGHTS env var (JSON)"""
+    raw = os.getenv("CLIENT_WEIGHTS")
+    if not raw:
+        return {}
+    try:
+        return {client: float(weight) for client, weight in json.loads(raw).items()}
+    except (ValueError, AttributeError) as e:
+        logger.warning(f"Ignoring invalid CLIENT_WEIGHTS: {e}")
+        return {}
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from app.utils.config import model_classes
+
+logger = logging.getLogger(__name__)
+
+# Typed fields of the settings built by the React WebUIManager
+INT_FIELDS = {
+    "maxSteps", "maxActions", "maxInputTokens", "ollamaNumCtx", "plannerOllamaNumCtx",
+    "windowWidth", "windowHeight",
+}
+FLOAT_FIELDS = {"llmTemperature": (0.0, 2.0), "plannerLlmTemperature": (0.0, 2.0)}
+BOOL_FIELDS = {
+    "useVision", "plannerUseVision", "useOwnBrowser", "keepBrowserOpen", "headless", "disableSecurity",
+}
+SECRET_SUFFIX = "ApiKey"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS config_presets (
+    config_ref TEXT PRIMARY KEY,
+    settings TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+class InvalidPresetError(ValueError):
+    """Raised when uploaded settings fail validation"""
+
+
+def _coerce(field: str, value):
+    if value is None:
+        return None
+    if field in BOOL_FIELDS:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+            return value.strip().lower() == "true"
+        raise InvalidPresetError(f"{field} must be a boolean")
+    if field in INT_FIELDS:
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            raise InvalidPresetError(f"{field} must be an integer")
+        if isinstance(value, bool) or number != float(value) or number < 1:
+            raise InvalidPresetError(f"{field} must be a positive integer")
+        return number
+    if field in FLOAT_FIELDS:
+        low, high = FLOAT_FIELDS[field]
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise InvalidPresetError(f"{field} must be a number")
+        if isinstance(value, bool) or not low <= number <= high:
+            raise InvalidPresetError(f"{field} must be between {low} and {high}")
+        return number
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def normalize_settings(agent_settings: Optional[dict], browser_settings: Optional[dict]) -> dict:
+    """Validated, type-coerced copy of a settings pair with keys in canonical order"""
+    normalized = {}
+    for name, settings in (("agent_settings", agent_settings), ("browser_settings", browser_settings)):
+        if settings is None:
+            settings = {}
+        if not isinstance(settings, dict):
+            raise InvalidPresetError(f"{name} must be an object")
+        normalized[name] = {field: _coerce(field, settings[field]) for field in sorted(settings)}
+    model_class = normalized["agent_settings"].get("modelClass")
+    if model_class and model_class not in model_classes:
+        raise InvalidPresetError(f"Unknown model class '{model_class}'")
+    return normalized
+
+
+def config_ref_for(normalized: dict) -> str:
+    canonical = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def redact(normalized: dict) -> dict:
+    """Settings with API keys masked, for echoing a preset back"""
+    return {
+        name: {
+            field: ("***" if field.endswith(SECRET_SUFFIX) and value else value)
+            for field, value in settings.items()
+        }
+        for name, settings in normalized.items()
+    }
+
+
+class PresetStore:
+    """Agent/browser settings presets stored once under their content hash.
+
+    Uploads are validated and normalized once; submissions then send only
+    the ``config_ref``. Presets live in SQLite so every bridge worker can
+    resolve them, and the normalized settings of the ``max_cached`` most
+    recently used presets are kept in memory. Presets are immutable, so the
+    cache never needs invalidating. Methods are synchronous.
+    """
+
+    def __init__(self, path: str, max_cached: int = 256):
+        self.path = path
+        self.max_cached = max_cached
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Each thread uses only its own connection; close() shuts them all from one thread
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
+
+    def _remember(self, config_ref: str, normalized: dict):
+        with self._cache_lock:
+            self._cache[config_ref] = normalized
+            self._cache.move_to_end(config_ref)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+    def cached(self, config_ref: str) -> Optional[dict]:
+        """Normalized settings if they are in memory; avoids a thread hop for hot presets"""
+        with self._cache_lock:
+            normalized = self._cache.get(config_ref)
+            if normalized is not None:
+                self._cache.move_to_end(config_ref)
+                self._hits += 1
+            return normalized
+
+    def put(self, agent_settings: Optional[dict], browser_settings: Optional[dict]) -> Tuple[str, dict, bool]:
+        """Validate and store a preset; returns (config_ref, normalized settings, newly created)"""
+        normalized = normalize_settings(agent_settings, browser_settings)
+        config_ref = config_ref_for(normalized)
+        with self._conn() as conn:
+            created = conn.execute(
+                "INSERT OR IGNORE INTO config_presets (config_ref, settings, created_at) VALUES (?, ?, ?)",
+                (config_ref, json.dumps(normalized), time.time()),
+            ).rowcount > 0
+        self._remember(config_ref, normalized)
+        return config_ref, normalized, created
+
+    def get(self, config_ref: str) -> Optional[dict]:
+        normalized = self.cached(config_ref)
+        if normalized is not None:
+            return normalized
+        row = self._conn().execute(
+            "SELECT settings FROM config_presets WHERE config_ref = ?", (config_ref,)
+        ).fetchone()
+        with self._cache_lock:
+            self._misses += 1
+        if row is None:
+            return None
+        normalized = json.loads(row[0])
+        self._remember(config_ref, normalized)
+        return normalized
+
+    def stats(self) -> dict:
+        return {"cached": len(self._cache), "hits": self._hits, "misses": self._misses}
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class IdempotencyConflictError(Exception):
+    """Raised when an idempotency key is reused for a different request"""
+
+
+def normalize_instruction(instruction: str) -> str:
+    # Whitespace only: case can matter (text to type, passwords, case-sensitive searches)
+    return re.sub(r"\s+", " ", instruction).strip()
+
+
+def fingerprint(instruction: str, agent_type: str, agent_settings: dict, browser_settings: dict) -> str:
+    """Stable hash of everything that determines what an agent run does"""
+    settings = json.dumps(
+        {"agent_type": agent_type, "agent_settings": agent_settings, "browser_settings": browser_settings},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(f"{normalize_instruction(instruction)}\n{settings}".encode()).hexdigest()
+
+
+class SubmissionIndex:
+    """Maps idempotency keys and request fingerprints to the task they started.
+
+    The index only remembers associations; the caller decides whether the
+    task it points to can be reused (still in flight, or a fresh enough
+    result). Idempotency keys expire after ``key_ttl`` seconds and both maps
+    are capped at ``max_entries``, oldest first.
+    """
+
+    def __init__(self, key_ttl: float = 86400.0, max_entries: int = 10000):
+        self.key_ttl = key_ttl
+        self.max_entries = max_entries
+        # idempotency key -> (fingerprint, task_id, created_at)
+        self._keys: "OrderedDict[str, Tuple[str, str, float]]" = OrderedDict()
+        # fingerprint -> task_id of the latest submission
+        self._fingerprints: "OrderedDict[str, str]" = OrderedDict()
+        self._key_hits = 0
+        self._dedup_hits = 0
+        self._result_hits = 0
+
+    def by_key(self, key: str, request_fingerprint: str) -> Optional[str]:
+        entry = self._keys.get(key)
+        if entry is None:
+            return None
+        key_fingerprint, task_id, created_at = entry
+        if time.time() - created_at > self.key_ttl:
+            del self._keys[key]
+            return None
+        if key_fingerprint != request_fingerprint:
+            raise IdempotencyConflictError("Idempotency-Key was already used with a different request")
+        self._key_hits += 1
+        return task_id
+
+    def by_fingerprint(self, request_fingerprint: str) -> Optional[str]:
+        return self._fingerprints.get(request_fingerprint)
+
+    def remember(self, request_fingerprint: str, task_id: str, key: Optional[str] = None):
+        self._fingerprints[request_fingerprint] = task_id
+        self._fingerprints.move_to_end(request_fingerprint)
+        while len(self._fingerprints) > self.max_entries:
+            self._fingerprints.popitem(last=False)
+        if key is not None:
+            self._keys[key] = (request_fingerprint, task_id, time.time())
+            while len(self._keys) > self.max_entries:
+                self._keys.popitem(last=False)
+
+    def record_hit(self, reused_result: bool):
+        if reused_result:
+            self._result_hits += 1
+        else:
+            self._dedup_hits += 1
+
+    def stats(self) -> dict:
+        return {
+            "idempotency_keys": len(self._keys),
+            "fingerprints": len(self._fingerprints),
+            "idempotency_hits": self._key_hits,
+            "in_flight_hits": self._dedup_hits,
+            "result_cache_hits": self._result_hits,
+        }
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager, nullcontext
+from typing import Dict, Optional
+
+from app.utils.token_bucket import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INPUT_TOKENS = 128000
+
+
+class ProviderLimiter:
+    def __init__(self, rpm: Optional[float], tpm: Optional[float], concurrency: Optional[int]):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.slots = asyncio.Semaphore(concurrency) if concurrency else None
+        self.concurrency = concurrency
+        # Waiters pass through one at a time, so grants are first come first served
+        self.turn = asyncio.Lock()
+        self.blocked_until = 0.0
+        self.waiting = 0
+        self.active = 0
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def wait_time(self, tokens: float) -> float:
+        wait = max(0.0, self.blocked_until - time.monotonic())
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(tokens))
+        return wait
+
+    def snapshot(self) -> dict:
+        for bucket in (self.requests, self.tokens):
+            if bucket is not None:
+                bucket.refill()
+        return {
+            "waiting": self.waiting,
+            "active": self.active,
+            "concurrency": self.concurrency,
+            "granted": self.granted,
+            "avg_wait_ms": round(self.total_wait / self.granted * 1000, 1) if self.granted else None,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+            "requests_available": round(self.requests.tokens, 1) if self.requests else None,
+            "tokens_available": round(self.tokens.tokens) if self.tokens else None,
+            "backoff_s": round(max(0.0, self.blocked_until - time.monotonic()), 1),
+        }
+
+
+class LLMScheduler:
+    """Admits agent runs per LLM provider/model within requests/min and tokens/min quotas.
+
+    ``limits`` maps ``"provider"`` or ``"provider/model"`` to
+    ``{"rpm": ..., "tpm": ..., "concurrency": ...}``; the most specific entry
+    wins, ``default`` applies to anything unlisted, and every model gets its
+    own buckets. The bridge only sees whole agent runs, not the LLM calls an
+    agent makes during one, so ``rpm`` is really runs started per minute and
+    ``tpm`` is charged each run's input token estimate (``maxInputTokens``)
+    once, when it is admitted; set them from the provider's quota divided by
+    the calls a typical run makes. Callers without quota wait in FIFO order
+    instead of failing. ``backoff`` pauses a provider after it answers with a
+    rate-limit error.
+
+    Quotas live in process memory, so with ``workers`` bridge processes each
+    one enforces its ``1 / workers`` share of every limit (concurrency is
+    rounded down, but never below one run).
+    """
+
+    def __init__(self, limits: Optional[Dict[str, dict]] = None, default: Optional[dict] = None, workers: int = 1):
+        self.limits = limits or {}
+        self.default = default or {}
+        self.workers = max(1, workers)
+        self._limiters: Dict[str, ProviderLimiter] = {}
+
+    @staticmethod
+    def key_for(agent_settings: dict) -> Optional[str]:
+        provider = agent_settings.get("llmProvider") or agent_settings.get("llm_provider")
+        if not provider:
+            return None
+        model = agent_settings.get("llmModelName") or agent_settings.get("llm_model_name")
+        return f"{provider}/{model}" if model else provider
+
+    @staticmethod
+    def estimate_tokens(agent_settings: dict) -> int:
+        try:
+            return int(agent_settings.get("maxInputTokens") or DEFAULT_INPUT_TOKENS)
+        except (TypeError, ValueError):
+            return DEFAULT_INPUT_TOKENS
+
+    def _limiter(self, key: str) -> ProviderLimiter:
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            provider = key.split("/", 1)[0]
+            config = self.limits.get(key) or self.limits.get(provider) or self.default
+            rpm, tpm, concurrency = config.get("rpm"), config.get("tpm"), config.get("concurrency")
+            limiter = self._limiters[key] = ProviderLimiter(
+                rpm / self.workers if rpm else None,
+                tpm / self.workers if tpm else None,
+                max(1, concurrency // self.workers) if concurrency else None,
+            )
+        return limiter
+
+    @asynccontextmanager
+    async def reserve(self, agent_settings: dict, on_wait=None, idle=None):
+        """Hold a slot for one agent run.
+
+        ``on_wait(key, seconds)`` is called before any wait, and when the run
+        has to wait the wait happens inside ``idle()``, an async context
+        manager (e.g. one that frees the caller's worker meanwhile).
+        """
+        key = self.key_for(agent_settings)
+        if key is None:
+            yield None
+            return
+        limiter = self._limiter(key)
+        tokens = self.estimate_tokens(agent_settings)
+        started = time.monotonic()
+        limiter.waiting += 1
+        acquired_slot = False
+        must_wait = (
+            limiter.turn.locked()
+            or (limiter.slots is not None and limiter.slots.locked())
+            or limiter.wait_time(tokens) > 0
+        )
+        try:
+            if limiter.turn.locked() and on_wait is not None:
+                on_wait(key, None)
+            async with idle() if must_wait and idle is not None else nullcontext(), limiter.turn:
+                if limiter.slots is not None:
+                    if limiter.slots.locked() and on_wait is not None:
+                        on_wait(key, None)
+                    await limiter.slots.acquire()
+                    acquired_slot = True
+                while True:
+                    wait = limiter.wait_time(tokens)
+                    if wait <= 0:
+                        break
+                    if on_wait is not None:
+                        on_wait(key, wait)
+                    await asyncio.sleep(wait)
+                if limiter.requests is not None:
+                    limiter.requests.take(1)
+                if limiter.tokens is not None:
+                    limiter.tokens.take(tokens)
+        except BaseException:
+            if acquired_slot:
+                limiter.slots.release()
+            raise
+        finally:
+            limiter.waiting -= 1
+
+        waited = time.monotonic() - started
+        limiter.granted += 1
+        limiter.total_wait += waited
+        limiter.max_wait = max(limiter.max_wait, waited)
+        limiter.active += 1
+        try:
+            yield key
+        finally:
+            limiter.active -= 1
+            if limiter.slots is not None:
+                limiter.slots.release()
+
+    def backoff(self, key: Optional[str], seconds: float):
+        """Hold all new runs for a provider that just rate-limited us"""
+        if key is None:
+            return
+        limiter = self._limiter(key)
+        limiter.blocked_until = max(limiter.blocked_until, time.monotonic() + seconds)
+        if limiter.requests is not None:
+            limiter.requests.drain()
+        logger.info(f"Backing off {key} for {seconds}s after a rate-limit error")
+
+    def stats(self) -> dict:
+        return {key: limiter.snapshot() for key, limiter in self._limiters.items()}
+
+
+def load_limits() -> Dict[str, dict]:
+    """Per-provider limits from the LLM_RATE_LIMITS env var (JSON)"""
+    raw = os.getenv("LLM_RATE_LIMITS")
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        logger.warning(f"Ignoring invalid LLM_RATE_LIMITS: {e}")
+        return {}
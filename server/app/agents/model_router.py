@@ -0,0 +1,180 @@
+import logging
+import os
+import re
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Model = Tuple[str, str]
+
+# LLM API errors saying the caller is over its rate limit or quota: HTTP 429 ("Error code: 429",
+# "429 Too Many Requests") and rate-limit, quota or resource-exhausted messages
+RATE_LIMIT_ERROR = (
+    r"(?:status|code|http)\W{0,3}429\b|\b429 too many requests"
+    r"|rate[ _-]?limit|too many requests|quota|resource[ _]exhausted|resource has been exhausted"
+)
+RATE_LIMIT_PATTERN = re.compile(RATE_LIMIT_ERROR)
+# LLM API errors that point at the provider rather than the task itself: rate limits, HTTP 401/403
+# and 5xx responses ("Error code: 503"), overload and API key messages
+PROVIDER_ERROR_PATTERN = re.compile(
+    RATE_LIMIT_ERROR
+    + r"|(?:status|code|http)\W{0,3}(?:401|403|5\d\d)\b"
+    r"|\b5\d\d (?:internal server error|bad gateway|service unavailable|gateway timeout)|overloaded"
+    r"|invalid[ _-]api[ _-]key|incorrect api key|api key not valid|authentication_error|permission_denied"
+)
+# agent_settings fields tied to the client's own provider, dropped when a run is routed elsewhere
+PROVIDER_FIELDS = ("llmApiKey", "llmBaseUrl")
+PLANNER_PREFIX = "planner"
+
+
+class ModelStalledError(Exception):
+    """Raised when a routed run stops making progress on its model"""
+
+
+class NoHealthyModelError(LookupError):
+    """Raised when every member of a model class is failing or already tried"""
+
+
+def is_provider_error(message: Optional[str]) -> bool:
+    return PROVIDER_ERROR_PATTERN.search((message or "").lower()) is not None
+
+
+def is_rate_limit_error(message: Optional[str]) -> bool:
+    return RATE_LIMIT_PATTERN.search((message or "").lower()) is not None
+
+
+def load_credentials(classes: Dict[str, List[Model]]) -> Dict[str, dict]:
+    """Server-side credentials for the providers in ``classes``.
+
+    Read from the same ``{PROVIDER}_API_KEY`` / ``{PROVIDER}_ENDPOINT`` env
+    vars the web-ui uses; providers without an API key are left out.
+    """
+    credentials = {}
+    for members in classes.values():
+        for provider, _ in members:
+            api_key = os.getenv(f"{provider.upper()}_API_KEY")
+            if api_key:
+                credentials[provider] = {"api_key": api_key, "base_url": os.getenv(f"{provider.upper()}_ENDPOINT")}
+    return credentials
+
+
+class ModelStats:
+    """Moving window of step latencies and outcomes for one provider/model"""
+
+    def __init__(self, window: int):
+        self.samples: deque = deque(maxlen=window)
+        self.cooldown_until = 0.0
+
+    def record(self, latency: Optional[float], ok: bool):
+        self.samples.append((time.time(), latency, ok))
+
+    def latency(self) -> Optional[float]:
+        latencies = sorted(latency for _, latency, ok in self.samples if ok and latency is not None)
+        return latencies[len(latencies) // 2] if latencies else None
+
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, _, ok in self.samples if not ok) / len(self.samples)
+
+    def snapshot(self) -> dict:
+        latency = self.latency()
+        return {
+            "samples": len(self.samples),
+            "median_step_s": round(latency, 2) if latency is not None else None,
+            "error_rate": round(self.error_rate(), 2),
+            "cooldown_s": round(max(0.0, self.cooldown_until - time.time()), 1),
+        }
+
+
+class ModelRouter:
+    """Picks the fastest healthy model from an equivalence class.
+
+    ``classes`` maps a class name to interchangeable ``(provider, model)``
+    pairs. Each model keeps its last ``window`` step latencies and outcomes;
+    a model whose error rate reaches ``max_error_rate`` or that just failed
+    is skipped for ``cooldown`` seconds. Models with no samples yet are
+    tried first so every member gets measured.
+
+    Only members whose provider has an entry in ``credentials`` are routed
+    to, and ``settings_for`` puts that provider's key and endpoint into the
+    run's settings, so a client's own API key never reaches another provider.
+    """
+
+    def __init__(
+        self,
+        classes: Dict[str, List[Model]],
+        credentials: Optional[Dict[str, dict]] = None,
+        window: int = 50,
+        max_error_rate: float = 0.5,
+        cooldown: float = 60.0,
+    ):
+        self.classes = {name: [tuple(member) for member in members] for name, members in classes.items()}
+        self.credentials = credentials or {}
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self._stats: Dict[Model, ModelStats] = {}
+
+    def _stats_for(self, model: Model) -> ModelStats:
+        stats = self._stats.get(model)
+        if stats is None:
+            stats = self._stats[model] = ModelStats(self.window)
+        return stats
+
+    def is_healthy(self, model: Model) -> bool:
+        stats = self._stats_for(model)
+        return time.time() >= stats.cooldown_until and stats.error_rate() < self.max_error_rate
+
+    def routable(self, class_name: str) -> List[Model]:
+        """Members of a class whose provider has server-side credentials"""
+        return [member for member in self.classes.get(class_name, []) if member[0] in self.credentials]
+
+    def choose(self, class_name: str, exclude: Iterable[Model] = ()) -> Model:
+        if class_name not in self.classes:
+            raise KeyError(f"Unknown model class '{class_name}'")
+        excluded = set(exclude)
+        candidates = [member for member in self.routable(class_name) if member not in excluded]
+        healthy = [member for member in candidates if self.is_healthy(member)]
+        if not healthy:
+            raise NoHealthyModelError(f"No healthy model left in class '{class_name}'")
+
+        def score(member: Model) -> float:
+            latency = self._stats_for(member).latency()
+            return -1.0 if latency is None else latency
+
+        return min(healthy, key=score)
+
+    def settings_for(self, model: Model, agent_settings: dict) -> dict:
+        """``agent_settings`` pointed at ``model`` with the server's credentials for its provider.
+
+        The client's key and base URL are replaced, and planner settings are
+        dropped since they belong to the client's provider setup.
+        """
+        provider, model_name = model
+        credentials = self.credentials[provider]
+        settings = {
+            field: value for field, value in agent_settings.items()
+            if field not in PROVIDER_FIELDS and not field.startswith(PLANNER_PREFIX)
+        }
+        settings.update(llmProvider=provider, llmModelName=model_name, llmApiKey=credentials["api_key"])
+        if credentials.get("base_url"):
+            settings["llmBaseUrl"] = credentials["base_url"]
+        return settings
+
+    def record_step(self, model: Model, latency: float):
+        self._stats_for(model).record(latency, True)
+
+    def record_failure(self, model: Model, reason: str = ""):
+        stats = self._stats_for(model)
+        stats.record(None, False)
+        stats.cooldown_until = time.time() + self.cooldown
+        logger.info(f"Model {model[0]}/{model[1]} failed ({reason}), cooling down for {self.cooldown}s")
+
+    def stats(self) -> dict:
+        return {
+            name: {f"{provider}/{model}": self._stats_for((provider, model)).snapshot() for provider, model in members}
+            for name, members in self.classes.items()
+        }
@@ -0,0 +1,297 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+from app.agents.dedup import normalize_instruction
+
+logger = logging.getLogger(__name__)
+
+# Browser actions that can be replayed without the LLM ("done" only ends the trace)
+REPLAYABLE_ACTIONS = {
+    "go_to_url", "open_tab", "click_element", "click_element_by_index", "input_text",
+    "send_keys", "scroll_down", "scroll_up", "wait", "go_back", "done",
+}
+ELEMENT_ACTIONS = {"click_element", "click_element_by_index", "input_text"}
+# Actions that change page or site state; running them twice may submit twice
+SIDE_EFFECT_ACTIONS = {"click_element", "click_element_by_index", "input_text", "send_keys"}
+
+# Field names, ids, autocomplete hints and xpaths of inputs whose typed text must not be stored
+SECRET_FIELD_PATTERN = re.compile(
+    r"pass(word|wd|code|phrase)?|pwd|one-time-code|otp|cc-(number|csc|exp)|card.?number|cvc|cvv|\bpin\b|\bssn\b|secret",
+    re.IGNORECASE,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS action_traces (
+    trace_key TEXT PRIMARY KEY,
+    instruction TEXT NOT NULL,
+    steps TEXT NOT NULL,
+    source_task_id TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    replays INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def trace_key(instruction: str, agent_type: str) -> str:
+    return hashlib.sha256(f"{agent_type}\n{normalize_instruction(instruction)}".encode()).hexdigest()
+
+
+def _page(url: Optional[str]) -> Optional[str]:
+    """Scheme, host and path of a URL; query strings and fragments vary between runs"""
+    if not url:
+        return None
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}{parts.path.rstrip('/')}"
+
+
+def _is_secret_element(element: dict) -> bool:
+    attributes = element.get("attributes") or {}
+    if str(attributes.get("type", "")).lower() == "password":
+        return True
+    hints = " ".join(str(attributes.get(name, "")) for name in ("name", "id", "autocomplete"))
+    return bool(SECRET_FIELD_PATTERN.search(hints))
+
+
+def is_secret_input(step: dict) -> bool:
+    """Whether a step types a password or similar secret into the page"""
+    if step.get("action") != "input_text":
+        return False
+    text = str((step.get("params") or {}).get("text", ""))
+    # browser-use writes sensitive_data values as <secret>name</secret> placeholders
+    if step.get("secret") or "<secret>" in text:
+        return True
+    return bool(SECRET_FIELD_PATTERN.search(step.get("xpath") or ""))
+
+
+def _history_steps(history: list) -> List[dict]:
+    # browser-use AgentHistory: model_output.action[i] acted on state.interacted_element[i]
+    steps = []
+    for item in history:
+        state = item.get("state") or {}
+        actions = (item.get("model_output") or {}).get("action") or []
+        elements = state.get("interacted_element") or []
+        for index, action in enumerate(actions):
+            for name, params in action.items():
+                element = elements[index] if index < len(elements) and elements[index] else {}
+                steps.append({
+                    "action": name,
+                    "params": params or {},
+                    "xpath": element.get("xpath"),
+                    "url": state.get("url"),
+                    "secret": _is_secret_element(element),
+                })
+    return steps
+
+
+def extract_trace(result: Optional[dict]) -> Optional[List[dict]]:
+    """Concrete action steps from a successful run's result, or None if it cannot be replayed.
+
+    Accepts either an ``action_trace`` list of ``{action, params, xpath, url}``
+    steps or a browser-use style ``history`` list. Runs that typed a password
+    or other secret are not recorded, so secrets never reach the trace table.
+    """
+    if not isinstance(result, dict):
+        return None
+    if isinstance(result.get("action_trace"), list):
+        steps = result["action_trace"]
+    elif isinstance(result.get("history"), list):
+        steps = _history_steps(result["history"])
+    else:
+        return None
+    if not steps:
+        return None
+    for step in steps:
+        if step.get("action") not in REPLAYABLE_ACTIONS:
+            return None
+        if step["action"] in ELEMENT_ACTIONS and not step.get("xpath"):
+            return None
+        if is_secret_input(step):
+            return None
+    return steps
+
+
+def final_result_text(result: Optional[dict], steps: List[dict]) -> Optional[str]:
+    """The text the recorded run finished with: its ``done`` action, else the result message"""
+    for step in reversed(steps):
+        if step["action"] == "done" and (step.get("params") or {}).get("text"):
+            return step["params"]["text"]
+    if isinstance(result, dict):
+        for field in ("final_result", "message"):
+            if isinstance(result.get(field), str):
+                return result[field]
+    return None
+
+
+class ReplayDiverged(Exception):
+    """Raised when the page no longer matches what the recorded step expects"""
+
+    def __init__(self, step: int, reason: str, acted: bool = False):
+        super().__init__(f"Step {step}: {reason}")
+        self.step = step
+        self.reason = reason
+        # Whether the step's own action had started before it failed
+        self.acted = acted
+
+
+def side_effects_ran(steps: List[dict], diverged: ReplayDiverged) -> bool:
+    """Whether any step that may have executed before the divergence changes page or site state"""
+    ran = steps[: diverged.step + (1 if diverged.acted else 0)]
+    return any(step["action"] in SIDE_EFFECT_ACTIONS for step in ran)
+
+
+def replay_trace(driver, steps: List[dict], element_timeout: float = 5.0) -> int:
+    """Run recorded steps in a Selenium driver, checking the page before each one.
+
+    Returns the number of steps replayed; raises ``ReplayDiverged`` at the
+    first step whose page or target element does not match the recording,
+    or whose action fails (with ``acted`` set).
+    """
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    for index, step in enumerate(steps):
+        action, params = step["action"], step.get("params") or {}
+        if action == "done":
+            return index
+
+        expected_page = _page(step.get("url"))
+        element = None
+        try:
+            current_page = _page(driver.current_url)
+            if expected_page and action not in ("go_to_url", "open_tab") and current_page != expected_page:
+                raise ReplayDiverged(index, f"expected {expected_page}, browser is on {current_page}")
+            if step.get("xpath"):
+                element = WebDriverWait(driver, element_timeout).until(
+                    EC.presence_of_element_located((By.XPATH, step["xpath"]))
+                )
+        except TimeoutException:
+            raise ReplayDiverged(index, f"element {step['xpath']} not found")
+        except ReplayDiverged:
+            raise
+        except Exception as e:
+            raise ReplayDiverged(index, f"page check failed: {e}")
+
+        try:
+            if action in ("go_to_url", "open_tab"):
+                driver.get(params["url"])
+            elif action in ("click_element", "click_element_by_index"):
+                element.click()
+            elif action == "input_text":
+                element.clear()
+                element.send_keys(params.get("text", ""))
+            elif action == "send_keys":
+                keys = params.get("keys", "")
+                target = element or driver.switch_to.active_element
+                target.send_keys(getattr(Keys, keys.upper(), keys))
+            elif action in ("scroll_down", "scroll_up"):
+                amount = params.get("amount") or "window.innerHeight"
+                sign = "" if action == "scroll_down" else "-"
+                driver.execute_script(f"window.scrollBy(0, {sign}{amount});")
+            elif action == "wait":
+                time.sleep(min(float(params.get("seconds", 1)), 10))
+            elif action == "go_back":
+                driver.back()
+        except Exception as e:
+            raise ReplayDiverged(index, f"{action} failed: {e}", acted=True)
+    return len(steps)
+
+
+class TraceStore:
+    """SQLite table of action traces recorded from successful runs.
+
+    Traces are keyed by agent type and normalized instruction. A trace that
+    diverges ``max_failures`` times in a row is dropped so the next
+    successful LLM run can record a fresh one. The run's final result text
+    is kept with the trace and returned by replays. Methods are synchronous.
+    """
+
+    def __init__(self, path: str, max_failures: int = 3):
+        self.path = path
+        self.max_failures = max_failures
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Each thread uses only its own connection; close() shuts them all from one thread
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(action_traces)")}
+            if "result" not in columns:
+                conn.execute("ALTER TABLE action_traces ADD COLUMN result TEXT")
+
+    def close(self):
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
+
+    def get(self, key: str) -> Optional[dict]:
+        row = self._conn().execute("SELECT * FROM action_traces WHERE trace_key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        record["steps"] = json.loads(record["steps"])
+        return record
+
+    def save(
+        self,
+        key: str,
+        instruction: str,
+        steps: List[dict],
+        source_task_id: Optional[str] = None,
+        result: Optional[str] = None,
+    ):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO action_traces (trace_key, instruction, steps, source_task_id, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(trace_key) DO UPDATE SET "
+                "instruction = excluded.instruction, steps = excluded.steps, "
+                "source_task_id = excluded.source_task_id, result = excluded.result, "
+                "created_at = excluded.created_at, failures = 0",
+                (key, instruction, json.dumps(steps), source_task_id, result, time.time()),
+            )
+
+    def record_replay(self, key: str, succeeded: bool):
+        with self._conn() as conn:
+            if succeeded:
+                conn.execute("UPDATE action_traces SET replays = replays + 1, failures = 0 WHERE trace_key = ?", (key,))
+                return
+            conn.execute("UPDATE action_traces SET failures = failures + 1 WHERE trace_key = ?", (key,))
+            dropped = conn.execute(
+                "DELETE FROM action_traces WHERE trace_key = ? AND failures >= ?", (key, self.max_failures)
+            ).rowcount
+        if dropped:
+            logger.info(f"Dropped action trace {key[:12]} after {self.max_failures} failed replays")
+
+    def stats(self) -> dict:
+        row = self._conn().execute(
+            "SELECT COUNT(*) AS traces, COALESCE(SUM(replays), 0) AS replays FROM action_traces"
+        ).fetchone()
+        return dict(row)
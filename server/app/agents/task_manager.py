@@ -0,0 +1,461 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TaskStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    PAUSED = "paused"
+    COMPLETED = "completed"
+    ERROR = "error"
+    CANCELLED = "cancelled"
+    # Handed to a backend that reports no progress (Gradio, Selenium); the outcome is unknown
+    DISPATCHED = "dispatched"
+    # No backend took the instruction; the user has to run it in the web-ui
+    MANUAL_REQUIRED = "manual_required"
+
+
+TERMINAL_STATUSES = {
+    TaskStatus.COMPLETED, TaskStatus.ERROR, TaskStatus.CANCELLED, TaskStatus.DISPATCHED, TaskStatus.MANUAL_REQUIRED,
+}
+
+
+class QueueFullError(Exception):
+    """Raised when the submission queue has no room left"""
+
+
+class TaskNotFoundError(LookupError):
+    """Raised for an unknown task id"""
+
+
+class InvalidTaskStateError(Exception):
+    """Raised when an operation does not apply to the task's current state"""
+
+
+class TaskFailedError(Exception):
+    """Raised by a runner to finish its task with an error status"""
+
+
+class TaskHandedOff(Exception):
+    """Raised by a runner whose instruction left the bridge's sight; finishes the task with ``status``"""
+
+    def __init__(self, status: str, info: dict):
+        super().__init__(status)
+        self.status = status
+        self.info = info
+
+
+class Task:
+    def __init__(
+        self,
+        instruction: str,
+        agent_type: str,
+        agent_settings: dict,
+        browser_settings: dict,
+        priority: int = 0,
+        client_id: str = "anonymous",
+        weight: float = 1.0,
+        interactive: bool = False,
+    ):
+        self.task_id = f"task_{uuid.uuid4().hex}"
+        self.instruction = instruction
+        self.agent_type = agent_type
+        self.agent_settings = agent_settings
+        self.browser_settings = browser_settings
+        self.priority = priority
+        self.client_id = client_id
+        self.weight = weight
+        self.interactive = interactive
+        self.status = TaskStatus.QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.progress: Optional[str] = None
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.upstream_task_id: Optional[str] = None
+        # Progress updates the backend reported for this run; once nonzero the browser has acted
+        self.upstream_steps = 0
+        # Filled in by the runner once the instruction has reached a backend
+        self.dispatch_info: Optional[dict] = None
+        self.dispatched = asyncio.Event()
+        self._job: Optional[asyncio.Task] = None
+        self._cancel_requested = False
+        self._batch_slot = False
+
+    def mark_dispatched(self, info: dict):
+        self.dispatch_info = info
+        self.dispatched.set()
+
+    def to_dict(self) -> dict:
+        return {
+            "task_id": self.task_id,
+            "instruction": self.instruction,
+            "agent_type": self.agent_type,
+            "priority": self.priority,
+            "client_id": self.client_id,
+            "interactive": self.interactive,
+            "status": self.status,
+            "progress": self.progress,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "upstream_task_id": self.upstream_task_id,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+Runner = Callable[[Task], Awaitable[Optional[dict]]]
+UpdateListener = Callable[[dict], None]
+
+
+class TaskManager:
+    """Owns agent task lifecycle: queueing, execution, pause and cancellation.
+
+    Submissions wait in one of two bounded lanes and ``concurrency`` workers
+    run them through ``runner``. Interactive tasks always go first and
+    ``interactive_reserve`` workers are kept free of batch work for them.
+    Batch tasks are shared out by weighted fair queuing across ``client_id``
+    (each client's virtual finish time advances by ``1 / weight`` per task
+    it runs), so one client's backlog cannot starve the others; ``priority``
+    only orders tasks within a client's own queue, so it cannot buy a
+    client a bigger share. Cancelling a running task
+    cancels its runner coroutine, so the runner's own cleanup propagates the
+    stop upstream. Only queued tasks can be paused: the backends have no
+    pause, so a dispatched run could not be held anyway. A runner that has
+    to wait on something outside the bridge (LLM quota) does so inside
+    ``released``, which lends its worker to the queue until the wait ends.
+
+    Only a hot set is kept in memory: active tasks, plus finished ones until
+    they are older than ``finished_ttl`` or more than ``max_finished`` of
+    them exist. ``on_update`` receives a snapshot on every state change so a
+    store can keep the full history.
+    """
+
+    def __init__(
+        self,
+        runner: Runner,
+        concurrency: int = 4,
+        queue_size: int = 100,
+        on_update: Optional[UpdateListener] = None,
+        max_finished: int = 1000,
+        finished_ttl: float = 600.0,
+        interactive_reserve: int = 1,
+    ):
+        self.runner = runner
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.batch_concurrency = max(1, concurrency - interactive_reserve)
+        self.on_update = on_update
+        self.max_finished = max_finished
+        self.finished_ttl = finished_ttl
+        # Heap of (-priority, seq, task_id)
+        self._interactive: list = []
+        # Heap of (virtual finish, seq, client_id) with one entry per client that has queued batch tasks
+        self._batch: list = []
+        # client_id -> heap of (-priority, seq, task_id)
+        self._client_queues: Dict[str, list] = {}
+        self._batch_pending = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running_batch = 0
+        self._virtual_time = 0.0
+        self._client_finish: Dict[str, float] = {}
+        self._started = False
+        self._tasks: Dict[str, Task] = {}
+        # task_id -> finished_at, oldest first
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self._held: Set[str] = set()
+        self._workers: List[asyncio.Task] = []
+        self._seq = itertools.count()
+        self._stopping = False
+        # Runs that lent out their worker and now want one back, oldest first: (future, needs batch slot)
+        self._returning: deque = deque()
+        # Workers to retire because a lent-out run ended without taking one back
+        self._surplus = 0
+
+    async def start(self):
+        if self._workers:
+            return
+        self._wakeup = asyncio.Event()
+        self._started = True
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        logger.info(f"Task manager started with {self.concurrency} workers")
+
+    @asynccontextmanager
+    async def released(self, task: Task):
+        """Let queued tasks use ``task``'s worker for the duration of the block.
+
+        A stand-in worker starts on entry; on exit the task waits for the next
+        worker to come free, ahead of anything still queued.
+        """
+        if self._stopping or task._job is None:
+            yield
+            return
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        self._workers.append(asyncio.create_task(self._worker()))
+        if task._batch_slot:
+            self._running_batch -= 1
+        self._wakeup.set()
+        reclaimed = asyncio.get_running_loop().create_future()
+        try:
+            yield
+            self._returning.append((reclaimed, task._batch_slot))
+            self._wakeup.set()
+            await reclaimed
+        except BaseException:
+            if not reclaimed.done() or reclaimed.cancelled():
+                # No worker retired for us: put the count back and let one retire later
+                reclaimed.cancel()
+                self._surplus += 1
+                if task._batch_slot:
+                    self._running_batch += 1
+                self._wakeup.set()
+            raise
+
+    def _hand_back(self) -> bool:
+        """Give this worker's slot to the oldest lent-out run that may take it"""
+        for entry in list(self._returning):
+            reclaimed, batch_slot = entry
+            if reclaimed.done():
+                self._returning.remove(entry)
+                continue
+            if batch_slot and self._running_batch >= self.batch_concurrency:
+                continue
+            self._returning.remove(entry)
+            if batch_slot:
+                self._running_batch += 1
+            reclaimed.set_result(None)
+            return True
+        return False
+
+    async def stop(self):
+        self._stopping = True
+        for task in self._tasks.values():
+            if task._job is not None and not task._job.done():
+                task._cancel_requested = True
+                task._job.cancel()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(
+        self,
+        instruction: str,
+        agent_type: str,
+        agent_settings: dict,
+        browser_settings: dict,
+        priority: int = 0,
+        client_id: str = "anonymous",
+        weight: float = 1.0,
+        interactive: bool = False,
+    ) -> Task:
+        if not self._started:
+            raise RuntimeError("Task manager is not started")
+        pending = len(self._interactive) if interactive else self._batch_pending
+        if pending >= self.queue_size:
+            raise QueueFullError(f"Task queue is full ({self.queue_size} pending)")
+        task = Task(
+            instruction, agent_type, agent_settings, browser_settings, priority,
+            client_id=client_id, weight=weight, interactive=interactive,
+        )
+        self._enqueue(task)
+        self._tasks[task.task_id] = task
+        self.touch(task)
+        self._evict_finished()
+        return task
+
+    def touch(self, task: Task):
+        """Report a change to the task's state to the update listener"""
+        if self.on_update is not None:
+            self.on_update(task.to_dict())
+
+    def _evict_finished(self):
+        cutoff = time.time() - self.finished_ttl
+        while self._finished:
+            task_id, finished_at = next(iter(self._finished.items()))
+            if len(self._finished) <= self.max_finished and finished_at >= cutoff:
+                break
+            self._finished.popitem(last=False)
+            self._tasks.pop(task_id, None)
+
+    def _enqueue(self, task: Task):
+        if task.interactive:
+            heapq.heappush(self._interactive, (-task.priority, next(self._seq), task.task_id))
+        else:
+            queue = self._client_queues.get(task.client_id)
+            if queue is None:
+                # The client just became backlogged: schedule it from the current virtual time
+                queue = self._client_queues[task.client_id] = []
+                start = max(self._virtual_time, self._client_finish.get(task.client_id, 0.0))
+                finish = self._client_finish[task.client_id] = start + 1.0 / max(task.weight, 1e-6)
+                heapq.heappush(self._batch, (finish, next(self._seq), task.client_id))
+            heapq.heappush(queue, (-task.priority, next(self._seq), task.task_id))
+            self._batch_pending += 1
+        self._wakeup.set()
+
+    def _pop_batch(self) -> str:
+        """Highest-priority task of the client with the earliest virtual finish time"""
+        finish, _, client = heapq.heappop(self._batch)
+        queue = self._client_queues[client]
+        task_id = heapq.heappop(queue)[2]
+        self._batch_pending -= 1
+        if finish > self._virtual_time:
+            self._virtual_time = finish
+        if queue:
+            task = self._tasks.get(queue[0][2])
+            weight = task.weight if task is not None else 1.0
+            finish = self._client_finish[client] = finish + 1.0 / max(weight, 1e-6)
+            heapq.heappush(self._batch, (finish, next(self._seq), client))
+        else:
+            del self._client_queues[client]
+        return task_id
+
+    def _pick(self) -> Tuple[Optional[str], bool]:
+        """Next task id a free worker may run (None if it must wait) and whether it holds a batch slot"""
+        if self._interactive:
+            return heapq.heappop(self._interactive)[2], False
+        if self._batch and self._running_batch < self.batch_concurrency:
+            task_id = self._pop_batch()
+            self._running_batch += 1
+            if len(self._client_finish) > 1000:
+                # Clients that are caught up need no history
+                self._client_finish = {
+                    client: tag for client, tag in self._client_finish.items()
+                    if tag > self._virtual_time or client in self._client_queues
+                }
+            return task_id, True
+        return None, False
+
+    def get(self, task_id: str) -> Task:
+        task = self._tasks.get(task_id)
+        if task is None:
+            raise TaskNotFoundError(task_id)
+        return task
+
+    def find(self, task_id: str) -> Optional[Task]:
+        return self._tasks.get(task_id)
+
+    def list(self) -> List[Task]:
+        return list(self._tasks.values())
+
+    def stats(self) -> dict:
+        counts: Dict[str, int] = {}
+        for task in self._tasks.values():
+            counts[task.status] = counts.get(task.status, 0) + 1
+        return {
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "queued": len(self._interactive) + self._batch_pending,
+            "queued_interactive": len(self._interactive),
+            "running_batch": self._running_batch,
+            "batch_concurrency": self.batch_concurrency,
+            "tasks": counts,
+        }
+
+    async def cancel(self, task_id: str) -> Task:
+        task = self.get(task_id)
+        if task.status in TERMINAL_STATUSES:
+            raise InvalidTaskStateError(f"Task is already {task.status}")
+        task._cancel_requested = True
+        if task._job is not None and not task._job.done():
+            task._job.cancel()
+            # Let the runner finish its cleanup before reporting back
+            await asyncio.gather(task._job, return_exceptions=True)
+        else:
+            self._held.discard(task_id)
+            self._finish(task, TaskStatus.CANCELLED)
+        return task
+
+    def pause(self, task_id: str) -> Task:
+        task = self.get(task_id)
+        if task.status == TaskStatus.RUNNING:
+            raise InvalidTaskStateError("Cannot pause a running task; it has already been dispatched")
+        if task.status != TaskStatus.QUEUED:
+            raise InvalidTaskStateError(f"Cannot pause a {task.status} task")
+        task.status = TaskStatus.PAUSED
+        self.touch(task)
+        return task
+
+    def resume(self, task_id: str) -> Task:
+        task = self.get(task_id)
+        if task.status != TaskStatus.PAUSED:
+            raise InvalidTaskStateError(f"Cannot resume a {task.status} task")
+        task.status = TaskStatus.QUEUED
+        if task_id in self._held:
+            # A worker already skipped it; queue it again
+            self._held.discard(task_id)
+            self._enqueue(task)
+        self.touch(task)
+        return task
+
+    async def _worker(self):
+        while True:
+            if self._surplus:
+                self._surplus -= 1
+                return
+            if self._hand_back():
+                return
+            task_id, batch_slot = self._pick()
+            if task_id is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            task = self._tasks.get(task_id)
+            try:
+                if task is None or task.status in TERMINAL_STATUSES:
+                    continue
+                if task.status == TaskStatus.PAUSED:
+                    # Park paused tasks instead of blocking a worker on them
+                    self._held.add(task_id)
+                    continue
+                task._batch_slot = batch_slot
+                await self._run(task)
+            finally:
+                if batch_slot:
+                    self._running_batch -= 1
+                    # A batch slot opened up for waiting workers
+                    self._wakeup.set()
+
+    async def _run(self, task: Task):
+        task.status = TaskStatus.RUNNING
+        task.started_at = time.time()
+        task._job = asyncio.create_task(self.runner(task))
+        self.touch(task)
+        try:
+            result = await task._job
+            self._finish(task, TaskStatus.COMPLETED, result=result)
+        except asyncio.CancelledError:
+            self._finish(task, TaskStatus.CANCELLED)
+            if self._stopping or not task._cancel_requested:
+                raise
+        except TaskHandedOff as e:
+            self._finish(task, e.status, result=e.info)
+        except TaskFailedError as e:
+            self._finish(task, TaskStatus.ERROR, error=str(e))
+        except Exception as e:
+            logger.exception(f"Task {task.task_id} failed")
+            self._finish(task, TaskStatus.ERROR, error=str(e))
+
+    def _finish(self, task: Task, status: str, result: Optional[dict] = None, error: Optional[str] = None):
+        task.status = status
+        task.finished_at = time.time()
+        if result is not None:
+            task.result = result
+        if error is not None:
+            task.error = error
+        # Wake anyone still waiting for dispatch
+        task.dispatched.set()
+        self._finished[task.task_id] = task.finished_at
+        self.touch(task)
+        self._evict_finished()
@@ -0,0 +1,444 @@
+import base64
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running", "paused")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    instruction TEXT NOT NULL,
+    agent_type TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    progress TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    upstream_task_id TEXT,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    owner TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_agent_type ON tasks (agent_type, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at DESC, task_id DESC);
+
+CREATE TABLE IF NOT EXISTS task_events (
+    task_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    progress TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (task_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    heartbeat_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS task_controls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    action TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_task_controls_owner ON task_controls (owner, id);
+"""
+
+TASK_COLUMNS = (
+    "task_id", "instruction", "agent_type", "priority", "status", "progress", "created_at",
+    "started_at", "finished_at", "upstream_task_id", "result", "error", "updated_at", "owner",
+)
+
+UPSERT_TASK = f"""
+INSERT INTO tasks ({", ".join(TASK_COLUMNS)})
+VALUES ({", ".join("?" for _ in TASK_COLUMNS)})
+ON CONFLICT(task_id) DO UPDATE SET
+    {", ".join(f"{column} = excluded.{column}" for column in TASK_COLUMNS[1:])}
+"""
+
+INSERT_EVENT = """
+INSERT INTO task_events (task_id, seq, status, progress, error, created_at)
+VALUES (?, COALESCE((SELECT MAX(seq) FROM task_events WHERE task_id = ?), 0) + 1, ?, ?, ?, ?)
+"""
+
+
+CONTROL_ACTIONS = ("cancel", "pause", "resume")
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def encode_cursor(created_at: float, task_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at!r}|{task_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        created_at, task_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return float(created_at), task_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class TaskStore:
+    """Embedded SQLite (WAL) store for task records and their state history.
+
+    ``save`` only records the latest snapshot in memory; a writer thread
+    flushes pending snapshots in one transaction every ``flush_interval``
+    seconds, so request handlers never wait on disk. Reads are synchronous
+    and meant to be run in a worker thread.
+
+    Several bridge processes can share one database. Each stamps the tasks
+    it runs with its ``worker_id`` and heartbeats from the writer thread;
+    active tasks of a worker whose heartbeat is older than ``worker_lease``
+    are failed, and cancel/pause/resume requests for another worker's task
+    are queued in ``task_controls`` for that worker to pick up.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = 0.5,
+        worker_id: Optional[str] = None,
+        worker_lease: float = 30.0,
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.worker_id = worker_id or default_worker_id()
+        self.worker_lease = worker_lease
+        self._last_sweep = 0.0
+        self._pending: Dict[str, dict] = {}
+        # Every distinct (status, progress, error) becomes a step log entry, even between flushes
+        self._pending_events: List[tuple] = []
+        self._last_event: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._running = False
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(tasks)")}
+            if "owner" not in columns:
+                conn.execute("ALTER TABLE tasks ADD COLUMN owner TEXT")
+            self._heartbeat(conn)
+        self._sweep(conn)
+        conn.close()
+        self._running = True
+        self._writer = threading.Thread(target=self._write_loop, name="task-store-writer", daemon=True)
+        self._writer.start()
+
+    def close(self):
+        self._running = False
+        self._wakeup.set()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        self.flush()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM workers WHERE worker_id = ?", (self.worker_id,))
+        finally:
+            conn.close()
+
+    def save(self, record: dict):
+        """Queue the latest snapshot of a task, and its step log entry if it changed, for the next batched write"""
+        task_id = record["task_id"]
+        key = (record["status"], record.get("progress"), record.get("error"))
+        with self._lock:
+            self._pending[task_id] = record
+            if self._last_event.get(task_id) != key:
+                self._pending_events.append((task_id, task_id, *key, time.time()))
+                if record["status"] in ACTIVE_STATUSES:
+                    self._last_event[task_id] = key
+                else:
+                    self._last_event.pop(task_id, None)
+
+    def _write_loop(self):
+        conn = self._connect()
+        try:
+            while self._running:
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                self._flush(conn)
+                try:
+                    with conn:
+                        self._heartbeat(conn)
+                except sqlite3.Error as e:
+                    logger.error(f"Failed to record worker heartbeat: {e}")
+                if time.time() - self._last_sweep >= self.worker_lease / 2:
+                    self._sweep(conn)
+        finally:
+            conn.close()
+
+    def _heartbeat(self, conn: sqlite3.Connection):
+        conn.execute(
+            "INSERT INTO workers (worker_id, heartbeat_at) VALUES (?, ?) "
+            "ON CONFLICT(worker_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at",
+            (self.worker_id, time.time()),
+        )
+
+    def _sweep(self, conn: sqlite3.Connection):
+        """Fail active tasks whose worker stopped heartbeating; they cannot be resumed"""
+        now = time.time()
+        self._last_sweep = now
+        try:
+            with conn:
+                interrupted = conn.execute(
+                    f"UPDATE tasks SET status = 'error', error = 'Bridge worker stopped before the task finished', "
+                    f"finished_at = ?, updated_at = ? WHERE status IN ({', '.join('?' for _ in ACTIVE_STATUSES)}) "
+                    f"AND (owner IS NULL OR owner NOT IN (SELECT worker_id FROM workers WHERE heartbeat_at >= ?))",
+                    (now, now, *ACTIVE_STATUSES, now - self.worker_lease),
+                ).rowcount
+                conn.execute("DELETE FROM workers WHERE heartbeat_at < ?", (now - self.worker_lease,))
+                conn.execute(
+                    "DELETE FROM task_controls WHERE owner NOT IN (SELECT worker_id FROM workers)"
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to sweep interrupted tasks: {e}")
+            return
+        if interrupted:
+            logger.info(f"Marked {interrupted} interrupted tasks as failed")
+
+    def flush(self):
+        conn = self._connect()
+        try:
+            self._flush(conn)
+        finally:
+            conn.close()
+
+    def _flush(self, conn: sqlite3.Connection):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            events, self._pending_events = self._pending_events, []
+        if not pending and not events:
+            return
+        now = time.time()
+        rows = []
+        for record in pending.values():
+            rows.append((
+                record["task_id"], record["instruction"], record["agent_type"], record.get("priority", 0),
+                record["status"], record.get("progress"), record["created_at"], record.get("started_at"),
+                record.get("finished_at"), record.get("upstream_task_id"),
+                json.dumps(record["result"]) if record.get("result") is not None else None,
+                record.get("error"), now, self.worker_id,
+            ))
+        try:
+            with conn:
+                conn.executemany(UPSERT_TASK, rows)
+                conn.executemany(INSERT_EVENT, events)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to persist {len(rows)} tasks: {e}")
+
+    def _row_to_record(self, row: sqlite3.Row) -> dict:
+        record = dict(row)
+        record.pop("updated_at", None)
+        if record.get("result") is not None:
+            record["result"] = json.loads(record["result"])
+        return record
+
+    def get(self, task_id: str) -> Optional[dict]:
+        with self._lock:
+            pending = self._pending.get(task_id)
+        if pending is not None:
+            return {**pending, "owner": self.worker_id}
+        row = self._reader().execute("SELECT * FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def list(
+        self,
+        status: Optional[str] = None,
+        agent_type: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Newest-first page of tasks, keyset-paginated on (created_at, task_id)"""
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if agent_type:
+            clauses.append("agent_type = ?")
+            params.append(agent_type)
+        if cursor:
+            created_at, task_id = decode_cursor(cursor)
+            clauses.append("(created_at < ? OR (created_at = ? AND task_id < ?))")
+            params.extend([created_at, created_at, task_id])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT * FROM tasks {where} ORDER BY created_at DESC, task_id DESC LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+        records = [self._row_to_record(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = records[-1]
+            next_cursor = encode_cursor(last["created_at"], last["task_id"])
+        return records, next_cursor
+
+    def history(self, task_id: str) -> List[dict]:
+        rows = self._reader().execute(
+            "SELECT seq, status, progress, error, created_at FROM task_events WHERE task_id = ? ORDER BY seq",
+            (task_id,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def steps(self, task_id: str, since: int = 0, limit: int = 200) -> Tuple[List[dict], int]:
+        """Step log entries with ``seq > since``, oldest first, and the latest seq in the log"""
+        conn = self._reader()
+        rows = conn.execute(
+            "SELECT seq, status, progress, error, created_at FROM task_events "
+            "WHERE task_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+            (task_id, since, limit),
+        ).fetchall()
+        last_seq = conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM task_events WHERE task_id = ?", (task_id,)
+        ).fetchone()[0]
+        return [dict(row) for row in rows], last_seq
+
+    def request_control(self, task_id: str, owner: str, action: str):
+        """Ask the worker that owns a task to cancel, pause or resume it"""
+        if action not in CONTROL_ACTIONS:
+            raise ValueError(f"Unknown control action '{action}'")
+        with self._reader() as conn:
+            conn.execute(
+                "INSERT INTO task_controls (task_id, owner, action, created_at) VALUES (?, ?, ?, ?)",
+                (task_id, owner, action, time.time()),
+            )
+
+    def take_controls(self) -> List[Tuple[str, str]]:
+        """Pop the (task_id, action) requests other workers queued for this one, oldest first"""
+        conn = self._reader()
+        with conn:
+            rows = conn.execute(
+                "SELECT id, task_id, action FROM task_controls WHERE owner = ? ORDER BY id", (self.worker_id,)
+            ).fetchall()
+            if rows:
+                conn.execute("DELETE FROM task_controls WHERE owner = ? AND id <= ?", (self.worker_id, rows[-1]["id"]))
+        return [(row["task_id"], row["action"]) for row in rows]
+
+
+class MemoryTaskStore:
+    """In-process stand-in for ``TaskStore`` with the same interface.
+
+    For tests and single-worker runs without a database: several task
+    managers in one process can share an instance, each through a view
+    from ``for_worker``, to exercise cross-worker reads and controls.
+    """
+
+    def __init__(self, worker_id: Optional[str] = None, shared: Optional["MemoryTaskStore"] = None):
+        self.worker_id = worker_id or default_worker_id()
+        if shared is not None:
+            self._tasks, self._events, self._controls = shared._tasks, shared._events, shared._controls
+            self._lock = shared._lock
+        else:
+            self._tasks: Dict[str, dict] = {}
+            self._events: Dict[str, List[dict]] = {}
+            self._controls: List[Tuple[str, str, str]] = []
+            self._lock = threading.Lock()
+
+    def for_worker(self, worker_id: str) -> "MemoryTaskStore":
+        return MemoryTaskStore(worker_id, shared=self)
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def save(self, record: dict):
+        with self._lock:
+            self._tasks[record["task_id"]] = {**record, "owner": self.worker_id}
+            events = self._events.setdefault(record["task_id"], [])
+            key = (record["status"], record.get("progress"), record.get("error"))
+            if not events or (events[-1]["status"], events[-1]["progress"], events[-1]["error"]) != key:
+                events.append({
+                    "seq": len(events) + 1, "status": key[0], "progress": key[1], "error": key[2],
+                    "created_at": time.time(),
+                })
+
+    def get(self, task_id: str) -> Optional[dict]:
+        with self._lock:
+            record = self._tasks.get(task_id)
+            return dict(record) if record is not None else None
+
+    def list(
+        self,
+        status: Optional[str] = None,
+        agent_type: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        after = decode_cursor(cursor) if cursor else None
+        with self._lock:
+            records = sorted(self._tasks.values(), key=lambda r: (r["created_at"], r["task_id"]), reverse=True)
+        records = [
+            dict(record) for record in records
+            if (not status or record["status"] == status)
+            and (not agent_type or record["agent_type"] == agent_type)
+            and (after is None or (record["created_at"], record["task_id"]) < after)
+        ]
+        next_cursor = None
+        if len(records) > limit:
+            last = records[limit - 1]
+            next_cursor = encode_cursor(last["created_at"], last["task_id"])
+        return records[:limit], next_cursor
+
+    def history(self, task_id: str) -> List[dict]:
+        with self._lock:
+            return [dict(event) for event in self._events.get(task_id, [])]
+
+    def steps(self, task_id: str, since: int = 0, limit: int = 200) -> Tuple[List[dict], int]:
+        with self._lock:
+            events = self._events.get(task_id, [])
+            return [dict(event) for event in events[since:since + limit]], len(events)
+
+    def request_control(self, task_id: str, owner: str, action: str):
+        if action not in CONTROL_ACTIONS:
+            raise ValueError(f"Unknown control action '{action}'")
+        with self._lock:
+            self._controls.append((task_id, owner, action))
+
+    def take_controls(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            mine = [(task_id, action) for task_id, owner, action in self._controls if owner == self.worker_id]
+            self._controls[:] = [control for control in self._controls if control[1] != self.worker_id]
+        return mine
@@ -1,65 +1,284 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
-from typing import Optional
+from typing import AsyncIterator, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
 import uuid
 import logging
 import os
+import re
+from datetime import datetime, timezone
+
+from app.speech.service import transcription_service
+
+try:
+    from python_multipart import MultipartParser
+    from python_multipart.multipart import parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+UPLOAD_FIELD = "file"
+
+# The upload body is parsed by hand, so describe it for the OpenAPI docs
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {UPLOAD_FIELD: {"type": "string", "format": "binary"}},
+                    "required": [UPLOAD_FIELD],
+                }
+            },
+            "audio/*": {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
 class AudioUploadResponse(BaseModel):
     audio_id: str
     transcript: str
     message: str
+    size: int = 0
+    duplicate: bool = False
+    transcription_status: str = "completed"
+    latency_ms: Optional[dict] = None
+    cached: bool = False
+
+def _safe_extension(filename: Optional[str]) -> str:
+    extension = os.path.splitext(filename or "")[1].lower()
+    return extension if re.fullmatch(r"\.[a-z0-9]{1,8}", extension) else ""
+
+def _meta_path(file_path: str) -> str:
+    return f"{file_path}.json"
+
+def _write_meta(file_path: str, meta: dict):
+    """Sidecar with the name and type the clip was first uploaded with"""
+    temp_path = f"{file_path}.{uuid.uuid4().hex}.part"
+    with open(temp_path, "w") as sidecar:
+        json.dump({
+            "filename": meta.get("filename"),
+            "content_type": meta.get("content_type"),
+            "extension": _safe_extension(meta.get("filename")),
+        }, sidecar)
+    os.replace(temp_path, _meta_path(file_path))
+
+class _FilePartReader:
+    """Multipart parser callbacks that collect the bytes of the ``file`` part as they are parsed"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.found = False
+        self.done = False
+        self._headers = {}
+        self._field = b""
+        self._value = b""
+        self._in_file = False
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._part_begin,
+            "on_header_field": self._header_field,
+            "on_header_value": self._header_value,
+            "on_header_end": self._header_end,
+            "on_headers_finished": self._headers_finished,
+            "on_part_data": self._part_data,
+            "on_part_end": self._part_end,
+        }
+
+    def _part_begin(self):
+        self._headers = {}
+        self._in_file = False
+
+    def _header_field(self, data: bytes, start: int, end: int):
+        self._field += data[start:end]
+
+    def _header_value(self, data: bytes, start: int, end: int):
+        self._value += data[start:end]
+
+    def _header_end(self):
+        self._headers[self._field.lower()] = self._value
+        self._field = self._value = b""
+
+    def _headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if self.found or options.get(b"name") != UPLOAD_FIELD.encode():
+            return
+        self.found = self._in_file = True
+        filename = options.get(b"filename")
+        self.filename = filename.decode(errors="replace") if filename else None
+        self.content_type = self._headers.get(b"content-type", b"").decode(errors="replace") or None
+
+    def _part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self.chunks.append(data[start:end])
 
-@router.post("/upload", response_model=AudioUploadResponse)
-async def upload_audio(file: UploadFile = File(...)):
-    """Upload audio file and return transcript (placeholder implementation)"""
+    def _part_end(self):
+        if self._in_file:
+            self._in_file = False
+            self.done = True
+
+    def take(self) -> List[bytes]:
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+def _require_audio(content_type: Optional[str]):
+    if not content_type or not content_type.startswith("audio/"):
+        raise HTTPException(status_code=400, detail="File must be an audio file")
+
+async def stream_audio(request: Request, meta: dict, max_bytes: int = MAX_UPLOAD_BYTES) -> AsyncIterator[bytes]:
+    """Yield an uploaded clip's bytes as they arrive from the client.
+
+    Accepts either a raw ``audio/*`` body or a multipart form with a ``file``
+    part; the form is parsed incrementally, so nothing is spooled first.
+    ``meta`` gets the clip's ``filename`` and ``content_type`` before the
+    first chunk is yielded.
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    declared_size = request.headers.get("content-length")
+    if content_type.startswith(b"audio/"):
+        meta["content_type"] = content_type.decode()
+        meta["filename"] = request.headers.get("x-filename")
+        if declared_size and declared_size.isdigit() and int(declared_size) > max_bytes:
+            raise HTTPException(status_code=413, detail=f"File exceeds {max_bytes} bytes")
+        async for chunk in request.stream():
+            if chunk:
+                yield chunk
+        return
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise HTTPException(status_code=400, detail="Send the audio as a multipart 'file' field or as an audio/* body")
+
+    reader = _FilePartReader()
+    parser = MultipartParser(options[b"boundary"], reader.callbacks())
+    async for body in request.stream():
+        try:
+            parser.write(body)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Malformed multipart body: {e}")
+        if reader.found and "content_type" not in meta:
+            _require_audio(reader.content_type)
+            meta["content_type"] = reader.content_type
+            meta["filename"] = reader.filename
+        for chunk in reader.take():
+            yield chunk
+        if reader.done:
+            # The rest of the form is of no interest
+            return
+    if not reader.found:
+        raise HTTPException(status_code=400, detail=f"Missing '{UPLOAD_FIELD}' field")
+    raise HTTPException(status_code=400, detail="Upload ended before the file was complete")
+
+async def save_upload(
+    chunks: AsyncIterator[bytes],
+    meta: dict,
+    upload_dir: str = UPLOAD_DIR,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+) -> Tuple[str, str, int, bool]:
+    """Write an upload to disk as it streams in, hashing it on the way.
+
+    The size cap is enforced as bytes arrive, so an oversized upload is cut
+    off rather than received in full. Files are stored under their SHA-256
+    alone, so identical uploads share one copy whatever their file name; the
+    name, type and extension of the first upload go in a ``.json`` sidecar.
+    Returns ``(digest, path, size, duplicate)``.
+    """
+    os.makedirs(upload_dir, exist_ok=True)
+    temp_path = os.path.join(upload_dir, f".{uuid.uuid4().hex}.part")
+    hasher = hashlib.sha256()
+    size = 0
+    
+    buffer = await asyncio.to_thread(open, temp_path, "wb")
     try:
-        # Validate file type
-        if not file.content_type or not file.content_type.startswith('audio/'):
-            raise HTTPException(status_code=400, detail="File must be an audio file")
-        
-        # Generate unique audio ID
-        audio_id = str(uuid.uuid4())
-        
-        # Create uploads directory if it doesn't exist
-        upload_dir = "uploads"
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # Save file
-        file_path = os.path.join(upload_dir, f"{audio_id}_{file.filename}")
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=f"File exceeds {max_bytes} bytes")
+            hasher.update(chunk)
+            await asyncio.to_thread(buffer.write, chunk)
+        await asyncio.to_thread(buffer.close)
+    except BaseException:
+        await asyncio.to_thread(buffer.close)
+        await asyncio.to_thread(os.remove, temp_path)
+        raise
+    
+    digest = hasher.hexdigest()
+    file_path = os.path.join(upload_dir, digest)
+    duplicate = os.path.exists(file_path)
+    if duplicate:
+        await asyncio.to_thread(os.remove, temp_path)
+    else:
+        await asyncio.to_thread(_write_meta, file_path, meta)
+        await asyncio.to_thread(os.replace, temp_path, file_path)
+    return digest, file_path, size, duplicate
+
+@router.post("/upload", response_model=AudioUploadResponse, openapi_extra=UPLOAD_REQUEST_BODY)
+async def upload_audio(request: Request):
+    """Upload audio file and return its transcript"""
+    try:
+        # Content-addressed: the audio ID is the file's SHA-256. The body is read
+        # straight off the connection; a non-audio part is rejected before it is stored
+        meta = {}
+        audio_id, file_path, size, duplicate = await save_upload(stream_audio(request, meta), meta)
         
-        logger.info(f"Uploaded audio file: {file_path}")
+        logger.info(f"Uploaded audio file: {file_path} ({size} bytes{', duplicate' if duplicate else ''})")
         
-        # TODO: Implement actual speech-to-text transcription
-        # For now, return a placeholder transcript
-        transcript = "This is a placeholder transcript. Implement speech-to-text service here."
+        # Served from the transcript cache on a hit, otherwise transcribed on the process pool
+        job = await transcription_service.transcribe(audio_id, file_path, size)
         
         return AudioUploadResponse(
             audio_id=audio_id,
-            transcript=transcript,
-            message="Audio uploaded successfully"
+            transcript=job.transcript or "",
+            message="Audio uploaded successfully" if job.status == "completed" else f"Audio uploaded, transcription failed: {job.error}",
+            size=size,
+            duplicate=duplicate,
+            transcription_status=job.status,
+            latency_ms=job.to_dict()["latency_ms"],
+            cached=job.cached
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading audio: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def find_upload(audio_id: str, upload_dir: str = UPLOAD_DIR) -> Optional[str]:
+    """Locate a stored upload by its content hash"""
+    if not re.fullmatch(r"[0-9a-f]{64}", audio_id):
+        return None
+    file_path = os.path.join(upload_dir, audio_id)
+    return file_path if os.path.isfile(file_path) else None
+
+def read_upload_meta(file_path: str) -> dict:
+    """Sidecar metadata of a stored upload; empty if it has none"""
+    try:
+        with open(_meta_path(file_path)) as sidecar:
+            return json.load(sidecar)
+    except (OSError, ValueError):
+        return {}
+
 @router.get("/audio/{audio_id}")
 async def get_audio_info(audio_id: str):
     """Get information about an uploaded audio file"""
-    # This would typically query a database
-    # For now, return placeholder info
-    return {
-        "audio_id": audio_id,
-        "status": "processed",
-        "transcript": "Placeholder transcript",
-        "created_at": "2024-01-01T00:00:00Z"
-    }
-
+    file_path = await asyncio.to_thread(find_upload, audio_id)
+    job = transcription_service.get_job(audio_id) or await transcription_service.lookup(audio_id)
+    if file_path is None and job is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    
+    info = job.to_dict() if job else {"audio_id": audio_id, "status": "uploaded", "transcript": None}
+    if file_path is not None:
+        stat = await asyncio.to_thread(os.stat, file_path)
+        info.update(await asyncio.to_thread(read_upload_meta, file_path))
+        info["size"] = stat.st_size
+        info["created_at"] = datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()
+    return info
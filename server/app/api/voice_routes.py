@@ -0,0 +1,226 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
+from typing import Optional, Set
+import asyncio
+import json
+import logging
+import os
+
+import numpy as np
+
+from app.speech.preprocess import TARGET_SAMPLE_RATE, EndpointDetector, Resampler, trim_silence
+from app.speech.service import transcription_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+PARTIAL_INTERVAL = float(os.getenv("VOICE_PARTIAL_INTERVAL", "1.0"))
+END_SILENCE_MS = int(os.getenv("VOICE_END_SILENCE_MS", "700"))
+MAX_UTTERANCE_SECONDS = float(os.getenv("VOICE_MAX_UTTERANCE_SECONDS", "30"))
+
+class VoiceSession:
+    """Buffers one utterance of streamed PCM and tracks when it ends"""
+
+    def __init__(self, sample_rate: int = TARGET_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        # One resampler for the whole stream, so chunk boundaries do not reset its filter
+        self.resampler = Resampler(sample_rate)
+        self.detector = EndpointDetector(TARGET_SAMPLE_RATE, end_silence_ms=END_SILENCE_MS)
+        self.options: dict = {}
+        self.auto_submit = True
+        self.reset()
+
+    def reset(self):
+        self._chunks = []
+        self.length = 0
+        self.partial_at = 0
+        self.detector.reset()
+
+    @property
+    def duration(self) -> float:
+        return self.length / TARGET_SAMPLE_RATE
+
+    def configure(self, message: dict):
+        """Apply a config message; raises ValueError, leaving the session unchanged, if it is invalid"""
+        sample_rate = message.get("sample_rate", self.sample_rate)
+        try:
+            sample_rate = int(sample_rate)
+        except (TypeError, ValueError):
+            raise ValueError(f"sample_rate must be a positive integer, got {sample_rate!r}")
+        if sample_rate <= 0:
+            raise ValueError(f"sample_rate must be a positive integer, got {sample_rate}")
+        if sample_rate != self.sample_rate:
+            self.sample_rate = sample_rate
+            self.resampler = Resampler(sample_rate)
+        self.auto_submit = bool(message.get("auto_submit", self.auto_submit))
+        for field in ("agent_type", "agent_settings", "browser_settings", "config_ref", "priority"):
+            if field in message:
+                self.options[field] = message[field]
+
+    def push(self, data: bytes) -> bool:
+        """Append little-endian 16-bit mono PCM; returns True at end of utterance"""
+        samples = np.frombuffer(data[: len(data) - len(data) % 2], dtype="<i2").astype(np.float32) / 32768.0
+        samples = self.resampler.push(samples)
+        self._chunks.append(samples)
+        self.length += len(samples)
+        return self.detector.push(samples) or self.duration >= MAX_UTTERANCE_SECONDS
+
+    def flush(self):
+        """Append the resampler's tail at the end of the stream, and start the next one fresh"""
+        tail = self.resampler.flush()
+        self._chunks.append(tail)
+        self.length += len(tail)
+        self.resampler = Resampler(self.sample_rate)
+
+    def samples(self) -> np.ndarray:
+        if len(self._chunks) > 1:
+            self._chunks = [np.concatenate(self._chunks)]
+        return self._chunks[0] if self._chunks else np.zeros(0, dtype=np.float32)
+
+    def take_utterance(self) -> np.ndarray:
+        samples = self.samples()
+        self.reset()
+        return samples
+
+async def _send_partial(websocket: WebSocket, samples: np.ndarray):
+    try:
+        result = await transcription_service.transcribe_samples(samples, TARGET_SAMPLE_RATE)
+        await websocket.send_json({"type": "partial", "transcript": result["transcript"], "audio_seconds": round(len(samples) / TARGET_SAMPLE_RATE, 2)})
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning(f"Partial transcription failed: {e}")
+
+async def _config_ref_exists(websocket: WebSocket, config_ref: str) -> bool:
+    find_config_preset = getattr(websocket.app.state, "find_config_preset", None)
+    if find_config_preset is None:
+        # Left to the agent start path to resolve
+        return True
+    return await find_config_preset(config_ref) is not None
+
+async def _finish_utterance(
+    websocket: WebSocket,
+    samples: np.ndarray,
+    options: dict,
+    auto_submit: bool,
+    previous: Optional[asyncio.Task] = None,
+):
+    """Transcribe one utterance and dispatch it; runs beside the receive loop.
+
+    Utterances are transcribed concurrently, but each waits for ``previous``
+    before replying so finals and dispatches keep the order they were spoken in.
+    """
+    trimmed = trim_silence(samples, TARGET_SAMPLE_RATE)
+    try:
+        result = await transcription_service.transcribe_samples(trimmed, TARGET_SAMPLE_RATE)
+    except Exception as e:
+        result = None
+        error = e
+    if previous is not None:
+        await asyncio.wait({previous})
+    if result is None:
+        logger.error(f"Utterance transcription failed: {error}")
+        await websocket.send_json({"type": "error", "detail": f"Transcription failed: {error}"})
+        return
+    transcript = result["transcript"].strip()
+    await websocket.send_json({
+        "type": "final",
+        "transcript": transcript,
+        "audio": {
+            "original_duration_s": round(len(samples) / TARGET_SAMPLE_RATE, 3),
+            "trimmed_duration_s": round(len(trimmed) / TARGET_SAMPLE_RATE, 3),
+        },
+        "latency_ms": {"processing": result["processing_ms"]},
+    })
+    if not transcript or not auto_submit:
+        return
+
+    # Hand the instruction straight to the agent start path registered by the app
+    start_instruction = getattr(websocket.app.state, "start_instruction", None)
+    if start_instruction is None:
+        await websocket.send_json({"type": "error", "detail": "Agent start path is not available"})
+        return
+    try:
+        client_id = websocket.headers.get("x-client-id") or (websocket.client.host if websocket.client else "voice")
+        response = await start_instruction(transcript, options, client_id)
+        await websocket.send_json({"type": "task", **response})
+    except HTTPException as e:
+        await websocket.send_json({"type": "error", "status_code": e.status_code, "detail": e.detail})
+    except Exception as e:
+        logger.error(f"Failed to start agent from voice stream: {e}")
+        await websocket.send_json({"type": "error", "detail": str(e)})
+
+@router.websocket("/stream")
+async def stream_audio(websocket: WebSocket):
+    """Ingest audio while it is recorded and dispatch the instruction when the user stops talking.
+
+    Binary frames carry 16-bit little-endian mono PCM. Text frames carry
+    JSON control messages: ``{"type": "config", "sample_rate": 48000, ...}``
+    (optionally with agent_type/agent_settings/browser_settings/config_ref/priority
+    and auto_submit) and ``{"type": "end"}`` to end the utterance early. A config
+    message that cannot be applied is answered with an error frame and the
+    session carries on with its previous settings.
+    """
+    await websocket.accept()
+    session = VoiceSession()
+    partial: Optional[asyncio.Task] = None
+    # Utterances being transcribed or dispatched; the newest goes last in reply order
+    utterances: Set[asyncio.Task] = set()
+    last_utterance: Optional[asyncio.Task] = None
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            ended = False
+            if message.get("bytes") is not None:
+                ended = session.push(message["bytes"])
+            elif message.get("text") is not None:
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    await websocket.send_json({"type": "error", "detail": "Control messages must be JSON"})
+                    continue
+                if control.get("type") == "config":
+                    config_ref = control.get("config_ref")
+                    if config_ref and not await _config_ref_exists(websocket, config_ref):
+                        # Same answer as POST /api/agents/start gives for an unknown preset
+                        await websocket.send_json({
+                            "type": "error", "status_code": 422, "detail": f"Unknown config_ref '{config_ref}'"
+                        })
+                        continue
+                    try:
+                        session.configure(control)
+                    except ValueError as e:
+                        await websocket.send_json({"type": "error", "detail": str(e)})
+                        continue
+                    await websocket.send_json({"type": "ready", "sample_rate": session.sample_rate})
+                elif control.get("type") == "end" and session.length > 0:
+                    session.flush()
+                    ended = True
+
+            if ended:
+                if partial is not None and not partial.done():
+                    partial.cancel()
+                # Not awaited here, so audio keeps being read while the utterance is transcribed
+                last_utterance = asyncio.create_task(_finish_utterance(
+                    websocket, session.take_utterance(), dict(session.options), session.auto_submit, last_utterance
+                ))
+                utterances.add(last_utterance)
+                last_utterance.add_done_callback(utterances.discard)
+            elif (
+                session.detector.speech_started
+                and session.length - session.partial_at >= PARTIAL_INTERVAL * TARGET_SAMPLE_RATE
+                and (partial is None or partial.done())
+            ):
+                # One partial in flight at a time so the pool is not flooded
+                session.partial_at = session.length
+                partial = asyncio.create_task(_send_partial(websocket, session.samples()))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if partial is not None and not partial.done():
+            partial.cancel()
+        for utterance in list(utterances):
+            utterance.cancel()
@@ -0,0 +1,189 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class DriverPoolTimeout(Exception):
+    """Raised when no driver becomes free within the checkout timeout"""
+
+
+def create_headless_chrome():
+    """Default driver factory: a headless Chrome session"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")  # Run in background
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    return webdriver.Chrome(options=chrome_options)
+
+
+def attach_chrome(cdp_url: str):
+    """A driver on an already running Chrome, reached through its remote debugging address.
+
+    ChromeDriver does not own that browser, so quitting the driver leaves it
+    and its tabs open.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    parts = urlsplit(cdp_url if "://" in cdp_url else f"http://{cdp_url}")
+    chrome_options = Options()
+    chrome_options.debugger_address = parts.netloc
+    return webdriver.Chrome(options=chrome_options)
+
+
+class PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """Bounded pool of warm WebDriver sessions parked on a start page.
+
+    At most ``size`` drivers exist at once; callers beyond that block in
+    ``checkout`` until one is returned. Drivers are health-checked on
+    checkout, navigated back to the start page on return, and replaced after
+    ``max_uses`` checkouts. The API is synchronous (Selenium is), so async
+    callers should run it in a worker thread.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        size: int = 2,
+        max_uses: int = 20,
+        checkout_timeout: float = 30.0,
+        driver_factory: Optional[Callable] = None,
+    ):
+        self.url = url
+        self.size = size
+        self.max_uses = max_uses
+        self.checkout_timeout = checkout_timeout
+        self.driver_factory = driver_factory or create_headless_chrome
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: List[PooledDriver] = []
+        self._lock = threading.Lock()
+        self._created = 0
+        self._recycled = 0
+        self._closed = False
+
+    def _launch(self) -> PooledDriver:
+        driver = self.driver_factory()
+        try:
+            driver.get(self.url)
+        except Exception:
+            self._quit(driver)
+            raise
+        self._created += 1
+        return PooledDriver(driver)
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"Error quitting driver: {e}")
+
+    def _is_healthy(self, pooled: PooledDriver) -> bool:
+        try:
+            return pooled.driver.execute_script("return document.readyState") == "complete"
+        except Exception:
+            return False
+
+    def warm(self, count: Optional[int] = None):
+        """Pre-launch drivers so the first checkouts do not pay browser startup"""
+        count = self.size if count is None else min(count, self.size)
+        with self._lock:
+            missing = count - len(self._idle)
+        for _ in range(missing):
+            if not self._slots.acquire(blocking=False):
+                break
+            try:
+                pooled = self._launch()
+                with self._lock:
+                    self._idle.append(pooled)
+            except ImportError:
+                logger.info("Selenium not available, driver pool stays cold")
+                return
+            except Exception as e:
+                logger.warning(f"Failed to warm driver: {e}")
+                return
+            finally:
+                self._slots.release()
+
+    def checkout(self, timeout: Optional[float] = None) -> PooledDriver:
+        if self._closed:
+            raise RuntimeError("Driver pool is closed")
+        timeout = self.checkout_timeout if timeout is None else timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise DriverPoolTimeout(f"No WebDriver available within {timeout}s")
+        try:
+            while True:
+                with self._lock:
+                    pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    pooled = self._launch()
+                elif not self._is_healthy(pooled):
+                    logger.info("Discarding unhealthy pooled driver")
+                    self._quit(pooled.driver)
+                    continue
+                pooled.uses += 1
+                return pooled
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, pooled: PooledDriver, healthy: bool = True):
+        try:
+            if self._closed or not healthy or pooled.uses >= self.max_uses:
+                self._recycled += 1
+                self._quit(pooled.driver)
+                return
+            try:
+                # Park the driver back on the start page so the next checkout is warm
+                pooled.driver.get(self.url)
+            except Exception as e:
+                logger.info(f"Discarding driver that failed to reset: {e}")
+                self._recycled += 1
+                self._quit(pooled.driver)
+                return
+            with self._lock:
+                self._idle.append(pooled)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def session(self, timeout: Optional[float] = None):
+        pooled = self.checkout(timeout)
+        healthy = False
+        try:
+            yield pooled.driver
+            healthy = True
+        finally:
+            self.release(pooled, healthy)
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self._quit(pooled.driver)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            idle = len(self._idle)
+        return {
+            "size": self.size,
+            "idle": idle,
+            "created": self._created,
+            "recycled": self._recycled,
+            "max_uses": self.max_uses,
+        }
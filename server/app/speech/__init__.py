@@ -0,0 +1,2 @@
+# Speech-to-text transcription
+
@@ -0,0 +1,163 @@
+import abc
+import hashlib
+import importlib.util
+import os
+import tempfile
+import time
+import wave
+from typing import Dict, List, Type
+
+
+class EngineUnavailableError(RuntimeError):
+    """Raised when the configured engine's optional dependency is not installed"""
+
+
+class TranscriptionEngine(abc.ABC):
+    """Interface for speech-to-text engines.
+
+    Engines run inside worker processes, so they must be constructible from
+    their registry name alone and should load models lazily.
+    """
+
+    name = "base"
+    version = "0"
+    # Module the engine imports lazily, checked on startup so a missing install fails early
+    requires: str = ""
+
+    @abc.abstractmethod
+    def transcribe(self, path: str) -> str:
+        """Transcribe an audio file the engine can decode itself"""
+
+    def transcribe_samples(self, samples, sample_rate: int) -> str:
+        """Transcribe mono float32 PCM; engines that accept arrays should override this"""
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            with wave.open(path, "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(sample_rate)
+                wav.writeframes((samples.clip(-1.0, 1.0) * 32767).astype("<i2").tobytes())
+            return self.transcribe(path)
+        finally:
+            os.remove(path)
+
+
+class StubEngine(TranscriptionEngine):
+    """Deterministic engine for tests: the transcript is derived from the audio bytes"""
+
+    name = "stub"
+    version = "1"
+
+    def transcribe(self, path: str) -> str:
+        with open(path, "rb") as audio:
+            digest = hashlib.sha256(audio.read()).hexdigest()
+        return f"stub transcript {digest[:12]}"
+
+    def transcribe_samples(self, samples, sample_rate: int) -> str:
+        digest = hashlib.sha256(samples.tobytes()).hexdigest()
+        return f"stub transcript {digest[:12]}"
+
+
+class LocalWhisperEngine(TranscriptionEngine):
+    """CPU-only local engine backed by faster-whisper (optional dependency)"""
+
+    name = "local"
+    requires = "faster_whisper"
+
+    def __init__(self):
+        self.model_size = os.getenv("WHISPER_MODEL", "base")
+        self.version = f"faster-whisper-{self.model_size}-int8"
+        self._model = None
+
+    def _load(self):
+        if self._model is None:
+            try:
+                from faster_whisper import WhisperModel
+            except ImportError:
+                raise RuntimeError("faster-whisper is not installed; pip install faster-whisper")
+            self._model = WhisperModel(self.model_size, device="cpu", compute_type="int8")
+        return self._model
+
+    def transcribe(self, path: str) -> str:
+        segments, _ = self._load().transcribe(path, beam_size=1)
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+    def transcribe_samples(self, samples, sample_rate: int) -> str:
+        # faster-whisper takes 16 kHz float32 arrays directly
+        if sample_rate != 16000:
+            return super().transcribe_samples(samples, sample_rate)
+        segments, _ = self._load().transcribe(samples, beam_size=1)
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+ENGINES: Dict[str, Type[TranscriptionEngine]] = {
+    StubEngine.name: StubEngine,
+    LocalWhisperEngine.name: LocalWhisperEngine,
+}
+
+# Engines already built in this process; models stay loaded between jobs
+_instances: Dict[str, TranscriptionEngine] = {}
+
+
+def get_engine(name: str) -> TranscriptionEngine:
+    engine = _instances.get(name)
+    if engine is None:
+        if name not in ENGINES:
+            raise ValueError(f"Unknown transcription engine: {name}")
+        engine = _instances[name] = ENGINES[name]()
+    return engine
+
+
+def check_engine(name: str):
+    """Raise if ``name`` is unknown or its dependency cannot be imported; loads no models"""
+    if name not in ENGINES:
+        raise ValueError(f"Unknown transcription engine '{name}'; choose one of {', '.join(sorted(ENGINES))}")
+    requires = ENGINES[name].requires
+    if requires and importlib.util.find_spec(requires) is None:
+        raise EngineUnavailableError(
+            f"Transcription engine '{name}' needs the '{requires}' module; install it "
+            f"(pip install -r requirements.txt) or set TRANSCRIPTION_ENGINE to another engine"
+        )
+
+
+def transcribe_one(engine: TranscriptionEngine, path: str, preprocess_audio: bool = True) -> dict:
+    """Preprocess (decode, resample, trim) and transcribe one clip"""
+    audio = None
+    if preprocess_audio:
+        from app.speech.preprocess import PreprocessError, preprocess
+
+        try:
+            samples, audio = preprocess(path)
+        except PreprocessError as e:
+            # Let the engine decode the raw file itself
+            audio = {"preprocess_error": str(e)}
+    if audio is None or "preprocess_error" in audio:
+        transcript = engine.transcribe(path)
+    elif len(samples) == 0:
+        transcript = ""
+    else:
+        transcript = engine.transcribe_samples(samples, audio["sample_rate"])
+    return {"transcript": transcript, "error": None, "audio": audio}
+
+
+def transcribe_batch(engine_name: str, paths: List[str], preprocess_audio: bool = True) -> List[dict]:
+    """Process-pool entry point: transcribe several clips with one engine load"""
+    engine = get_engine(engine_name)
+    results = []
+    for path in paths:
+        started = time.perf_counter()
+        try:
+            results.append(transcribe_one(engine, path, preprocess_audio))
+        except Exception as e:
+            results.append({"transcript": None, "error": str(e), "audio": None})
+        results[-1]["processing_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return results
+
+
+def transcribe_pcm(engine_name: str, samples, sample_rate: int) -> dict:
+    """Process-pool entry point for in-memory audio (streamed utterances)"""
+    started = time.perf_counter()
+    engine = get_engine(engine_name)
+    transcript = engine.transcribe_samples(samples, sample_rate) if len(samples) else ""
+    return {"transcript": transcript, "processing_ms": round((time.perf_counter() - started) * 1000, 1)}
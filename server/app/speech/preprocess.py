@@ -0,0 +1,277 @@
+import functools
+import math
+import shutil
+import subprocess
+import wave
+from typing import Tuple
+
+import numpy as np
+
+TARGET_SAMPLE_RATE = 16000
+
+
+class PreprocessError(Exception):
+    """Raised when audio cannot be decoded to PCM"""
+
+
+def _decode_wav(path: str) -> Tuple[np.ndarray, int]:
+    with wave.open(path, "rb") as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        # Sign-extend packed 24-bit little-endian samples
+        packed = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = packed[:, 0] | (packed[:, 1] << 8) | (packed[:, 2] << 16)
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        samples = ints.astype(np.float32) / 8388608.0
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise PreprocessError(f"Unsupported WAV sample width: {width}")
+    if channels > 1:
+        samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+def _decode_ffmpeg(path: str, sample_rate: int) -> Tuple[np.ndarray, int]:
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise PreprocessError("ffmpeg is required to decode non-WAV audio")
+    result = subprocess.run(
+        [ffmpeg, "-nostdin", "-loglevel", "error", "-i", path, "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-"],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        raise PreprocessError(result.stderr.decode(errors="replace").strip() or "ffmpeg failed")
+    return np.frombuffer(result.stdout, dtype="<i2").astype(np.float32) / 32768.0, sample_rate
+
+
+def decode(path: str, sample_rate: int = TARGET_SAMPLE_RATE) -> Tuple[np.ndarray, int]:
+    """Decode an audio file to mono float32 PCM in [-1, 1]"""
+    try:
+        return _decode_wav(path)
+    except (wave.Error, EOFError):
+        # Not a WAV file (e.g. webm/ogg from MediaRecorder)
+        return _decode_ffmpeg(path, sample_rate)
+
+
+@functools.lru_cache(maxsize=16)
+def _polyphase_filter(up: int, down: int) -> np.ndarray:
+    """Kaiser-windowed sinc low-pass at the lower Nyquist frequency, split into ``up`` phases.
+
+    Row ``p`` holds taps ``p, p + up, p + 2 * up, ...``; the filter is
+    ``10 * max(up, down)`` taps either side of its centre, as in
+    ``scipy.signal.resample_poly``.
+    """
+    half = 10 * max(up, down)
+    n = np.arange(-half, half + 1)
+    taps = np.sinc(n / max(up, down)) * np.kaiser(len(n), 5.0)
+    # Unit gain after zero-stuffing by ``up``
+    taps *= up / taps.sum()
+    per_phase = -(-len(taps) // up)
+    padded = np.zeros(per_phase * up)
+    padded[: len(taps)] = taps
+    return np.ascontiguousarray(padded.reshape(per_phase, up).T)
+
+
+class Resampler:
+    """Polyphase resampling from ``rate`` to ``target_rate`` with anti-aliasing.
+
+    Equivalent to upsampling by ``up``, low-pass filtering below the lower of
+    the two Nyquist frequencies and keeping every ``down``-th sample, but
+    only the kept samples are computed. Input history is carried between
+    ``push`` calls, so a stream fed in chunks comes out exactly as the whole
+    clip would; ``flush`` emits the tail.
+    """
+
+    block_size = 16384
+
+    def __init__(self, rate: int, target_rate: int = TARGET_SAMPLE_RATE):
+        divisor = math.gcd(rate, target_rate)
+        self.up, self.down = target_rate // divisor, rate // divisor
+        self.half = 10 * max(self.up, self.down)
+        self.phases = _polyphase_filter(self.up, self.down)
+        taps_per_phase = self.phases.shape[1]
+        self._offsets = np.arange(taps_per_phase)
+        # Samples still needed by later outputs; starts with the zeros before the signal
+        self._buffer = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        self._base = -(taps_per_phase - 1)
+        self._received = 0
+        self._produced = 0
+
+    def _last_input(self, output: int) -> int:
+        """Newest input sample that output ``output`` depends on"""
+        return (output * self.down + self.half) // self.up
+
+    def _process(self, samples: np.ndarray) -> np.ndarray:
+        buffer = np.concatenate([self._buffer, samples.astype(np.float32, copy=False)])
+        self._received += len(samples)
+        ready = self._received * self.up - 1 - self.half
+        count = ready // self.down + 1 if ready >= 0 else 0
+        outputs = np.arange(self._produced, max(count, self._produced))
+        resampled = np.empty(len(outputs), dtype=np.float32)
+        for start in range(0, len(outputs), self.block_size):
+            block = outputs[start:start + self.block_size]
+            position = block * self.down + self.half
+            newest = self._last_input(block) - self._base
+            window = buffer[newest[:, None] - self._offsets[None, :]]
+            resampled[start:start + len(block)] = np.einsum("ij,ij->i", window, self.phases[position % self.up])
+        self._produced += len(outputs)
+        keep_from = self._last_input(self._produced) - (len(self._offsets) - 1) - self._base
+        keep_from = min(max(0, keep_from), len(buffer))
+        self._buffer = buffer[keep_from:]
+        self._base += keep_from
+        return resampled
+
+    def push(self, samples: np.ndarray) -> np.ndarray:
+        """Resampled output that ``samples`` completes"""
+        if self.up == self.down:
+            return samples
+        return self._process(samples)
+
+    def flush(self) -> np.ndarray:
+        """The remaining output, as if the signal were followed by silence"""
+        if self.up == self.down:
+            return np.zeros(0, dtype=np.float32)
+        total = -(-self._received * self.up // self.down)
+        if total <= self._produced:
+            return np.zeros(0, dtype=np.float32)
+        needed = self._last_input(total - 1) + 1 - self._received
+        received = self._received
+        tail = self._process(np.zeros(max(0, needed), dtype=np.float32))
+        self._received = received
+        return tail[: total - (self._produced - len(tail))]
+
+
+def resample(samples: np.ndarray, rate: int, target_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """Anti-aliased polyphase resampling of a whole clip"""
+    if rate == target_rate or len(samples) == 0:
+        return samples
+    resampler = Resampler(rate, target_rate)
+    return np.concatenate([resampler.push(samples), resampler.flush()])
+
+
+def frame_energy_db(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """RMS energy in dBFS for each full frame"""
+    frame_count = len(samples) // frame_length
+    frames = samples[: frame_count * frame_length].reshape(frame_count, frame_length)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+
+def voiced_frames(
+    samples: np.ndarray,
+    sample_rate: int,
+    frame_ms: int = 20,
+    relative_db: float = -35.0,
+    floor_db: float = -55.0,
+) -> np.ndarray:
+    """Energy-based VAD: a frame is voiced when it is loud relative to the clip's peak"""
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    energy = frame_energy_db(samples, frame_length)
+    if len(energy) == 0:
+        return np.zeros(0, dtype=bool)
+    threshold = max(energy.max() + relative_db, floor_db)
+    return energy > threshold
+
+
+def trim_silence(
+    samples: np.ndarray,
+    sample_rate: int,
+    frame_ms: int = 20,
+    padding_ms: int = 150,
+    **vad_options,
+) -> np.ndarray:
+    """Cut leading and trailing silence, keeping ``padding_ms`` around the speech"""
+    voiced = voiced_frames(samples, sample_rate, frame_ms, **vad_options)
+    indices = np.flatnonzero(voiced)
+    if len(indices) == 0:
+        return samples[:0]
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    padding = sample_rate * padding_ms // 1000
+    start = max(0, indices[0] * frame_length - padding)
+    end = min(len(samples), (indices[-1] + 1) * frame_length + padding)
+    return samples[start:end]
+
+
+def preprocess(path: str, target_rate: int = TARGET_SAMPLE_RATE) -> Tuple[np.ndarray, dict]:
+    """Decode, downmix, resample and trim a clip ahead of transcription.
+
+    Returns the samples at ``target_rate`` plus durations before and after
+    trimming, so the saving can be measured.
+    """
+    samples, rate = decode(path, target_rate)
+    original_duration = len(samples) / rate if rate else 0.0
+    samples = resample(samples, rate, target_rate)
+    trimmed = trim_silence(samples, target_rate)
+    return trimmed, {
+        "sample_rate": target_rate,
+        "original_duration_s": round(original_duration, 3),
+        "trimmed_duration_s": round(len(trimmed) / target_rate, 3),
+    }
+
+
+class EndpointDetector:
+    """Streaming end-of-utterance detection for incrementally received audio.
+
+    Uses the same frame-energy test as ``voiced_frames``, measured against
+    the loudest frame seen so far. ``push`` returns True once at least
+    ``min_speech_ms`` of speech has been followed by ``end_silence_ms`` of
+    silence.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = TARGET_SAMPLE_RATE,
+        frame_ms: int = 20,
+        end_silence_ms: int = 700,
+        min_speech_ms: int = 200,
+        relative_db: float = -35.0,
+        floor_db: float = -50.0,
+    ):
+        self.frame_ms = frame_ms
+        self.frame_length = max(1, sample_rate * frame_ms // 1000)
+        self.end_silence_ms = end_silence_ms
+        self.min_speech_ms = min_speech_ms
+        self.relative_db = relative_db
+        self.floor_db = floor_db
+        self.reset()
+
+    def reset(self):
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._peak_db = -np.inf
+        self.speech_frames = 0
+        self.trailing_silence_frames = 0
+
+    @property
+    def speech_started(self) -> bool:
+        return self.speech_frames * self.frame_ms >= self.min_speech_ms
+
+    @property
+    def ended(self) -> bool:
+        return self.speech_started and self.trailing_silence_frames * self.frame_ms >= self.end_silence_ms
+
+    def push(self, samples: np.ndarray) -> bool:
+        buffered = np.concatenate([self._remainder, samples])
+        frame_count = len(buffered) // self.frame_length
+        self._remainder = buffered[frame_count * self.frame_length:]
+        if frame_count == 0:
+            return self.ended
+
+        energy = frame_energy_db(buffered, self.frame_length)
+        peaks = np.maximum.accumulate(np.concatenate([[self._peak_db], energy]))[1:]
+        self._peak_db = peaks[-1]
+        voiced = energy > np.maximum(peaks + self.relative_db, self.floor_db)
+        indices = np.flatnonzero(voiced)
+        self.speech_frames += len(indices)
+        if len(indices):
+            self.trailing_silence_frames = frame_count - 1 - indices[-1]
+        else:
+            self.trailing_silence_frames += frame_count
+        return self.ended
@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from app.speech.engines import check_engine, get_engine, transcribe_batch, transcribe_pcm
+from app.speech.transcript_cache import TranscriptCache
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionJob:
+    def __init__(self, audio_id: str, path: str, size: int):
+        self.audio_id = audio_id
+        self.path = path
+        self.size = size
+        self.status = "queued"
+        self.transcript: Optional[str] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.queue_ms: Optional[float] = None
+        self.processing_ms: Optional[float] = None
+        self.total_ms: Optional[float] = None
+        # Durations before/after silence trimming, when preprocessing ran
+        self.audio: Optional[dict] = None
+        self.cached = False
+        self.done = asyncio.Event()
+        self._submitted = time.perf_counter()
+
+    def to_dict(self) -> dict:
+        return {
+            "audio_id": self.audio_id,
+            "status": self.status,
+            "transcript": self.transcript,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "finished_at": self.finished_at,
+            "latency_ms": {
+                "queue": self.queue_ms,
+                "processing": self.processing_ms,
+                "total": self.total_ms,
+            },
+            "audio": self.audio,
+            "cached": self.cached,
+        }
+
+
+class TranscriptionService:
+    """Runs transcription jobs on a process pool so decoding never blocks the event loop.
+
+    Short clips (up to ``short_clip_bytes``) are collected for up to
+    ``batch_window`` seconds and sent to a worker together, which amortises
+    the inter-process round trip; longer clips are sent on their own. A pool
+    whose worker died is replaced and the batch retried once.
+    Finished transcripts go into ``cache`` (when given), keyed by the audio
+    hash and engine version, so repeated uploads skip the pool entirely.
+    """
+
+    def __init__(
+        self,
+        engine_name: str,
+        max_workers: int = 2,
+        batch_window: float = 0.05,
+        max_batch: int = 8,
+        short_clip_bytes: int = 512 * 1024,
+        max_jobs: int = 1000,
+        preprocess_audio: bool = True,
+        cache: Optional[TranscriptCache] = None,
+    ):
+        self.engine_name = engine_name
+        self.max_workers = max_workers
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.short_clip_bytes = short_clip_bytes
+        self.max_jobs = max_jobs
+        self.preprocess_audio = preprocess_audio
+        self.cache = cache
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[str, TranscriptionJob]" = OrderedDict()
+        self._pending: List[TranscriptionJob] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._completed = 0
+        self._failed = 0
+        self._total_latency_ms = 0.0
+        self._audio_seconds = 0.0
+        self._trimmed_seconds = 0.0
+        self._cache_hits = 0
+
+    @property
+    def engine_version(self) -> str:
+        return get_engine(self.engine_name).version
+
+    @property
+    def engine_key(self) -> str:
+        """Identifies everything that affects transcript output"""
+        return f"{self.engine_name}:{self.engine_version}:{'trimmed' if self.preprocess_audio else 'raw'}"
+
+    async def lookup(self, audio_id: str) -> Optional[TranscriptionJob]:
+        """Return a completed job from the transcript cache, or None on a miss"""
+        if self.cache is None:
+            return None
+        entry = await asyncio.to_thread(self.cache.get, TranscriptCache.make_key(audio_id, self.engine_key))
+        if entry is None:
+            return None
+        job = TranscriptionJob(audio_id, "", entry.get("size", 0))
+        job.status = "completed"
+        job.transcript = entry["transcript"]
+        job.audio = entry.get("audio")
+        job.cached = True
+        job.finished_at = entry["cached_at"]
+        job.queue_ms = job.processing_ms = 0.0
+        job.total_ms = round((time.perf_counter() - job._submitted) * 1000, 1)
+        job.done.set()
+        self._cache_hits += 1
+        return job
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # Forking a process that already runs threads (task store writer, to_thread pool) can copy held locks
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def _run_in_pool(self, fn, *args):
+        """Run ``fn`` on the pool; if a worker died, replace the pool and retry once"""
+        for attempt in range(2):
+            executor = self._executor
+            if executor is None:
+                raise RuntimeError("Transcription service is not started")
+            try:
+                return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+            except BrokenProcessPool:
+                if self._executor is executor:
+                    logger.warning("A transcription worker died; starting a new process pool")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = self._new_executor()
+                if attempt:
+                    raise
+
+    async def start(self):
+        if self._executor is None:
+            # Fail startup here rather than on the first upload inside a worker
+            check_engine(self.engine_name)
+            self._executor = self._new_executor()
+
+    async def stop(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        self._complete(pending, self._failed_results(pending, "Transcription service stopped"))
+        if self._executor is not None:
+            # Batches whose pool futures are cancelled here fail their jobs in _run_batch
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_job(self, audio_id: str) -> Optional[TranscriptionJob]:
+        return self._jobs.get(audio_id)
+
+    def submit(self, audio_id: str, path: str, size: int) -> TranscriptionJob:
+        job = self._jobs.get(audio_id)
+        if job is not None and job.status != "error":
+            # Same content already transcribed or in progress
+            return job
+        job = self._jobs[audio_id] = TranscriptionJob(audio_id, path, size)
+        self._jobs.move_to_end(audio_id)
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+
+        if size > self.short_clip_bytes:
+            asyncio.create_task(self._run_batch([job]))
+            return job
+        self._pending.append(job)
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+        return job
+
+    async def transcribe(self, audio_id: str, path: str, size: int) -> TranscriptionJob:
+        job = self._jobs.get(audio_id)
+        if job is None or job.status == "error":
+            job = await self.lookup(audio_id) or self.submit(audio_id, path, size)
+        await job.done.wait()
+        return job
+
+    async def transcribe_samples(self, samples, sample_rate: int) -> dict:
+        """Transcribe an in-memory clip on the pool; results are not cached"""
+        return await self._run_in_pool(transcribe_pcm, self.engine_name, samples, sample_rate)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[TranscriptionJob]):
+        started = time.perf_counter()
+        for job in batch:
+            job.status = "processing"
+            job.queue_ms = round((started - job._submitted) * 1000, 1)
+        try:
+            results = await self._run_in_pool(
+                transcribe_batch, self.engine_name, [job.path for job in batch], self.preprocess_audio
+            )
+        except asyncio.CancelledError:
+            # stop() cancelled the pool future; uploads waiting on these jobs must still return
+            self._complete(batch, self._failed_results(batch, "Transcription service stopped"))
+            raise
+        except Exception as e:
+            logger.error(f"Transcription batch of {len(batch)} failed: {e}")
+            results = self._failed_results(batch, str(e) or e.__class__.__name__)
+        self._complete(batch, results)
+
+        if self.cache is not None:
+            finished = [job for job in batch if job.status == "completed"]
+            for job in finished:
+                try:
+                    await asyncio.to_thread(
+                        self.cache.put,
+                        TranscriptCache.make_key(job.audio_id, self.engine_key),
+                        job.transcript,
+                        size=job.size,
+                        audio=job.audio,
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to cache transcript for {job.audio_id[:12]}: {e}")
+
+    @staticmethod
+    def _failed_results(batch: List[TranscriptionJob], error: str) -> List[dict]:
+        return [{"transcript": None, "error": error, "processing_ms": None, "audio": None} for _ in batch]
+
+    def _complete(self, batch: List[TranscriptionJob], results: List[dict]):
+        for job, result in zip(batch, results):
+            job.transcript = result["transcript"]
+            job.error = result["error"]
+            job.processing_ms = result["processing_ms"]
+            job.audio = result["audio"]
+            if job.audio and "trimmed_duration_s" in job.audio:
+                self._audio_seconds += job.audio["original_duration_s"]
+                self._trimmed_seconds += job.audio["trimmed_duration_s"]
+            job.status = "error" if job.error else "completed"
+            job.finished_at = time.time()
+            job.total_ms = round((time.perf_counter() - job._submitted) * 1000, 1)
+            if job.error:
+                self._failed += 1
+            else:
+                self._completed += 1
+                self._total_latency_ms += job.total_ms
+            logger.info(
+                f"Transcribed {job.audio_id[:12]} in {job.total_ms} ms "
+                f"(queue {job.queue_ms} ms, processing {job.processing_ms} ms, batch of {len(batch)})"
+            )
+            job.done.set()
+
+    def stats(self) -> dict:
+        return {
+            "engine": self.engine_name,
+            "workers": self.max_workers,
+            "pending": len(self._pending),
+            "completed": self._completed,
+            "failed": self._failed,
+            "avg_latency_ms": round(self._total_latency_ms / self._completed, 1) if self._completed else None,
+            "audio_seconds": round(self._audio_seconds, 1),
+            "silence_trimmed_seconds": round(self._audio_seconds - self._trimmed_seconds, 1),
+            "cache_hits": self._cache_hits,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+
+transcription_service = TranscriptionService(
+    os.getenv("TRANSCRIPTION_ENGINE", "local"),
+    max_workers=int(os.getenv("TRANSCRIPTION_WORKERS", "2")),
+    preprocess_audio=os.getenv("TRANSCRIPTION_PREPROCESS", "true").lower() == "true",
+    cache=TranscriptCache(
+        os.getenv("TRANSCRIPT_CACHE_DIR", os.path.join("data", "transcripts")),
+        max_memory_entries=int(os.getenv("TRANSCRIPT_CACHE_ENTRIES", "1000")),
+        max_disk_bytes=int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(50 * 1024 * 1024))),
+    ),
+)
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptCache:
+    """Two-tier transcript cache keyed by audio hash and engine version.
+
+    The memory tier is an LRU of ``max_memory_entries`` results. The disk
+    tier stores one small JSON file per entry under ``directory`` and is
+    trimmed, least recently used first, once it grows past ``max_disk_bytes``.
+    Methods do blocking file I/O and are meant to be run in a worker thread.
+    """
+
+    def __init__(self, directory: str, max_memory_entries: int = 1000, max_disk_bytes: int = 50 * 1024 * 1024):
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def make_key(audio_id: str, engine_key: str) -> str:
+        return f"{engine_key}:{audio_id}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{hashlib.sha256(key.encode()).hexdigest()}.json")
+
+    def _remember(self, key: str, entry: dict):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._memory_hits += 1
+                return entry
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as cached:
+                entry = json.load(cached)
+        except FileNotFoundError:
+            entry = None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable transcript cache entry {path}: {e}")
+            self._remove(path)
+            entry = None
+        if entry is None or entry.get("key") != key:
+            with self._lock:
+                self._misses += 1
+            return None
+
+        # Bump mtime so disk eviction is least-recently-used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self._disk_hits += 1
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, transcript: str, **metadata) -> dict:
+        entry = {"key": key, "transcript": transcript, "cached_at": time.time(), **metadata}
+        self._remember(key, entry)
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        temp_path = f"{path}.{uuid.uuid4().hex}.part"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as cached:
+                json.dump(entry, cached)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(temp_path, path)
+            written = os.path.getsize(path) - previous
+        except OSError as e:
+            logger.warning(f"Failed to write transcript cache entry: {e}")
+            self._remove(temp_path)
+            return entry
+
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += written
+            over = self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes
+        if over:
+            self._evict()
+        return entry
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Recount the disk tier and delete the least recently used files until it fits"""
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for item in scan:
+                if item.name.endswith(".json") and item.is_file():
+                    stat = item.stat()
+                    entries.append((stat.st_mtime, stat.st_size, item.path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            self._remove(path)
+            total -= size
+            removed += 1
+        with self._lock:
+            self._disk_bytes = total
+        if removed:
+            logger.info(f"Evicted {removed} transcript cache entries from disk")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+            }
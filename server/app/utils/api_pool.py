@@ -0,0 +1,94 @@
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from app.utils.health import HealthMonitor
+
+logger = logging.getLogger(__name__)
+
+
+class ApiNode:
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.name = f"direct_api@{urlsplit(self.url).netloc or self.url}"
+        self.outstanding = 0
+        self.dispatched = 0
+
+    def snapshot(self) -> dict:
+        return {"url": self.url, "outstanding": self.outstanding, "dispatched": self.dispatched}
+
+
+class DirectApiPool:
+    """Spreads agent runs over several direct-API worker processes.
+
+    New runs go to the available node with the fewest outstanding tasks;
+    availability comes from each node's circuit breaker in the health
+    monitor, so failing nodes drop out and rejoin once probes succeed.
+    Every upstream task id stays pinned to the node that accepted it, so
+    status and cancel calls reach the process actually running it.
+    """
+
+    def __init__(self, urls: Iterable[str], max_pins: int = 10000):
+        self.nodes: List[ApiNode] = [ApiNode(url) for url in urls]
+        if not self.nodes:
+            raise ValueError("At least one direct API URL is required")
+        self.max_pins = max_pins
+        self.health: Optional[HealthMonitor] = None
+        # upstream task id -> node, oldest first
+        self._pins: "OrderedDict[str, ApiNode]" = OrderedDict()
+        self._active: Dict[str, ApiNode] = {}
+
+    def health_urls(self) -> Dict[str, str]:
+        return {node.name: f"{node.url}/health" for node in self.nodes}
+
+    def attach(self, health: HealthMonitor):
+        self.health = health
+
+    def is_available(self, node: ApiNode) -> bool:
+        return self.health is None or self.health.is_available(node.name)
+
+    def any_available(self) -> bool:
+        return any(self.is_available(node) for node in self.nodes)
+
+    def choose(self, exclude: Iterable[ApiNode] = ()) -> Optional[ApiNode]:
+        """Least-outstanding available node, or None if none is left"""
+        excluded = set(exclude)
+        candidates = [node for node in self.nodes if node not in excluded and self.is_available(node)]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda node: (node.outstanding, node.dispatched))
+
+    def assign(self, upstream_task_id: str, node: ApiNode):
+        self._pins[upstream_task_id] = node
+        self._pins.move_to_end(upstream_task_id)
+        while len(self._pins) > self.max_pins:
+            self._pins.popitem(last=False)
+        if upstream_task_id not in self._active:
+            self._active[upstream_task_id] = node
+            node.outstanding += 1
+        node.dispatched += 1
+
+    def release(self, upstream_task_id: Optional[str]):
+        """The upstream task finished or was abandoned; its node has room again"""
+        node = self._active.pop(upstream_task_id, None) if upstream_task_id else None
+        if node is not None:
+            node.outstanding -= 1
+
+    def node_for(self, upstream_task_id: str) -> ApiNode:
+        # Unknown ids (e.g. from before a restart) go to the first node
+        return self._pins.get(upstream_task_id) or self.nodes[0]
+
+    def record_success(self, node: ApiNode):
+        if self.health is not None:
+            self.health.record_success(node.name)
+
+    def record_failure(self, node: ApiNode):
+        if self.health is not None:
+            self.health.record_failure(node.name)
+
+    def snapshot(self) -> dict:
+        return {
+            node.name: {**node.snapshot(), "available": self.is_available(node)}
+            for node in self.nodes
+        }
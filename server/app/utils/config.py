@@ -98,3 +98,33 @@ model_names = {
         "Qwen/Qwen3-235B-A22B",
     ],
 }
+
+# Interchangeable models for latency-aware routing, as (provider, model) pairs from model_names
+model_classes = {
+    "fast": [
+        ("google", "gemini-2.0-flash"),
+        ("openai", "gpt-4o"),
+        ("deepseek", "deepseek-chat"),
+        ("alibaba", "qwen-turbo"),
+        ("grok", "grok-3-fast"),
+    ],
+    "fast_vision": [
+        ("google", "gemini-2.0-flash"),
+        ("openai", "gpt-4o"),
+        ("google", "gemini-1.5-flash-latest"),
+        ("alibaba", "qwen-vl-plus"),
+        ("grok", "grok-2-vision"),
+    ],
+    "reasoning": [
+        ("openai", "o3-mini"),
+        ("deepseek", "deepseek-reasoner"),
+        ("google", "gemini-2.0-flash-thinking-exp"),
+        ("grok", "grok-3-mini"),
+    ],
+    "strong": [
+        ("anthropic", "claude-3-5-sonnet-20241022"),
+        ("openai", "gpt-4o"),
+        ("google", "gemini-2.5-pro-preview-03-25"),
+        ("deepseek", "deepseek-chat"),
+    ],
+}
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from app.utils.upstream import UpstreamClient, UpstreamError
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    Opens after ``failure_threshold`` failures in a row, rejects calls while
+    open, and lets traffic through again (half-open) once ``reset_timeout``
+    seconds have passed. A success in any state closes it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 15.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        return self.state != self.OPEN
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+class ServiceHealth:
+    def __init__(self, name: str, url: str, breaker: CircuitBreaker):
+        self.name = name
+        self.url = url
+        self.breaker = breaker
+        self.healthy: Optional[bool] = None
+        self.last_checked: Optional[float] = None
+        self.latency_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def snapshot(self) -> dict:
+        return {
+            "url": self.url,
+            "status": "unknown" if self.healthy is None else ("available" if self.healthy else "unavailable"),
+            "last_checked": self.last_checked,
+            "latency_ms": self.latency_ms,
+            "last_error": self.last_error,
+            "circuit": self.breaker.snapshot(),
+        }
+
+
+class HealthMonitor:
+    """Probes upstream services in the background and caches their health.
+
+    Request handlers consult ``is_available`` instead of doing their own
+    health round trip, and report the outcome of real calls back through
+    ``record_success``/``record_failure`` so the breakers react between probes.
+    """
+
+    def __init__(
+        self,
+        client: UpstreamClient,
+        services: Dict[str, str],
+        interval: float = 5.0,
+        failure_threshold: int = 3,
+        reset_timeout: float = 15.0,
+    ):
+        self.client = client
+        self.interval = interval
+        self.services = {
+            name: ServiceHealth(name, url, CircuitBreaker(failure_threshold, reset_timeout))
+            for name, url in services.items()
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.probe_all()
+            await asyncio.sleep(self.interval)
+
+    async def probe_all(self):
+        await asyncio.gather(*(self.probe(name) for name in self.services))
+
+    async def probe(self, name: str) -> bool:
+        service = self.services[name]
+        started = time.monotonic()
+        try:
+            response = await self.client.get(service.url, route="health")
+            ok = response.status_code == 200
+            error = None if ok else f"HTTP {response.status_code}"
+        except UpstreamError as e:
+            ok = False
+            error = str(e) or e.__class__.__name__
+        service.latency_ms = round((time.monotonic() - started) * 1000, 1)
+        service.last_checked = time.time()
+        service.last_error = error
+        if ok:
+            self.record_success(name)
+        else:
+            self.record_failure(name)
+        return ok
+
+    def is_available(self, name: str) -> bool:
+        return self.services[name].breaker.allow_request()
+
+    def record_success(self, name: str):
+        service = self.services[name]
+        if service.healthy is False:
+            logger.info(f"Upstream service '{name}' recovered")
+        service.healthy = True
+        service.breaker.record_success()
+
+    def record_failure(self, name: str):
+        service = self.services[name]
+        if service.healthy is not False:
+            logger.warning(f"Upstream service '{name}' is failing")
+        service.healthy = False
+        service.breaker.record_failure()
+
+    def snapshot(self) -> dict:
+        return {name: service.snapshot() for name, service in self.services.items()}
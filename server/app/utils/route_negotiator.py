@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.utils.upstream import UpstreamClient, UpstreamError
+
+logger = logging.getLogger(__name__)
+
+# Candidate Gradio endpoints, in order of preference
+GRADIO_ENDPOINTS = [
+    "/api/predict",
+    "/run/predict",
+    "/api/v1/predict",
+]
+
+# Candidate payload shapes, in order of preference
+PAYLOAD_SHAPES: Dict[str, Callable[[str], dict]] = {
+    "data_fn_index": lambda instruction: {"data": [instruction], "fn_index": 0},
+    "data": lambda instruction: {"data": [instruction]},
+    "instruction": lambda instruction: {"instruction": instruction},
+    "query": lambda instruction: {"query": instruction},
+}
+
+Route = Tuple[str, str]
+
+
+class RouteNegotiator:
+    """Finds and remembers which Gradio endpoint and payload shape work.
+
+    The first submission negotiates a route and later submissions use the
+    cached winner directly until it expires or stops answering. Endpoints are
+    discovered with concurrent GET probes (a missing route answers 404, a
+    POST-only one 405), so only endpoints that exist are tried with real
+    submissions. Those are sent one at a time under a lock, since every
+    successful POST starts an agent run. When nothing works, the miss is
+    cached too so later submissions skip straight to the next fallback.
+    """
+
+    def __init__(
+        self,
+        client: UpstreamClient,
+        base_url: str,
+        endpoints: Optional[List[str]] = None,
+        payload_shapes: Optional[Dict[str, Callable[[str], dict]]] = None,
+        ttl: float = 300.0,
+        miss_ttl: float = 30.0,
+    ):
+        self.client = client
+        self.base_url = base_url
+        self.endpoints = endpoints or list(GRADIO_ENDPOINTS)
+        self.payload_shapes = payload_shapes or dict(PAYLOAD_SHAPES)
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self._route: Optional[Route] = None
+        self._expires_at = 0.0
+        self._no_route_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def cached_route(self) -> Optional[Route]:
+        if self._route is not None and time.monotonic() < self._expires_at:
+            return self._route
+        return None
+
+    def invalidate(self):
+        self._route = None
+        self._expires_at = 0.0
+
+    async def submit(self, instruction: str) -> Optional[Tuple[str, httpx.Response]]:
+        """Send the instruction through the working route.
+
+        Returns ``(endpoint, response)`` on success, or None when no route works.
+        """
+        failed = None
+        route = self.cached_route()
+        if route is not None:
+            response = await self._send(route, instruction)
+            if response is not None:
+                return route[0], response
+            logger.info(f"Cached Gradio route {route} stopped working, re-negotiating")
+            self.invalidate()
+            failed = route
+        elif time.monotonic() < self._no_route_until:
+            return None
+        return await self._negotiate(instruction, failed)
+
+    async def _negotiate(self, instruction: str, failed: Optional[Route]) -> Optional[Tuple[str, httpx.Response]]:
+        async with self._lock:
+            # Another submission may have negotiated while this one waited
+            route = self.cached_route()
+            if route is not None and route != failed:
+                response = await self._send(route, instruction)
+                if response is not None:
+                    return route[0], response
+            if failed is None and time.monotonic() < self._no_route_until:
+                return None
+
+            for endpoint in await self._discover_endpoints():
+                for shape in self.payload_shapes:
+                    if (endpoint, shape) == failed:
+                        continue
+                    response = await self._send((endpoint, shape), instruction)
+                    if response is not None:
+                        self._route = (endpoint, shape)
+                        self._expires_at = time.monotonic() + self.ttl
+                        self._no_route_until = 0.0
+                        logger.info(f"Negotiated Gradio route {endpoint} with payload shape '{shape}'")
+                        return endpoint, response
+
+            self._no_route_until = time.monotonic() + self.miss_ttl
+            logger.warning(f"No working Gradio route found, retrying in {self.miss_ttl}s")
+            return None
+
+    async def _discover_endpoints(self) -> List[str]:
+        async def exists(endpoint: str) -> bool:
+            try:
+                response = await self.client.get(f"{self.base_url}{endpoint}", route="gradio")
+                return response.status_code != 404
+            except UpstreamError:
+                return False
+
+        found = await asyncio.gather(*(exists(endpoint) for endpoint in self.endpoints))
+        return [endpoint for endpoint, ok in zip(self.endpoints, found) if ok]
+
+    async def _send(self, route: Route, instruction: str) -> Optional[httpx.Response]:
+        endpoint, shape = route
+        try:
+            response = await self.client.post(
+                f"{self.base_url}{endpoint}",
+                route="gradio",
+                json=self.payload_shapes[shape](instruction),
+            )
+        except UpstreamError as e:
+            logger.debug(f"Gradio route {route} failed: {e}")
+            return None
+        if response.status_code != 200:
+            logger.debug(f"Gradio route {route} returned status {response.status_code}")
+            return None
+        return response
+
+    def snapshot(self) -> dict:
+        route = self.cached_route()
+        return {
+            "endpoint": route[0] if route else None,
+            "payload_shape": route[1] if route else None,
+            "expires_in": round(self._expires_at - time.monotonic(), 1) if route else None,
+            "retry_in": round(self._no_route_until - time.monotonic(), 1) if self._no_route_until > time.monotonic() else None,
+        }
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"completed", "error", "cancelled"}
+
+
+class StatusCache:
+    """TTL + LRU cache in front of upstream task status lookups.
+
+    Concurrent lookups for the same task share a single in-flight fetch.
+    Non-terminal states are cached for ``running_ttl`` seconds; terminal
+    states never change, so they are kept until pushed out of the LRU.
+    Failed fetches are not cached.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[dict]],
+        running_ttl: float = 1.0,
+        max_entries: int = 1000,
+    ):
+        self.fetch = fetch
+        self.running_ttl = running_ttl
+        self.max_entries = max_entries
+        # task_id -> (value, expires_at or None for terminal states)
+        self._entries: "OrderedDict[str, Tuple[dict, Optional[float]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def peek(self, task_id: str) -> Optional[dict]:
+        entry = self._entries.get(task_id)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            return None
+        self._entries.move_to_end(task_id)
+        return value
+
+    async def get(self, task_id: str) -> dict:
+        value = self.peek(task_id)
+        if value is not None:
+            self.hits += 1
+            return value
+        inflight = self._inflight.get(task_id)
+        if inflight is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            inflight = self._inflight[task_id] = asyncio.create_task(self._load(task_id))
+        # Shield so one caller going away does not cancel the fetch for the rest
+        return await asyncio.shield(inflight)
+
+    async def _load(self, task_id: str) -> dict:
+        try:
+            value = await self.fetch(task_id)
+            self.put(task_id, value)
+            return value
+        finally:
+            self._inflight.pop(task_id, None)
+
+    def put(self, task_id: str, value: dict):
+        expires_at = None if value.get("status") in TERMINAL_STATUSES else time.monotonic() + self.running_ttl
+        self._entries[task_id] = (value, expires_at)
+        self._entries.move_to_end(task_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, task_id: str):
+        self._entries.pop(task_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,41 @@
+import math
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Refills ``per_minute`` units per minute, continuously, up to ``capacity`` (the burst size)"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.capacity = float(capacity if capacity is not None else per_minute)
+        self.rate = float(per_minute) / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` is available (amounts above capacity wait for a full bucket).
+
+        A bucket with a refill rate of zero that is short reports ``math.inf``.
+        """
+        self.refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate if self.rate > 0 else math.inf
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def charge(self, amount: float):
+        """Take all of ``amount``, leaving a debt that later takers wait out if it exceeds the balance"""
+        self.refill()
+        self.tokens -= amount
+
+    def drain(self):
+        self.tokens = 0.0
+        self.updated = time.monotonic()
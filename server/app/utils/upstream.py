@@ -0,0 +1,101 @@
+import logging
+import os
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Per-route timeouts (seconds) for calls to the web-ui backends
+ROUTE_TIMEOUTS = {
+    "health": 5.0,
+    "execute": 10.0,
+    "status": 5.0,
+    "gradio": 5.0,
+    "verify": 2.0,
+}
+DEFAULT_TIMEOUT = 10.0
+
+# Raised for connection errors, timeouts and protocol errors
+UpstreamError = httpx.HTTPError
+
+
+class UpstreamStatusError(Exception):
+    """Raised when an upstream service answers with an unexpected status code"""
+
+    def __init__(self, status_code: int, message: str = ""):
+        super().__init__(message or f"API server returned status {status_code}")
+        self.status_code = status_code
+
+
+class UpstreamClient:
+    """Shared async HTTP client for the web-ui backends.
+
+    A single pooled ``httpx.AsyncClient`` is opened on startup and reused by
+    every handler, so connections are kept alive between calls instead of
+    being reopened per request, and no call blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 200,
+        max_keepalive_connections: int = 50,
+        keepalive_expiry: float = 30.0,
+        pool_timeout: float = 5.0,
+        route_timeouts: Optional[Dict[str, float]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.pool_timeout = pool_timeout
+        self.route_timeouts = dict(ROUTE_TIMEOUTS)
+        if route_timeouts:
+            self.route_timeouts.update(route_timeouts)
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=httpx.Timeout(DEFAULT_TIMEOUT, pool=self.pool_timeout),
+                transport=self.transport,
+            )
+            logger.info(f"Upstream client started with limits {self.limits}")
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("Upstream client closed")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("Upstream client is not started")
+        return self._client
+
+    def timeout_for(self, route: str) -> httpx.Timeout:
+        return httpx.Timeout(self.route_timeouts.get(route, DEFAULT_TIMEOUT), pool=self.pool_timeout)
+
+    async def request(self, method: str, url: str, route: str = "default", **kwargs) -> httpx.Response:
+        kwargs.setdefault("timeout", self.timeout_for(route))
+        return await self.client.request(method, url, **kwargs)
+
+    async def get(self, url: str, route: str = "default", **kwargs) -> httpx.Response:
+        return await self.request("GET", url, route=route, **kwargs)
+
+    async def post(self, url: str, route: str = "default", **kwargs) -> httpx.Response:
+        return await self.request("POST", url, route=route, **kwargs)
+
+    async def delete(self, url: str, route: str = "default", **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, route=route, **kwargs)
+
+
+upstream = UpstreamClient(
+    max_connections=int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "200")),
+    max_keepalive_connections=int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "50")),
+)
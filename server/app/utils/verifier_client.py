@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from typing import List, Optional, Set, Tuple
+
+from app.utils.upstream import UpstreamClient, UpstreamStatusError
+
+logger = logging.getLogger(__name__)
+
+
+class VerifierUnavailable(Exception):
+    """Raised when a batch could not be verified by the Java microservice"""
+
+
+class VerifierBatcher:
+    """Micro-batches instruction checks into ``/java/verifier:batch`` calls.
+
+    ``verify`` calls made within ``max_delay`` seconds of the first waiting
+    one share a single HTTP request; a batch is sent early once ``max_batch``
+    instructions are waiting. Each caller gets its own item's verdict, or
+    ``VerifierUnavailable`` if the whole batch failed.
+    """
+
+    def __init__(self, client: UpstreamClient, base_url: str, max_batch: int = 100, max_delay: float = 0.005):
+        self.client = client
+        self.base_url = base_url.rstrip("/")
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._sending: Set[asyncio.Task] = set()
+        self._batches = 0
+        self._items = 0
+        self._rejected = 0
+        self._failures = 0
+
+    async def verify(self, instruction: str) -> dict:
+        """Verdict ``{"index", "verified", "reason"}`` for one instruction"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((instruction, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._send(batch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]]):
+        self._batches += 1
+        self._items += len(batch)
+        try:
+            response = await self.client.post(
+                f"{self.base_url}/java/verifier:batch",
+                route="verify",
+                json={"instructions": [instruction for instruction, _ in batch]},
+            )
+            if response.status_code != 200:
+                raise UpstreamStatusError(response.status_code)
+            results = {result["index"]: result for result in response.json()["results"]}
+        except Exception as e:
+            self._failures += 1
+            logger.warning(f"Verifier batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(VerifierUnavailable(str(e) or e.__class__.__name__))
+            return
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            result = results.get(index)
+            if result is None:
+                future.set_exception(VerifierUnavailable(f"No verdict for item {index}"))
+                continue
+            if not result.get("verified"):
+                self._rejected += 1
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": round(self._items / self._batches, 1) if self._batches else None,
+            "rejected": self._rejected,
+            "failed_batches": self._failures,
+        }
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from app.agents.task_manager import TERMINAL_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# Fields whose change counts as a state transition worth pushing
+TRANSITION_FIELDS = ("status", "bridge_status", "progress", "error")
+
+
+def make_message(task_id: str, data: dict) -> dict:
+    return {
+        "type": "error" if data.get("status") == "error" else "status",
+        "content": data,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "task_id": task_id,
+    }
+
+
+class TaskWatcher:
+    def __init__(self):
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.last_message: Optional[dict] = None
+        self.job: Optional[asyncio.Task] = None
+
+
+class TaskStreamHub:
+    """Fans task status changes out to any number of stream subscribers.
+
+    Each watched task has exactly one watcher polling ``fetch_status``, no
+    matter how many WebSocket/SSE clients follow it, and only messages whose
+    transition fields changed are pushed. The watcher stops when the task
+    reaches a terminal state or its last subscriber leaves.
+    """
+
+    def __init__(
+        self,
+        fetch_status: Callable[[str], Awaitable[dict]],
+        interval: float = 0.5,
+        subscriber_queue_size: int = 32,
+    ):
+        self.fetch_status = fetch_status
+        self.interval = interval
+        self.subscriber_queue_size = subscriber_queue_size
+        self._watchers: Dict[str, TaskWatcher] = {}
+
+    @asynccontextmanager
+    async def subscribe(self, task_id: str):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_queue_size)
+        watcher = self._watchers.get(task_id)
+        if watcher is None:
+            watcher = self._watchers[task_id] = TaskWatcher()
+        watcher.subscribers.add(queue)
+        if watcher.last_message is not None:
+            queue.put_nowait(watcher.last_message)
+        if watcher.job is None or watcher.job.done():
+            watcher.job = asyncio.create_task(self._watch(task_id, watcher))
+        try:
+            yield queue
+        finally:
+            watcher.subscribers.discard(queue)
+            if not watcher.subscribers:
+                if watcher.job is not None:
+                    watcher.job.cancel()
+                if self._watchers.get(task_id) is watcher:
+                    del self._watchers[task_id]
+
+    async def messages(self, task_id: str):
+        """Yield pushed messages for one subscriber until the task finishes"""
+        async with self.subscribe(task_id) as queue:
+            while True:
+                message = await queue.get()
+                yield message
+                if message["content"].get("status") in TERMINAL_STATUSES:
+                    return
+
+    async def _watch(self, task_id: str, watcher: TaskWatcher):
+        last_key = None
+        while True:
+            try:
+                data = await self.fetch_status(task_id)
+            except Exception as e:
+                logger.warning(f"Error fetching status for {task_id}: {e}")
+                await asyncio.sleep(self.interval)
+                continue
+            key = tuple(str(data.get(field)) for field in TRANSITION_FIELDS)
+            if key != last_key:
+                last_key = key
+                watcher.last_message = make_message(task_id, data)
+                self._publish(watcher, watcher.last_message)
+            if data.get("status") in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(self.interval)
+
+    def _publish(self, watcher: TaskWatcher, message: dict):
+        for queue in list(watcher.subscribers):
+            if queue.full():
+                # A slow subscriber only needs the latest state
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    def stats(self) -> dict:
+        return {
+            "watched_tasks": len(self._watchers),
+            "subscribers": sum(len(w.subscribers) for w in self._watchers.values()),
+        }
@@ -1,15 +1,52 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Query, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse, Response
 import uvicorn
 import os
-import requests
 import json
+import hashlib
 import time
 import asyncio
+from typing import List, Optional
 from pydantic import BaseModel
 
+from app.utils.upstream import upstream, UpstreamError, UpstreamStatusError
+from app.utils.status_cache import StatusCache
+from app.utils.health import HealthMonitor
+from app.utils.api_pool import DirectApiPool
+from app.utils.route_negotiator import RouteNegotiator
+from app.utils.verifier_client import VerifierBatcher, VerifierUnavailable
+from app.browser.driver_pool import DriverPool, DriverPoolTimeout, attach_chrome
+from app.agents.task_manager import (
+    TaskManager,
+    Task,
+    TaskStatus,
+    TERMINAL_STATUSES,
+    QueueFullError,
+    TaskNotFoundError,
+    InvalidTaskStateError,
+    TaskFailedError,
+    TaskHandedOff,
+)
+from app.agents.task_store import TaskStore, MemoryTaskStore
+from app.agents.dedup import SubmissionIndex, IdempotencyConflictError, fingerprint
+from app.agents.admission import AdmissionController, AdmissionRejected, load_weights
+from app.agents.llm_scheduler import LLMScheduler, load_limits
+from app.agents.model_router import (
+    ModelRouter, ModelStalledError, NoHealthyModelError, is_provider_error, is_rate_limit_error, load_credentials,
+)
+from app.agents.config_presets import PresetStore, InvalidPresetError, redact
+from app.agents.replay import (
+    TraceStore, ReplayDiverged, extract_trace, final_result_text, replay_trace, side_effects_ran, trace_key,
+)
+from app.ws.task_stream import TaskStreamHub
+from app.api.media_routes import router as media_router
+from app.api.voice_routes import router as voice_router
+from app.speech.service import transcription_service
+from app.utils.config import model_classes
+
 app = FastAPI(title="Web Automation Agent API")
 
 # Add CORS middleware
@@ -18,18 +55,188 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+# Compress large JSON bodies such as task results and step logs
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("GZIP_MIN_SIZE", "1000")))
+
+app.include_router(media_router, prefix="/api/media")
+app.include_router(voice_router, prefix="/api/media")
 
 # Configuration
 WEBUI_BASE_URL = "http://localhost:7788"
 WEBUI_API_URL = "http://localhost:7789"  # New API server
+# Comma-separated direct API workers; runs are spread across them
+WEBUI_API_URLS = [url.strip() for url in os.getenv("WEBUI_API_URLS", WEBUI_API_URL).split(",") if url.strip()]
+HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", "5"))
+TASK_POLL_INTERVAL = float(os.getenv("TASK_POLL_INTERVAL", "2"))
+DISPATCH_WAIT_TIMEOUT = float(os.getenv("DISPATCH_WAIT_TIMEOUT", "15"))
+STREAM_POLL_INTERVAL = float(os.getenv("STREAM_POLL_INTERVAL", "0.5"))
+STATUS_CACHE_TTL = float(os.getenv("STATUS_CACHE_TTL", "1"))
+STATUS_CACHE_SIZE = int(os.getenv("STATUS_CACHE_SIZE", "1000"))
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "500"))
+BATCH_STATUS_CONCURRENCY = int(os.getenv("BATCH_STATUS_CONCURRENCY", "20"))
+# Most step log entries returned by one ?since= poll
+STEP_LOG_PAGE_SIZE = int(os.getenv("STEP_LOG_PAGE_SIZE", "200"))
+TASK_DB_PATH = os.getenv("TASK_DB_PATH", os.path.join("data", "tasks.db"))
+# "sqlite" shares task state between bridge workers; "memory" is a single-process stand-in
+TASK_STORE = os.getenv("TASK_STORE", "sqlite")
+TASK_STORE_FLUSH_INTERVAL = float(os.getenv("TASK_STORE_FLUSH_INTERVAL", "0.5"))
+# A worker that has not heartbeated for this long is presumed dead and its active tasks failed
+WORKER_LEASE = float(os.getenv("WORKER_LEASE", "30"))
+# Bridge processes started by `python main.py`; per-process limits are divided between them
+BRIDGE_WORKERS = max(1, int(os.getenv("BRIDGE_WORKERS", "1")))
+# How often a worker picks up stop/pause/resume requests made through other workers
+CONTROL_POLL_INTERVAL = float(os.getenv("CONTROL_POLL_INTERVAL", "0.5"))
+CONTROL_WAIT_TIMEOUT = float(os.getenv("CONTROL_WAIT_TIMEOUT", "5"))
+# Seconds a completed read-only task's result is reused for identical requests (0 disables)
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "0"))
+IDEMPOTENCY_KEY_TTL = float(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+# Replay recorded action traces for repeated instructions instead of running the LLM agent
+REPLAY_ENABLED = os.getenv("REPLAY_ENABLED", "false").lower() == "true"
+LLM_RATE_LIMIT_BACKOFF = float(os.getenv("LLM_RATE_LIMIT_BACKOFF", "30"))
+# Retry-After sent with 429s when the task queue itself is full
+QUEUE_RETRY_AFTER = int(os.getenv("QUEUE_RETRY_AFTER", "10"))
+# A routed run that reports no progress for this long fails over to another model
+MODEL_STALL_TIMEOUT = float(os.getenv("MODEL_STALL_TIMEOUT", "90"))
+
+# Java microservice that vets instructions before they are queued (empty disables the check)
+VERIFIER_URL = os.getenv("VERIFIER_URL", "")
+
+# Direct API worker nodes, with least-outstanding routing and sticky task placement
+api_pool = DirectApiPool(WEBUI_API_URLS)
+
+# Background health probes for the Gradio backend and every direct API worker
+health_monitor = HealthMonitor(
+    upstream,
+    {
+        "webui": f"{WEBUI_BASE_URL}/",
+        **api_pool.health_urls(),
+    },
+    interval=HEALTH_CHECK_INTERVAL,
+)
+api_pool.attach(health_monitor)
+
+# Remembers which Gradio endpoint and payload shape accept instructions
+route_negotiator = RouteNegotiator(upstream, WEBUI_BASE_URL)
+
+# Warm headless browsers for the Selenium fallback
+driver_pool = DriverPool(
+    WEBUI_BASE_URL,
+    size=int(os.getenv("SELENIUM_POOL_SIZE", "2")),
+    max_uses=int(os.getenv("SELENIUM_MAX_USES", "20")),
+)
 
 # Pydantic models
 class AgentRequest(BaseModel):
     instruction: str
-    agent_settings: dict
-    browser_settings: dict
+    agent_settings: dict = {}
+    browser_settings: dict = {}
+    # Content hash from POST /api/configs; inline settings override the preset's fields
+    config_ref: Optional[str] = None
     agent_type: str = "browser_use"
+    priority: int = 0
+    # Set for instructions that only read (e.g. "check my inbox") so recent results can be reused
+    read_only: bool = False
+    # Interactive (voice) submissions take the fast lane ahead of batch work
+    interactive: bool = False
+
+class ConfigPreset(BaseModel):
+    agent_settings: dict = {}
+    browser_settings: dict = {}
+
+def submit_via_selenium(instruction: str) -> bool:
+    """Type the instruction into the Gradio web-ui with a pooled headless browser"""
+    try:
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        # Reuse a warm driver; concurrent fallbacks wait for a free one
+        with driver_pool.session() as driver:
+            # Wait for page to load
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.TAG_NAME, "body"))
+            )
+            
+            # Try to find and fill the instruction input
+            try:
+                # Look for common input field selectors
+                input_selectors = [
+                    "textarea",
+                    "input[type='text']",
+                    "[data-testid='instruction-input']",
+                    ".gradio-textbox textarea"
+                ]
+                
+                instruction_input = None
+                for selector in input_selectors:
+                    try:
+                        instruction_input = driver.find_element(By.CSS_SELECTOR, selector)
+                        break
+                    except:
+                        continue
+                
+                if instruction_input:
+                    # Clear and enter instruction
+                    instruction_input.clear()
+                    instruction_input.send_keys(instruction)
+                    
+                    # Look for submit button
+                    submit_selectors = [
+                        "button[type='submit']",
+                        "button:contains('Start')",
+                        "button:contains('Run')",
+                        ".gradio-button"
+                    ]
+                    
+                    for selector in submit_selectors:
+                        try:
+                            submit_button = driver.find_element(By.CSS_SELECTOR, selector)
+                            submit_button.click()
+                            break
+                        except:
+                            continue
+                    
+                    print(f"Successfully automated web-ui execution")
+                    return True
+                
+            except Exception as selenium_error:
+                print(f"Selenium automation failed: {selenium_error}")
+            
+    except ImportError:
+        print("Selenium not available, skipping automation")
+    except DriverPoolTimeout as pool_error:
+        print(f"Selenium automation skipped: {pool_error}")
+    except Exception as selenium_error:
+        print(f"Selenium setup failed: {selenium_error}")
+    
+    return False
+
+@app.on_event("startup")
+async def startup():
+    await upstream.start()
+    await asyncio.to_thread(task_store.open)
+    await asyncio.to_thread(trace_store.open)
+    await asyncio.to_thread(preset_store.open)
+    await health_monitor.start()
+    await task_manager.start()
+    app.state.control_loop = asyncio.create_task(apply_remote_controls())
+    await transcription_service.start()
+    # Launch the fallback browsers in the background so startup is not delayed
+    asyncio.create_task(asyncio.to_thread(driver_pool.warm))
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.control_loop.cancel()
+    await task_manager.stop()
+    await transcription_service.stop()
+    await asyncio.to_thread(task_store.close)
+    await asyncio.to_thread(trace_store.close)
+    await asyncio.to_thread(preset_store.close)
+    await health_monitor.stop()
+    await asyncio.to_thread(driver_pool.close)
+    await upstream.close()
 
 @app.get("/")
 async def root():
@@ -41,14 +248,32 @@ async def health():
 
 @app.get("/api/status")
 async def api_status():
+    backends = health_monitor.snapshot()
+    automation_available = api_pool.any_available() or health_monitor.is_available("webui")
     return {
         "status": "running",
         "version": "1.0.0",
         "services": {
-            "browser_automation": "available",
+            "browser_automation": "available" if automation_available else "unavailable",
             "websocket": "available",
             "file_upload": "available"
-        }
+        },
+        "backends": backends,
+        "direct_api_pool": api_pool.snapshot(),
+        "gradio_route": route_negotiator.snapshot(),
+        "selenium_pool": driver_pool.snapshot(),
+        "worker_id": task_store.worker_id,
+        "tasks": task_manager.stats(),
+        "streams": task_stream_hub.stats(),
+        "status_cache": status_cache.stats(),
+        "config_presets": preset_store.stats(),
+        "verifier": verifier.stats() if verifier is not None else None,
+        "transcription": transcription_service.stats(),
+        "submissions": submission_index.stats(),
+        "admission": admission.stats(),
+        "llm_quotas": llm_scheduler.stats(),
+        "model_routing": model_router.stats(),
+        "action_traces": await asyncio.to_thread(trace_store.stats)
     }
 
 @app.get("/api/agents")
@@ -74,260 +299,768 @@ async def list_agents():
 async def options_start_agent():
     return {"message": "OK"}
 
-@app.post("/api/agents/start")
-async def start_agent(agent_data: AgentRequest):
-    print(f"Received POST request to /api/agents/start with data: {agent_data}")
+async def fetch_upstream_status(upstream_task_id: str) -> dict:
+    """Fetch a task document from the direct API worker running it"""
+    node = api_pool.node_for(upstream_task_id)
     try:
-        # Check if web-ui backend is running
-        try:
-            response = requests.get(f"{WEBUI_BASE_URL}/", timeout=5)
-            if response.status_code != 200:
-                raise HTTPException(status_code=503, detail="Web-UI backend is not responding")
-        except requests.exceptions.RequestException:
-            raise HTTPException(status_code=503, detail="Web-UI backend is not running. Please start it first.")
-        
-        # Generate task ID
-        task_id = f"task_{int(time.time() * 1000)}"
-        
-        # Send instruction to web-ui backend
-        print(f"Sending instruction to web-ui backend: {agent_data.instruction}")
-        
+        response = await upstream.get(f"{node.url}/api/task/{upstream_task_id}", route="status")
+    except UpstreamError:
+        api_pool.record_failure(node)
+        raise
+    if response.status_code >= 500:
+        api_pool.record_failure(node)
+    else:
+        api_pool.record_success(node)
+    if response.status_code != 200:
+        raise UpstreamStatusError(response.status_code)
+    return response.json()
+
+# Coalesces concurrent status lookups for the same task into one upstream call
+status_cache = StatusCache(fetch_upstream_status, running_ttl=STATUS_CACHE_TTL, max_entries=STATUS_CACHE_SIZE)
+
+async def dispatch_instruction(task: Task) -> dict:
+    """Hand the task's instruction to the first backend that accepts it"""
+    # Check if web-ui backend is running, using the cached health state
+    webui_available = health_monitor.is_available("webui")
+    direct_api_available = api_pool.any_available()
+    if not webui_available and not direct_api_available:
+        raise TaskFailedError("Web-UI backend is not running. Please start it first.")
+    
+    # Send instruction to web-ui backend
+    print(f"Attempting to trigger web-ui backend execution for: {task.instruction}")
+    
+    # Method 1: Try the direct API workers first, least loaded first
+    tried_nodes = []
+    while direct_api_available:
+        node = api_pool.choose(exclude=tried_nodes)
+        if node is None:
+            break
+        tried_nodes.append(node)
         try:
-            # Try to interact with the web-ui backend
-            print(f"Attempting to trigger web-ui backend execution for: {agent_data.instruction}")
+            print(f"Trying direct web-ui API server at {node.url}")
             
-            # Method 1: Try the direct API server first
-            try:
-                print(f"Trying direct web-ui API server at {WEBUI_API_URL}")
-                
-                api_payload = {
-                    "instruction": agent_data.instruction,
-                    "agent_settings": agent_data.agent_settings,
-                    "browser_settings": agent_data.browser_settings
-                }
-                
-                api_response = requests.post(
-                    f"{WEBUI_API_URL}/api/execute",
-                    json=api_payload,
-                    timeout=10
-                )
-                
-                print(f"Direct API response status: {api_response.status_code}")
-                
-                if api_response.status_code == 200:
-                    response_data = api_response.json()
-                    print(f"Successfully queued task via direct API: {response_data.get('task_id')}")
-                    
-                    # Start polling for task status
-                    task_id = response_data.get('task_id')
-                    
-                    return {
-                        "task_id": task_id,
-                        "status": "started",
-                        "message": f"Agent {agent_data.agent_type} started successfully",
-                        "instruction": agent_data.instruction,
-                        "webui_status": "connected",
-                        "execution_status": "processing",
-                        "api_response": response_data,
-                        "note": "Instruction queued for execution via direct web-ui API",
-                        "polling_url": f"{WEBUI_API_URL}/api/task/{task_id}"
-                    }
-                else:
-                    print(f"Direct API returned status {api_response.status_code}: {api_response.text}")
-                    
-            except requests.exceptions.RequestException as api_error:
-                print(f"Direct API call failed: {api_error}")
+            api_payload = {
+                "instruction": task.instruction,
+                "agent_settings": task.agent_settings,
+                "browser_settings": task.browser_settings
+            }
             
-            # Method 2: Try to find and call the Gradio API endpoints
-            print(f"Trying Gradio API endpoints as fallback")
-            gradio_endpoints = [
-                "/api/predict",
-                "/run/predict",
-                "/api/v1/predict"
-            ]
+            api_response = await upstream.post(
+                f"{node.url}/api/execute",
+                route="execute",
+                json=api_payload
+            )
             
-            for endpoint in gradio_endpoints:
-                try:
-                    print(f"Trying Gradio endpoint: {endpoint}")
-                    
-                    # Try different payload formats
-                    payloads = [
-                        {"data": [agent_data.instruction], "fn_index": 0},
-                        {"data": [agent_data.instruction]},
-                        {"instruction": agent_data.instruction},
-                        {"query": agent_data.instruction}
-                    ]
-                    
-                    for payload in payloads:
-                        try:
-                            gradio_response = requests.post(
-                                f"{WEBUI_BASE_URL}{endpoint}",
-                                json=payload,
-                                timeout=5
-                            )
-                            
-                            print(f"Gradio response status: {gradio_response.status_code}")
-                            
-                            if gradio_response.status_code == 200:
-                                print(f"Successfully triggered Gradio execution via {endpoint}")
-                                return {
-                                    "task_id": task_id,
-                                    "status": "started",
-                                    "message": f"Agent {agent_data.agent_type} started successfully",
-                                    "instruction": agent_data.instruction,
-                                    "webui_status": "connected",
-                                    "execution_status": "processing",
-                                    "gradio_response": gradio_response.json(),
-                                    "note": f"Instruction sent to Gradio web-ui backend via {endpoint}"
-                                }
-                                
-                        except requests.exceptions.RequestException as e:
-                            print(f"Request failed for {endpoint} with payload {payload}: {e}")
-                            continue
-                            
-                except Exception as e:
-                    print(f"Error trying {endpoint}: {e}")
-                    continue
+            print(f"Direct API response status: {api_response.status_code}")
             
-            # Method 2: Try to use Selenium to automate the web-ui
-            print(f"Attempting Selenium automation of web-ui")
-            try:
-                from selenium import webdriver
-                from selenium.webdriver.common.by import By
-                from selenium.webdriver.support.ui import WebDriverWait
-                from selenium.webdriver.support import expected_conditions as EC
-                from selenium.webdriver.chrome.options import Options
-                
-                # Set up Chrome options
-                chrome_options = Options()
-                chrome_options.add_argument("--headless")  # Run in background
-                chrome_options.add_argument("--no-sandbox")
-                chrome_options.add_argument("--disable-dev-shm-usage")
-                
-                # Create driver
-                driver = webdriver.Chrome(options=chrome_options)
-                
-                # Navigate to web-ui
-                driver.get(WEBUI_BASE_URL)
+            if api_response.status_code < 500:
+                api_pool.record_success(node)
+            else:
+                api_pool.record_failure(node)
+            
+            if api_response.status_code == 200:
+                response_data = api_response.json()
+                task.upstream_task_id = response_data.get('task_id')
+                api_pool.assign(task.upstream_task_id, node)
+                print(f"Successfully queued task via direct API: {task.upstream_task_id} on {node.url}")
                 
-                # Wait for page to load
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
+                return {
+                    "execution_status": "processing",
+                    "api_response": response_data,
+                    "upstream_node": node.url,
+                    "note": "Instruction queued for execution via direct web-ui API",
+                    "polling_url": f"/api/task/{task.task_id}/status"
+                }
+            else:
+                print(f"Direct API returned status {api_response.status_code}: {api_response.text}")
                 
-                # Try to find and fill the instruction input
-                try:
-                    # Look for common input field selectors
-                    input_selectors = [
-                        "textarea",
-                        "input[type='text']",
-                        "[data-testid='instruction-input']",
-                        ".gradio-textbox textarea"
-                    ]
-                    
-                    instruction_input = None
-                    for selector in input_selectors:
-                        try:
-                            instruction_input = driver.find_element(By.CSS_SELECTOR, selector)
-                            break
-                        except:
-                            continue
-                    
-                    if instruction_input:
-                        # Clear and enter instruction
-                        instruction_input.clear()
-                        instruction_input.send_keys(agent_data.instruction)
-                        
-                        # Look for submit button
-                        submit_selectors = [
-                            "button[type='submit']",
-                            "button:contains('Start')",
-                            "button:contains('Run')",
-                            ".gradio-button"
-                        ]
-                        
-                        for selector in submit_selectors:
-                            try:
-                                submit_button = driver.find_element(By.CSS_SELECTOR, selector)
-                                submit_button.click()
-                                break
-                            except:
-                                continue
-                        
-                        print(f"Successfully automated web-ui execution")
-                        driver.quit()
-                        
-                        return {
-                            "task_id": task_id,
-                            "status": "started",
-                            "message": f"Agent {agent_data.agent_type} started successfully",
-                            "instruction": agent_data.instruction,
-                            "webui_status": "connected",
-                            "execution_status": "processing",
-                            "note": "Instruction sent to web-ui backend via Selenium automation"
-                        }
-                    
-                except Exception as selenium_error:
-                    print(f"Selenium automation failed: {selenium_error}")
-                    driver.quit()
-                    
-            except ImportError:
-                print("Selenium not available, skipping automation")
-            except Exception as selenium_error:
-                print(f"Selenium setup failed: {selenium_error}")
-            
-            # Method 3: Fallback - provide clear manual instructions
-            print(f"Using fallback method - providing manual instructions")
-            
+        except UpstreamError as api_error:
+            print(f"Direct API call failed: {api_error}")
+            api_pool.record_failure(node)
+    
+    if webui_available:
+        # Method 2: Call the Gradio API through the negotiated endpoint and payload shape
+        print(f"Trying Gradio API endpoints as fallback")
+        gradio_result = await route_negotiator.submit(task.instruction)
+        if gradio_result:
+            endpoint, gradio_response = gradio_result
+            print(f"Successfully triggered Gradio execution via {endpoint}")
             return {
-                "task_id": task_id,
-                "status": "started",
-                "message": f"Agent {agent_data.agent_type} started successfully",
-                "instruction": agent_data.instruction,
-                "webui_status": "connected",
-                "execution_status": "manual_required",
-                "note": f"⚠️ Manual execution required: Please execute '{agent_data.instruction}' in your web-ui",
-                "manual_steps": [
-                    f"1. Open {WEBUI_BASE_URL} in your browser",
-                    f"2. Go to the 'Run Agent' tab",
-                    f"3. Enter: '{agent_data.instruction}'",
-                    "4. Click 'Start Agent' to execute",
-                    "5. Watch the browser automation happen!"
-                ],
-                "webui_url": WEBUI_BASE_URL
+                "execution_status": "processing",
+                "gradio_response": gradio_response.json(),
+                "note": f"Instruction sent to Gradio web-ui backend via {endpoint}"
             }
-            
-        except Exception as webui_error:
-            print(f"Error communicating with web-ui backend: {webui_error}")
+        
+        # Method 2: Try to use Selenium to automate the web-ui
+        print(f"Attempting Selenium automation of web-ui")
+        # Selenium is synchronous, so it runs in a worker thread to keep the event loop free
+        if await asyncio.to_thread(submit_via_selenium, task.instruction):
             return {
-                "task_id": task_id,
-                "status": "started",
-                "message": f"Agent {agent_data.agent_type} started but web-ui communication failed",
-                "instruction": agent_data.instruction,
-                "webui_status": "error",
-                "error": str(webui_error)
+                "execution_status": "processing",
+                "note": "Instruction sent to web-ui backend via Selenium automation"
             }
-        
+    
+    # Method 3: Fallback - provide clear manual instructions
+    print(f"Using fallback method - providing manual instructions")
+    
+    return {
+        "execution_status": "manual_required",
+        "note": f"⚠️ Manual execution required: Please execute '{task.instruction}' in your web-ui",
+        "manual_steps": [
+            f"1. Open {WEBUI_BASE_URL} in your browser",
+            f"2. Go to the 'Run Agent' tab",
+            f"3. Enter: '{task.instruction}'",
+            "4. Click 'Start Agent' to execute",
+            "5. Watch the browser automation happen!"
+        ],
+        "webui_url": WEBUI_BASE_URL
+    }
+
+def replay_in_agent_browser(cdp_url: str, steps: List[dict]) -> tuple:
+    """Replay a trace in the browser the agent drives; returns (steps replayed, divergence or None)"""
+    driver = attach_chrome(cdp_url)
+    try:
+        return replay_trace(driver, steps), None
+    except ReplayDiverged as diverged:
+        return diverged.step, diverged
+    finally:
+        # The outcome above stands whatever happens while detaching
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Failed to detach replay driver: {e}")
+
+async def replay_recorded_actions(task: Task) -> Optional[dict]:
+    """Replay the trace recorded for this instruction; None means the LLM agent must run it"""
+    # Replays must see the agent's cookies and logins, so they only run in its own browser
+    cdp_url = (task.browser_settings or {}).get("cdpUrl")
+    if not cdp_url:
+        return None
+    key = trace_key(task.instruction, task.agent_type)
+    trace = await asyncio.to_thread(trace_store.get, key)
+    if trace is None:
+        return None
+    
+    print(f"Replaying {len(trace['steps'])} recorded actions for: {task.instruction}")
+    task.progress = "Replaying recorded actions"
+    task_manager.touch(task)
+    started = time.perf_counter()
+    try:
+        replayed, diverged = await asyncio.to_thread(replay_in_agent_browser, cdp_url, trace["steps"])
     except Exception as e:
-        print(f"General error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        # Selenium missing or the browser unreachable: no step has run
+        print(f"Replay skipped: {e}")
+        task.progress = None
+        return None
+    await asyncio.to_thread(trace_store.record_replay, key, diverged is None)
+    
+    if diverged is not None:
+        if side_effects_ran(trace["steps"], diverged):
+            # A fresh run would click and type through the same steps again
+            raise TaskFailedError(
+                f"Replay diverged after steps with side effects had run ({diverged}); "
+                "not rerunning the instruction so they are not repeated"
+            )
+        print(f"Replay diverged ({diverged}), falling back to the LLM agent")
+        task.progress = None
+        return None
+    return {
+        "execution_status": "completed",
+        "message": trace.get("result"),
+        "replayed": True,
+        "replayed_steps": replayed,
+        "replayed_from_task": trace.get("source_task_id"),
+        "replay_ms": round((time.perf_counter() - started) * 1000, 1),
+        "note": "Instruction replayed from a recorded action trace without the LLM agent",
+        "polling_url": f"/api/task/{task.task_id}/status"
+    }
+
+async def record_action_trace(task: Task, result: Optional[dict]):
+    steps = extract_trace(result)
+    if steps is None:
+        return
+    try:
+        await asyncio.to_thread(
+            trace_store.save,
+            trace_key(task.instruction, task.agent_type),
+            task.instruction,
+            steps,
+            task.task_id,
+            final_result_text(result, steps),
+        )
+        print(f"Recorded {len(steps)} replayable actions from task {task.task_id}")
+    except Exception as e:
+        print(f"Failed to record action trace for task {task.task_id}: {e}")
+
+async def run_agent_task(task: Task) -> dict:
+    """Task manager runner: dispatch the instruction, then follow it to completion"""
+    # Recurring instructions replay their recorded actions and skip the LLM entirely
+    if REPLAY_ENABLED:
+        replay_info = await replay_recorded_actions(task)
+        if replay_info is not None:
+            task.mark_dispatched(replay_info)
+            return replay_info
+    
+    # agent_settings.modelClass asks for the fastest healthy member of a model class
+    model_class = task.agent_settings.get("modelClass")
+    if not model_class:
+        return await run_on_model(task, None)
+    
+    tried = []
+    while True:
+        try:
+            route = model_router.choose(model_class, exclude=tried)
+        except (KeyError, NoHealthyModelError) as e:
+            raise TaskFailedError(str(e))
+        task.agent_settings = model_router.settings_for(route, task.agent_settings)
+        print(f"Routing task {task.task_id} ({model_class}) to {route[0]}/{route[1]}")
+        try:
+            return await run_on_model(task, route)
+        except (ModelStalledError, TaskFailedError) as e:
+            if isinstance(e, TaskFailedError) and not is_provider_error(str(e)):
+                raise
+            model_router.record_failure(route, str(e))
+            # The stalled run is stopped upstream either way
+            await cancel_upstream(task)
+            if task.upstream_steps:
+                # The browser has already acted; rerunning the instruction would repeat those actions
+                raise TaskFailedError(
+                    f"{e} (on {route[0]}/{route[1]} after {task.upstream_steps} steps; not failing over)"
+                )
+            tried.append(route)
+            # Restart the instruction on the next model
+            task.upstream_task_id = None
+            task.progress = f"Failing over from {route[0]}/{route[1]}: {e}"
+            task_manager.touch(task)
+
+async def run_on_model(task: Task, route: Optional[tuple]) -> dict:
+    def on_quota_wait(key: str, seconds: Optional[float]):
+        task.progress = f"Waiting for {key} rate limit" + (f" (~{seconds:.0f}s)" if seconds else "")
+        task_manager.touch(task)
+    
+    # Hold the run until its LLM provider has quota instead of letting it hit provider 429s;
+    # its worker runs other queued tasks meanwhile
+    async with llm_scheduler.reserve(
+        task.agent_settings, on_wait=on_quota_wait, idle=lambda: task_manager.released(task)
+    ) as quota_key:
+        if task.progress and task.progress.startswith("Waiting for"):
+            task.progress = None
+        try:
+            return await follow_agent_task(task, route)
+        except TaskFailedError as e:
+            if is_rate_limit_error(str(e)):
+                llm_scheduler.backoff(quota_key, LLM_RATE_LIMIT_BACKOFF)
+            raise
+
+async def cancel_upstream(task: Task):
+    if task.upstream_task_id is None:
+        return
+    try:
+        node = api_pool.node_for(task.upstream_task_id)
+        await asyncio.shield(upstream.delete(f"{node.url}/api/task/{task.upstream_task_id}", route="status"))
+        # The cached status predates the cancel
+        status_cache.invalidate(task.upstream_task_id)
+    except UpstreamError as e:
+        print(f"Failed to cancel upstream task {task.upstream_task_id}: {e}")
+
+async def follow_agent_task(task: Task, route: Optional[tuple] = None) -> dict:
+    task.mark_dispatched(await dispatch_instruction(task))
+    task_manager.touch(task)
+    
+    # Only the direct API reports progress; the bridge cannot tell how other paths end
+    if task.upstream_task_id is None:
+        if task.dispatch_info.get("execution_status") == "manual_required":
+            raise TaskHandedOff(TaskStatus.MANUAL_REQUIRED, task.dispatch_info)
+        raise TaskHandedOff(TaskStatus.DISPATCHED, task.dispatch_info)
+    
+    last_change = time.monotonic()
+    try:
+        while True:
+            try:
+                data = await status_cache.get(task.upstream_task_id)
+                if data.get("progress") != task.progress:
+                    task.progress = data.get("progress")
+                    if task.progress:
+                        task.upstream_steps += 1
+                    task_manager.touch(task)
+                    # Time between progress updates approximates one agent step on this model
+                    now = time.monotonic()
+                    if route is not None:
+                        model_router.record_step(route, now - last_change)
+                    last_change = now
+                upstream_status = data.get("status")
+                if upstream_status == "completed":
+                    result = data.get("result") or data
+                    if REPLAY_ENABLED:
+                        await record_action_trace(task, result)
+                    return result
+                if upstream_status in ("error", "cancelled"):
+                    raise TaskFailedError(data.get("error") or f"Task {upstream_status} on the web-ui API server")
+            except (UpstreamError, UpstreamStatusError) as e:
+                print(f"Error polling task {task.task_id}: {e}")
+            if route is not None and time.monotonic() - last_change > MODEL_STALL_TIMEOUT:
+                raise ModelStalledError(f"no progress for {MODEL_STALL_TIMEOUT:.0f}s")
+            await asyncio.sleep(TASK_POLL_INTERVAL)
+    except asyncio.CancelledError:
+        # Propagate the stop to the direct API server before giving up the slot
+        await cancel_upstream(task)
+        raise
+    finally:
+        api_pool.release(task.upstream_task_id)
+
+# Routes agent_settings.modelClass requests to the fastest healthy model in the class
+model_router = ModelRouter(model_classes, credentials=load_credentials(model_classes))
+
+# Per-provider requests/min and tokens/min quotas for agent runs
+llm_scheduler = LLMScheduler(
+    load_limits(),
+    default={
+        "rpm": float(os.getenv("LLM_DEFAULT_RPM", "0")) or None,
+        "tpm": float(os.getenv("LLM_DEFAULT_TPM", "0")) or None,
+        "concurrency": int(os.getenv("LLM_DEFAULT_CONCURRENCY", "0")) or None,
+    },
+    workers=BRIDGE_WORKERS,
+)
+
+# Durable task history shared by all bridge workers; writes are batched off the request path
+if TASK_STORE == "memory":
+    task_store = MemoryTaskStore()
+else:
+    task_store = TaskStore(TASK_DB_PATH, flush_interval=TASK_STORE_FLUSH_INTERVAL, worker_lease=WORKER_LEASE)
+
+# Action traces of successful runs, replayed for repeated instructions
+trace_store = TraceStore(TASK_DB_PATH)
+
+# Concurrent submissions share one /java/verifier:batch call
+verifier = VerifierBatcher(
+    upstream,
+    VERIFIER_URL,
+    max_batch=int(os.getenv("VERIFIER_BATCH_SIZE", "100")),
+    max_delay=float(os.getenv("VERIFIER_BATCH_DELAY_MS", "5")) / 1000,
+) if VERIFIER_URL else None
+
+async def instruction_rejection(instruction: str) -> Optional[str]:
+    """Why the verifier refused an instruction, or None; the check fails open if the verifier is down"""
+    if verifier is None:
+        return None
+    try:
+        verdict = await verifier.verify(instruction)
+    except VerifierUnavailable as e:
+        print(f"Instruction verifier unavailable, skipping check: {e}")
+        return None
+    if verdict.get("verified"):
+        return None
+    return verdict.get("reason") or "rejected by verifier"
+
+# Settings presets uploaded once and referenced by content hash
+preset_store = PresetStore(TASK_DB_PATH, max_cached=int(os.getenv("CONFIG_PRESET_CACHE_SIZE", "256")))
+
+# Owns task lifecycle for every agent run started through the bridge
+task_manager = TaskManager(
+    run_agent_task,
+    concurrency=int(os.getenv("TASK_CONCURRENCY", "4")),
+    queue_size=int(os.getenv("TASK_QUEUE_SIZE", "100")),
+    on_update=task_store.save,
+    interactive_reserve=int(os.getenv("TASK_INTERACTIVE_RESERVE", "1")),
+)
+
+# Per-client submission rate limits and fair-queue weights
+admission = AdmissionController(
+    rate_per_minute=float(os.getenv("CLIENT_RATE_PER_MINUTE", "60")),
+    burst=float(os.getenv("CLIENT_BURST", "20")),
+    interactive_rate_per_minute=float(os.getenv("CLIENT_INTERACTIVE_RATE_PER_MINUTE", "30")),
+    interactive_burst=float(os.getenv("CLIENT_INTERACTIVE_BURST", "5")),
+    weights=load_weights(),
+)
+
+# Idempotency keys and request fingerprints for deduplicating start requests
+submission_index = SubmissionIndex(key_ttl=IDEMPOTENCY_KEY_TTL)
+
+def find_reusable_task(request_fingerprint: str, idempotency_key: Optional[str], read_only: bool) -> Optional[str]:
+    """Task id an incoming start request should attach to instead of starting a new run"""
+    if idempotency_key:
+        task_id = submission_index.by_key(idempotency_key, request_fingerprint)
+        if task_id is not None:
+            return task_id
+    task_id = submission_index.by_fingerprint(request_fingerprint)
+    task = task_manager.find(task_id) if task_id else None
+    if task is None:
+        return None
+    if task.status not in TERMINAL_STATUSES:
+        submission_index.record_hit(reused_result=False)
+        return task_id
+    if (
+        read_only
+        and RESULT_CACHE_TTL > 0
+        and task.status == TaskStatus.COMPLETED
+        and time.time() - task.finished_at <= RESULT_CACHE_TTL
+    ):
+        submission_index.record_hit(reused_result=True)
+        return task_id
+    return None
+
+async def start_response(task: Task, agent_data: AgentRequest) -> dict:
+    # Wait briefly for a worker to hand the instruction to a backend
+    try:
+        await asyncio.wait_for(task.dispatched.wait(), timeout=DISPATCH_WAIT_TIMEOUT)
+    except asyncio.TimeoutError:
+        pass
+    
+    if task.status == TaskStatus.ERROR:
+        return {
+            "task_id": task.task_id,
+            "status": "error",
+            "message": f"Agent {agent_data.agent_type} failed to start",
+            "instruction": agent_data.instruction,
+            "webui_status": "error",
+            "error": task.error
+        }
+    
+    response = {
+        "task_id": task.task_id,
+        "status": "started",
+        "message": f"Agent {agent_data.agent_type} started successfully",
+        "instruction": agent_data.instruction,
+        "webui_status": "connected",
+        "task_status": task.status,
+    }
+    if task.dispatch_info is not None:
+        response.update(task.dispatch_info)
+    else:
+        response.update({
+            "execution_status": "processing",
+            "note": "Instruction queued, waiting for a free agent slot",
+            "polling_url": f"/api/task/{task.task_id}/status"
+        })
+    return response
+
+def client_identity(request: Request, client_id: Optional[str]) -> str:
+    """Clients identify themselves with X-Client-Id; otherwise the peer address is used"""
+    if client_id:
+        return client_id
+    return request.client.host if request.client else "anonymous"
+
+@app.post("/api/agents/start")
+async def start_agent(
+    agent_data: AgentRequest,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    client_id: Optional[str] = Header(None, alias="X-Client-Id"),
+):
+    print(f"Received POST request to /api/agents/start with data: {agent_data}")
+    return await start_agent_task(agent_data, client_identity(request, client_id), idempotency_key)
+
+async def find_config_preset(config_ref: str) -> Optional[dict]:
+    """Normalized settings of a preset, or None if there is no such config_ref"""
+    preset = preset_store.cached(config_ref)
+    if preset is None:
+        preset = await asyncio.to_thread(preset_store.get, config_ref)
+    return preset
+
+# The voice stream checks config_ref when it is configured, not only at dispatch
+app.state.find_config_preset = find_config_preset
+
+async def resolve_config_ref(agent_data: AgentRequest):
+    """Expand config_ref into the preset's normalized settings, with inline fields taking precedence"""
+    if not agent_data.config_ref:
+        return
+    preset = await find_config_preset(agent_data.config_ref)
+    if preset is None:
+        raise HTTPException(status_code=422, detail=f"Unknown config_ref '{agent_data.config_ref}'")
+    agent_data.agent_settings = {**preset["agent_settings"], **agent_data.agent_settings}
+    agent_data.browser_settings = {**preset["browser_settings"], **agent_data.browser_settings}
+
+async def validate_agent_request(agent_data: AgentRequest):
+    """Per-request checks shared by single and batch starts; raises HTTPException"""
+    await resolve_config_ref(agent_data)
+    # Reject a modelClass the router does not know or cannot send to any model
+    model_class = agent_data.agent_settings.get("modelClass")
+    if model_class and model_class not in model_router.classes:
+        raise HTTPException(status_code=400, detail=f"Unknown model class '{model_class}'")
+    if model_class and not model_router.routable(model_class):
+        raise HTTPException(status_code=400, detail=f"No model in class '{model_class}' has server-side credentials")
+
+async def start_agent_task(agent_data: AgentRequest, client_id: str, idempotency_key: Optional[str] = None) -> dict:
+    await validate_agent_request(agent_data)
+    request_fingerprint = fingerprint(
+        agent_data.instruction, agent_data.agent_type, agent_data.agent_settings, agent_data.browser_settings
+    )
+    # Verified before the lookup: from the lookup to remember() nothing may await, or two
+    # identical requests arriving together would both miss the index and both start a run
+    rejection = await instruction_rejection(agent_data.instruction)
+    if rejection is not None:
+        raise HTTPException(status_code=422, detail=f"Instruction rejected: {rejection}")
+    
+    # Retries and double submissions attach to the run already started for them
+    try:
+        existing_id = find_reusable_task(request_fingerprint, idempotency_key, agent_data.read_only)
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if existing_id is not None:
+        task = task_manager.find(existing_id)
+        if task is not None:
+            response = await start_response(task, agent_data)
+        else:
+            record = await asyncio.to_thread(task_store.get, existing_id)
+            if record is None:
+                raise HTTPException(status_code=404, detail="Task for this Idempotency-Key no longer exists")
+            response = {
+                "task_id": existing_id,
+                "status": "error" if record["status"] == TaskStatus.ERROR else "started",
+                "message": f"Agent {agent_data.agent_type} already ran for this request",
+                "instruction": agent_data.instruction,
+                "task_status": record["status"],
+                "polling_url": f"/api/task/{existing_id}/status"
+            }
+        print(f"Attached duplicate request to task {existing_id}")
+        response["deduplicated"] = True
+        return response
+    
+    # Fail fast when no backend can take the instruction
+    if not health_monitor.is_available("webui") and not api_pool.any_available():
+        raise HTTPException(status_code=503, detail="Web-UI backend is not running. Please start it first.")
+    
+    # Per-client rate limits, then weighted fair queuing inside the task manager
+    try:
+        admission.admit(client_id, interactive=agent_data.interactive)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": e.retry_after_header})
+    try:
+        task = task_manager.submit(
+            agent_data.instruction,
+            agent_data.agent_type,
+            agent_data.agent_settings,
+            agent_data.browser_settings,
+            priority=agent_data.priority,
+            client_id=client_id,
+            weight=admission.weight(client_id),
+            interactive=agent_data.interactive,
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(QUEUE_RETRY_AFTER)})
+    submission_index.remember(request_fingerprint, task.task_id, idempotency_key)
+    
+    return await start_response(task, agent_data)
+
+async def start_instruction(instruction: str, options: dict, client_id: str = "voice") -> dict:
+    """Agent start path for in-process callers such as the voice stream; always interactive"""
+    agent_data = AgentRequest(
+        instruction=instruction, **{"agent_settings": {}, "browser_settings": {}, **options, "interactive": True}
+    )
+    return await start_agent_task(agent_data, client_id)
+
+app.state.start_instruction = start_instruction
+
+@app.post("/api/agents/start:batch")
+async def start_agents_batch(
+    batch: List[AgentRequest],
+    request: Request,
+    client_id: Optional[str] = Header(None, alias="X-Client-Id"),
+):
+    """Queue many agent tasks in one call and report the outcome per item"""
+    if len(batch) > BATCH_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_SIZE} items")
+    # One health check for the whole batch
+    if not health_monitor.is_available("webui") and not api_pool.any_available():
+        raise HTTPException(status_code=503, detail="Web-UI backend is not running. Please start it first.")
+    client_id = client_identity(request, client_id)
+    # The client pays only for items that get queued, once the batch is through
+    lanes = {agent_data.interactive for agent_data in batch}
+    try:
+        for interactive in lanes:
+            admission.check(client_id, interactive=interactive)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": e.retry_after_header})
+    
+    # All items are verified concurrently, so the verifier client sends them as one batch
+    rejections = await asyncio.gather(*(instruction_rejection(agent_data.instruction) for agent_data in batch))
+    
+    # Queued tasks run on the task manager's workers, which bound how many execute at once
+    results = []
+    queued = {interactive: 0 for interactive in lanes}
+    for index, agent_data in enumerate(batch):
+        try:
+            await validate_agent_request(agent_data)
+        except HTTPException as e:
+            results.append({"index": index, "task_id": None, "status": "rejected", "error": e.detail})
+            continue
+        if rejections[index] is not None:
+            results.append({"index": index, "task_id": None, "status": "rejected", "error": f"Instruction rejected: {rejections[index]}"})
+            continue
+        request_fingerprint = fingerprint(
+            agent_data.instruction, agent_data.agent_type, agent_data.agent_settings, agent_data.browser_settings
+        )
+        existing_id = find_reusable_task(request_fingerprint, None, agent_data.read_only)
+        if existing_id is not None:
+            results.append({
+                "index": index,
+                "task_id": existing_id,
+                "status": "deduplicated",
+                "polling_url": f"/api/task/{existing_id}/status"
+            })
+            continue
+        try:
+            task = task_manager.submit(
+                agent_data.instruction,
+                agent_data.agent_type,
+                agent_data.agent_settings,
+                agent_data.browser_settings,
+                priority=agent_data.priority,
+                client_id=client_id,
+                weight=admission.weight(client_id),
+                interactive=agent_data.interactive,
+            )
+            submission_index.remember(request_fingerprint, task.task_id)
+            queued[agent_data.interactive] += 1
+            results.append({
+                "index": index,
+                "task_id": task.task_id,
+                "status": "queued",
+                "polling_url": f"/api/task/{task.task_id}/status"
+            })
+        except QueueFullError as e:
+            results.append({"index": index, "task_id": None, "status": "rejected", "error": str(e)})
+    
+    submitted = sum(1 for result in results if result["status"] == "queued")
+    for interactive, count in queued.items():
+        admission.charge(client_id, count, interactive=interactive)
+    return {
+        "submitted": submitted,
+        "deduplicated": sum(1 for result in results if result["status"] == "deduplicated"),
+        "rejected": sum(1 for result in results if not result["task_id"]),
+        "results": results
+    }
+
+@app.post("/api/configs")
+async def create_config_preset(preset: ConfigPreset):
+    """Validate and store agent/browser settings once; submit with the returned config_ref"""
+    try:
+        config_ref, _, created = await asyncio.to_thread(
+            preset_store.put, preset.agent_settings, preset.browser_settings
+        )
+    except InvalidPresetError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"config_ref": config_ref, "created": created}
+
+@app.get("/api/configs/{config_ref}")
+async def get_config_preset(config_ref: str):
+    """Normalized settings of a preset, with API keys masked"""
+    preset = await asyncio.to_thread(preset_store.get, config_ref)
+    if preset is None:
+        raise HTTPException(status_code=404, detail=f"Config preset {config_ref} not found")
+    return {"config_ref": config_ref, **redact(preset)}
+
+@app.get("/api/tasks/status")
+async def get_tasks_status(ids: List[str] = Query(...)):
+    """Get many task states at once; accepts ?ids=a,b or repeated ?ids="""
+    task_ids = list(dict.fromkeys(
+        task_id.strip() for value in ids for task_id in value.split(",") if task_id.strip()
+    ))
+    if len(task_ids) > BATCH_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f"Request exceeds {BATCH_MAX_SIZE} task ids")
+    
+    # Missing states are fetched concurrently, bounded so one call cannot flood the direct API
+    semaphore = asyncio.Semaphore(BATCH_STATUS_CONCURRENCY)
+    
+    async def fetch(task_id: str) -> dict:
+        async with semaphore:
+            try:
+                return await get_task_status(task_id)
+            except HTTPException as e:
+                return {"task_id": task_id, "status": "error", "error": e.detail}
+    
+    statuses = await asyncio.gather(*(fetch(task_id) for task_id in task_ids))
+    return {"tasks": dict(zip(task_ids, statuses))}
+
+def conditional_json(request: Request, payload: dict, etag: str) -> Response:
+    """JSON response tagged with ``etag``; 304 without a body if the client already has it"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in (value.strip() for value in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(payload, headers=headers)
+
+async def read_step_log(task_id: str, since: int, limit: int) -> dict:
+    steps, last_seq = await asyncio.to_thread(task_store.steps, task_id, since, limit)
+    next_since = steps[-1]["seq"] if steps else since
+    return {"steps": steps, "next_since": next_since, "last_seq": last_seq, "has_more": next_since < last_seq}
 
 @app.get("/api/task/{task_id}/status")
+async def task_status(task_id: str, request: Request, since: Optional[int] = Query(None, ge=0)):
+    """Task status with ETag/304 support.
+
+    With ``?since=`` the response is a compact delta: the current state, the
+    step log entries after that cursor and ``next_since`` for the next poll;
+    the result is only included once the task has finished.
+    """
+    data = await get_task_status(task_id)
+    if since is not None:
+        delta = {
+            field: data.get(field)
+            for field in ("task_id", "upstream_task_id", "status", "bridge_status", "progress", "error")
+            if field in data
+        }
+        if data.get("status") in TERMINAL_STATUSES:
+            delta["result"] = data.get("result")
+        delta.update(await read_step_log(task_id, since, STEP_LOG_PAGE_SIZE))
+        data = delta
+    digest = hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()[:20]
+    return conditional_json(request, data, f'W/"{digest}"')
+
+@app.get("/api/task/{task_id}/steps")
+async def task_steps(
+    task_id: str,
+    request: Request,
+    since: int = Query(0, ge=0),
+    limit: int = Query(STEP_LOG_PAGE_SIZE, ge=1, le=1000),
+):
+    """Append-only step log of a task; pass next_since back as since to get only new entries"""
+    task = task_manager.find(task_id)
+    record = task.to_dict() if task is not None else await asyncio.to_thread(task_store.get, task_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    log = await read_step_log(task_id, since, limit)
+    payload = {"task_id": task_id, "status": record["status"], **log}
+    # The page depends on limit too, so a poll with a different page size must not get 304
+    return conditional_json(request, payload, f'W/"{since}-{limit}-{log["last_seq"]}-{record["status"]}"')
+
 async def get_task_status(task_id: str):
     """Get the status of a task from the direct API server"""
+    task = task_manager.find(task_id)
+    if task is None:
+        # Finished tasks leave the in-memory hot set but stay in the store
+        record = await asyncio.to_thread(task_store.get, task_id)
+        if record is not None:
+            return record
+    elif task.upstream_task_id is None or task.status in TERMINAL_STATUSES:
+        # Not (yet) on the direct API server, or already finished by the bridge (e.g. stopped while
+        # upstream ignored the cancel), so the bridge's own state is authoritative
+        return task.to_dict()
+    upstream_task_id = task.upstream_task_id if task is not None else task_id
+    
     try:
-        # Check if web-ui API server is running
+        # Fail fast while the circuit of the worker running the task is open
+        if not api_pool.is_available(api_pool.node_for(upstream_task_id)):
+            return {
+                "task_id": task_id,
+                "status": "error",
+                "error": "Web-UI API server is not running"
+            }
+        
         try:
-            response = requests.get(f"{WEBUI_API_URL}/api/task/{task_id}", timeout=5)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {
-                    "task_id": task_id,
-                    "status": "error",
-                    "error": f"API server returned status {response.status_code}"
-                }
-        except requests.exceptions.RequestException:
+            # Copy, since the cached document is shared between callers
+            data = dict(await status_cache.get(upstream_task_id))
+            if task is not None:
+                data["task_id"] = task.task_id
+                data["upstream_task_id"] = upstream_task_id
+                data["bridge_status"] = task.status
+            return data
+        except UpstreamStatusError as e:
+            return {
+                "task_id": task_id,
+                "status": "error",
+                "error": str(e)
+            }
+        except UpstreamError:
             return {
                 "task_id": task_id,
                 "status": "error",
@@ -336,13 +1069,155 @@ async def get_task_status(task_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/agent/tasks")
+async def list_tasks(
+    status: Optional[str] = None,
+    agent_type: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    """List tasks newest first; pass next_cursor back as cursor for the next page"""
+    try:
+        tasks, next_cursor = await asyncio.to_thread(task_store.list, status, agent_type, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"tasks": tasks, "next_cursor": next_cursor}
+
+@app.get("/api/agent/history/{task_id}")
+async def get_task_history(task_id: str):
+    """Get a task's record and its recorded state transitions"""
+    task = task_manager.find(task_id)
+    record = task.to_dict() if task is not None else await asyncio.to_thread(task_store.get, task_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    history = await asyncio.to_thread(task_store.history, task_id)
+    return {"task": record, "history": history}
+
+# One upstream watcher per streamed task, shared by all its subscribers
+task_stream_hub = TaskStreamHub(get_task_status, interval=STREAM_POLL_INTERVAL)
+
+@app.websocket("/ws/agent/{task_id}")
+async def task_updates_ws(websocket: WebSocket, task_id: str):
+    """Push task state transitions to the client until the task finishes"""
+    await websocket.accept()
+    try:
+        async for message in task_stream_hub.messages(task_id):
+            await websocket.send_json(message)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+@app.get("/api/task/{task_id}/events")
+async def task_updates_sse(task_id: str):
+    """Server-sent events variant of /ws/agent/{task_id}"""
+    async def event_stream():
+        async for message in task_stream_hub.messages(task_id):
+            yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def apply_remote_controls():
+    """Apply stop/pause/resume requests that other bridge workers queued for this worker's tasks"""
+    while True:
+        try:
+            controls = await asyncio.to_thread(task_store.take_controls)
+        except Exception as e:
+            print(f"Failed to read task controls: {e}")
+            controls = []
+        for task_id, action in controls:
+            try:
+                if action == "cancel":
+                    await task_manager.cancel(task_id)
+                elif action == "pause":
+                    task_manager.pause(task_id)
+                else:
+                    task_manager.resume(task_id)
+            except (TaskNotFoundError, InvalidTaskStateError) as e:
+                print(f"Ignoring {action} request for task {task_id}: {e}")
+        await asyncio.sleep(CONTROL_POLL_INTERVAL)
+
+def control_applied(action: str, status: str) -> bool:
+    if action == "cancel":
+        return status in TERMINAL_STATUSES
+    if action == "pause":
+        return status == TaskStatus.PAUSED or status in TERMINAL_STATUSES
+    return status != TaskStatus.PAUSED
+
+async def control_remote_task(task_id: str, action: str) -> dict:
+    """Forward a control request to the worker running the task and wait briefly for it to apply"""
+    record = await asyncio.to_thread(task_store.get, task_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    status = record["status"]
+    if action == "cancel" and status in TERMINAL_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Task is already {status}")
+    if action == "pause" and status != TaskStatus.QUEUED:
+        raise HTTPException(status_code=409, detail=f"Cannot pause a {status} task; only queued tasks can be paused")
+    if action == "resume" and status != TaskStatus.PAUSED:
+        raise HTTPException(status_code=409, detail=f"Cannot resume a {status} task")
+    
+    await asyncio.to_thread(task_store.request_control, task_id, record["owner"], action)
+    deadline = time.monotonic() + CONTROL_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(CONTROL_POLL_INTERVAL / 2)
+        record = await asyncio.to_thread(task_store.get, task_id) or record
+        if control_applied(action, record["status"]):
+            break
+    return record
+
 @app.post("/api/agents/{task_id}/stop")
 async def stop_agent(task_id: str):
+    try:
+        task_status = (await task_manager.cancel(task_id)).status
+    except TaskNotFoundError:
+        # Started through another bridge worker
+        task_status = (await control_remote_task(task_id, "cancel"))["status"]
+    except InvalidTaskStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {
+        "task_id": task_id,
+        "status": "stopped" if task_status in TERMINAL_STATUSES else "stopping",
+        "task_status": task_status,
+        "message": "Agent stopped successfully" if task_status in TERMINAL_STATUSES else "Stop requested"
+    }
+
+@app.post("/api/agents/{task_id}/pause")
+async def pause_agent(task_id: str):
+    try:
+        task_status = task_manager.pause(task_id).status
+    except TaskNotFoundError:
+        task_status = (await control_remote_task(task_id, "pause"))["status"]
+    except InvalidTaskStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {
+        "task_id": task_id,
+        "status": task_status,
+        "message": "Agent paused successfully"
+    }
+
+@app.post("/api/agents/{task_id}/resume")
+async def resume_agent(task_id: str):
+    try:
+        task_status = task_manager.resume(task_id).status
+    except TaskNotFoundError:
+        task_status = (await control_remote_task(task_id, "resume"))["status"]
+    except InvalidTaskStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     return {
         "task_id": task_id,
-        "status": "stopped",
-        "message": "Agent stopped successfully"
+        "status": task_status,
+        "message": "Agent resumed successfully"
     }
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    # BRIDGE_WORKERS > 1 runs that many processes; they share task state through the SQLite store
+    if BRIDGE_WORKERS > 1:
+        if TASK_STORE == "memory":
+            raise SystemExit("TASK_STORE=memory cannot be shared between workers; use sqlite")
+        uvicorn.run("main:app", host="0.0.0.0", port=8001, workers=BRIDGE_WORKERS)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8001)
@@ -0,0 +1,53 @@
+import asyncio
+import importlib
+import os
+import sys
+
+import httpx
+import pytest
+
+# Tests import the bridge the way main.py does, as the top-level ``app`` package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.agents.task_manager import TaskManager  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def bridge(tmp_path_factory):
+    """The bridge's main module, imported against throwaway stores.
+
+    Startup hooks are not run, so nothing reaches out to the web-ui backends;
+    tests open the stores they use and stub the collaborators they need.
+    """
+    os.environ["TASK_STORE"] = "memory"
+    os.environ["TASK_DB_PATH"] = str(tmp_path_factory.mktemp("bridge") / "tasks.db")
+    os.environ.pop("VERIFIER_URL", None)
+    main = importlib.import_module("main")
+    main.preset_store.open()
+    main.trace_store.open()
+    return main
+
+
+@pytest.fixture
+def call_bridge(bridge, monkeypatch):
+    """Run ``scenario(client)`` against the bridge app in one event loop.
+
+    The bridge gets a fresh task manager whose runs never finish, so started
+    tasks stay put for the test to inspect.
+    """
+    manager = TaskManager(lambda task: asyncio.Event().wait(), concurrency=2, on_update=bridge.task_store.save)
+    monkeypatch.setattr(bridge, "task_manager", manager)
+
+    def run(scenario):
+        async def main():
+            await bridge.task_manager.start()
+            try:
+                transport = httpx.ASGITransport(app=bridge.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://bridge") as client:
+                    return await scenario(client)
+            finally:
+                await bridge.task_manager.stop()
+
+        return asyncio.run(main())
+
+    return run
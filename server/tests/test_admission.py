@@ -0,0 +1,41 @@
+import math
+
+import pytest
+
+from app.agents.admission import AdmissionController, AdmissionRejected
+
+
+def test_batch_is_charged_for_queued_items_and_may_overdraw():
+    admission = AdmissionController(rate_per_minute=60, burst=5)
+    admission.check("client")
+    admission.charge("client", 12)
+    with pytest.raises(AdmissionRejected) as rejected:
+        admission.check("client")
+    # Seven submissions of debt plus the one being asked for, at one per second
+    assert rejected.value.retry_after == pytest.approx(8, abs=0.1)
+
+
+def test_nothing_queued_costs_nothing():
+    admission = AdmissionController(rate_per_minute=60, burst=1)
+    admission.check("client")
+    admission.charge("client", 0)
+    admission.check("client")
+    admission.admit("client")
+
+
+def test_interactive_bucket_is_separate_and_configurable():
+    admission = AdmissionController(rate_per_minute=60, burst=1, interactive_rate_per_minute=60, interactive_burst=2)
+    admission.admit("client")
+    admission.admit("client", interactive=True)
+    admission.admit("client", interactive=True)
+    with pytest.raises(AdmissionRejected):
+        admission.admit("client", interactive=True)
+
+
+def test_bucket_that_never_refills_rejects_without_dividing_by_zero():
+    admission = AdmissionController(rate_per_minute=0, burst=1)
+    admission.admit("client")
+    with pytest.raises(AdmissionRejected) as rejected:
+        admission.admit("client")
+    assert rejected.value.retry_after == math.inf
+    assert rejected.value.retry_after_header == "3600"
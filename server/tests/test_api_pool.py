@@ -0,0 +1,58 @@
+import pytest
+
+from app.utils.api_pool import DirectApiPool
+from app.utils.health import HealthMonitor
+from app.utils.upstream import UpstreamClient
+
+
+def pool_with_health(*urls):
+    pool = DirectApiPool(urls)
+    pool.attach(HealthMonitor(UpstreamClient(), pool.health_urls(), failure_threshold=1))
+    return pool
+
+
+def test_runs_go_to_the_least_loaded_node():
+    pool = pool_with_health("http://api-1:8000", "http://api-2:8000/")
+    first = pool.choose()
+    pool.assign("t1", first)
+    second = pool.choose()
+    assert second is not first
+    pool.assign("t2", second)
+    pool.release("t1")
+    assert pool.choose() is first
+    assert second.url == "http://api-2:8000"
+
+
+def test_failing_node_drops_out_and_tasks_stay_pinned():
+    pool = pool_with_health("http://api-1:8000", "http://api-2:8000")
+    one, two = pool.nodes
+    pool.assign("t1", one)
+    pool.record_failure(one)
+    assert not pool.is_available(one)
+    # Only the healthy node takes new runs
+    assert pool.choose() is two
+    assert pool.choose(exclude=[two]) is None
+    # Status and cancel calls for t1 still reach the node running it
+    assert pool.node_for("t1") is one
+    pool.record_success(one)
+    assert pool.any_available()
+    assert pool.snapshot()[one.name]["available"]
+
+
+def test_release_is_idempotent_and_unknown_ids_go_to_the_first_node():
+    pool = DirectApiPool(["http://api-1:8000", "http://api-2:8000"])
+    node = pool.nodes[1]
+    pool.assign("t1", node)
+    pool.assign("t1", node)
+    assert node.outstanding == 1
+    pool.release("t1")
+    pool.release("t1")
+    pool.release(None)
+    assert node.outstanding == 0
+    assert node.dispatched == 2
+    assert pool.node_for("from-before-restart") is pool.nodes[0]
+
+
+def test_needs_at_least_one_node():
+    with pytest.raises(ValueError):
+        DirectApiPool([])
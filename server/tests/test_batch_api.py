@@ -0,0 +1,57 @@
+import pytest
+
+from app.agents.admission import AdmissionController
+from app.agents.model_router import ModelRouter
+
+
+@pytest.fixture(autouse=True)
+def routing(bridge, monkeypatch):
+    monkeypatch.setattr(bridge, "admission", AdmissionController(rate_per_minute=60, burst=10))
+    router = ModelRouter(
+        {"fast": [("openai", "gpt-4o")], "local": [("ollama", "qwen2.5:7b")]},
+        credentials={"openai": {"api_key": "sk-server", "base_url": None}},
+    )
+    monkeypatch.setattr(bridge, "model_router", router)
+
+
+def test_batch_rejects_items_with_an_unusable_model_class(call_bridge):
+    async def scenario(client):
+        return await client.post("/api/agents/start:batch", headers={"X-Client-Id": "batch-a"}, json=[
+            {"instruction": "batch-a: open example.com", "agent_settings": {"modelClass": "fast"}},
+            {"instruction": "batch-a: open example.org", "agent_settings": {"modelClass": "huge"}},
+            {"instruction": "batch-a: open example.net", "agent_settings": {"modelClass": "local"}},
+        ])
+
+    response = call_bridge(scenario)
+    assert response.status_code == 200
+    body = response.json()
+    assert [result["status"] for result in body["results"]] == ["queued", "rejected", "rejected"]
+    assert body["results"][1]["error"] == "Unknown model class 'huge'"
+    assert "server-side credentials" in body["results"][2]["error"]
+    assert body["submitted"] == 1
+
+
+def test_single_start_rejects_the_same_model_class(call_bridge):
+    async def scenario(client):
+        return await client.post("/api/agents/start", headers={"X-Client-Id": "batch-b"}, json={
+            "instruction": "batch-b: open example.org", "agent_settings": {"modelClass": "huge"},
+        })
+
+    response = call_bridge(scenario)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown model class 'huge'"
+
+
+def test_batch_items_keep_their_lane(call_bridge, bridge):
+    async def scenario(client):
+        response = await client.post("/api/agents/start:batch", headers={"X-Client-Id": "batch-c"}, json=[
+            {"instruction": "batch-c: check my inbox", "interactive": True},
+            {"instruction": "batch-c: archive old mail"},
+        ])
+        return [bridge.task_manager.find(result["task_id"]) for result in response.json()["results"]]
+
+    tasks = call_bridge(scenario)
+    assert [task.interactive for task in tasks] == [True, False]
+    # Each lane's bucket pays for its own items
+    assert bridge.admission._bucket("batch-c", True).tokens == pytest.approx(4, abs=0.01)
+    assert bridge.admission._bucket("batch-c", False).tokens == pytest.approx(9, abs=0.01)
@@ -0,0 +1,40 @@
+import time
+
+import pytest
+
+from app.agents.dedup import IdempotencyConflictError, SubmissionIndex, fingerprint
+
+
+def test_fingerprint_ignores_whitespace_but_not_case():
+    base = fingerprint("type Hunter2 into the password field", "browser_use", {}, {})
+    assert fingerprint("  type Hunter2   into the\npassword field ", "browser_use", {}, {}) == base
+    assert fingerprint("type hunter2 into the password field", "browser_use", {}, {}) != base
+
+
+def test_fingerprint_covers_settings():
+    base = fingerprint("check my inbox", "browser_use", {"llmProvider": "openai"}, {})
+    assert fingerprint("check my inbox", "browser_use", {"llmProvider": "google"}, {}) != base
+    assert fingerprint("check my inbox", "deep_research", {"llmProvider": "openai"}, {}) != base
+
+
+def test_idempotency_key_returns_the_original_task():
+    index = SubmissionIndex()
+    index.remember("fp-1", "task_a", key="key-1")
+    assert index.by_key("key-1", "fp-1") == "task_a"
+    assert index.by_fingerprint("fp-1") == "task_a"
+    assert index.by_key("key-2", "fp-1") is None
+
+
+def test_idempotency_key_reused_for_another_request_conflicts():
+    index = SubmissionIndex()
+    index.remember("fp-1", "task_a", key="key-1")
+    with pytest.raises(IdempotencyConflictError):
+        index.by_key("key-1", "fp-2")
+
+
+def test_idempotency_keys_expire():
+    index = SubmissionIndex(key_ttl=0.01)
+    index.remember("fp-1", "task_a", key="key-1")
+    time.sleep(0.02)
+    assert index.by_key("key-1", "fp-1") is None
+
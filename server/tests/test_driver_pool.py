@@ -0,0 +1,78 @@
+import pytest
+
+from app.browser.driver_pool import DriverPool, DriverPoolTimeout
+
+
+class FakeDriver:
+    def __init__(self):
+        self.visited = []
+        self.quit_called = False
+        self.ready = "complete"
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def execute_script(self, script):
+        return self.ready
+
+    def quit(self):
+        self.quit_called = True
+
+
+def fake_pool(**kwargs):
+    launched = []
+
+    def factory():
+        launched.append(FakeDriver())
+        return launched[-1]
+
+    return DriverPool("http://start", driver_factory=factory, **kwargs), launched
+
+
+def test_sessions_reuse_a_warm_driver():
+    pool, launched = fake_pool(size=2)
+    pool.warm(1)
+    with pool.session() as first:
+        first.get("http://example.com")
+    # Returned drivers are parked back on the start page
+    assert first.visited == ["http://start", "http://example.com", "http://start"]
+    with pool.session() as second:
+        pass
+    assert second is first
+    assert len(launched) == 1
+
+
+def test_failed_and_worn_out_drivers_are_replaced():
+    pool, launched = fake_pool(size=1, max_uses=2)
+    with pytest.raises(RuntimeError):
+        with pool.session():
+            raise RuntimeError("page crashed")
+    assert launched[0].quit_called
+
+    with pool.session():
+        pass
+    with pool.session() as driver:
+        assert driver is launched[1]
+    assert launched[1].quit_called
+    assert pool.snapshot()["recycled"] == 2
+
+
+def test_unhealthy_idle_driver_is_discarded_on_checkout():
+    pool, launched = fake_pool(size=1)
+    pool.warm()
+    launched[0].ready = "loading"
+    with pool.session() as driver:
+        assert driver is launched[1]
+    assert launched[0].quit_called
+
+
+def test_checkout_times_out_when_every_driver_is_busy():
+    pool, _ = fake_pool(size=1)
+    busy = pool.checkout()
+    with pytest.raises(DriverPoolTimeout):
+        pool.checkout(timeout=0.01)
+    pool.release(busy)
+    pool.close()
+    assert busy.driver.quit_called
+    with pytest.raises(RuntimeError):
+        pool.checkout()
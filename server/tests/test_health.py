@@ -0,0 +1,87 @@
+import asyncio
+
+import httpx
+
+from app.utils import health
+from app.utils.health import CircuitBreaker, HealthMonitor
+from app.utils.upstream import UpstreamClient
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_half_opens_and_closes(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(health.time, "monotonic", clock)
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=15.0)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    clock.now += 15.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    # One failed trial call reopens it for another full timeout
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 15.0
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
+
+
+def test_probes_drive_the_breakers():
+    answers = {"http://web-ui/health": 200, "http://api/health": 503}
+
+    def handler(request):
+        return httpx.Response(answers[str(request.url)])
+
+    async def scenario():
+        client = UpstreamClient(transport=httpx.MockTransport(handler))
+        await client.start()
+        monitor = HealthMonitor(
+            client, {"webui": "http://web-ui/health", "api": "http://api/health"}, failure_threshold=2
+        )
+        await monitor.probe_all()
+        first = monitor.snapshot()
+        await monitor.probe_all()
+        second = monitor.snapshot()
+        await client.close()
+        return monitor, first, second
+
+    monitor, first, second = asyncio.run(scenario())
+    assert first["webui"]["status"] == "available"
+    assert first["api"]["status"] == "unavailable"
+    assert first["api"]["last_error"] == "HTTP 503"
+    assert first["api"]["circuit"]["state"] == CircuitBreaker.CLOSED
+    assert second["api"]["circuit"]["state"] == CircuitBreaker.OPEN
+    assert monitor.is_available("webui")
+    assert not monitor.is_available("api")
+
+
+def test_connection_errors_count_as_failures():
+    def handler(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    async def scenario():
+        client = UpstreamClient(transport=httpx.MockTransport(handler))
+        await client.start()
+        monitor = HealthMonitor(client, {"webui": "http://web-ui/health"}, failure_threshold=1)
+        ok = await monitor.probe("webui")
+        await client.close()
+        return monitor, ok
+
+    monitor, ok = asyncio.run(scenario())
+    assert not ok
+    assert monitor.snapshot()["webui"]["last_error"] == "connection refused"
+    assert not monitor.is_available("webui")
@@ -0,0 +1,42 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.media_routes import find_upload, read_upload_meta, save_upload
+
+
+async def chunks_of(data: bytes, size: int = 4):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def save(data: bytes, filename: str, upload_dir, **kwargs):
+    meta = {"filename": filename, "content_type": "audio/wav"}
+    return asyncio.run(save_upload(chunks_of(data), meta, upload_dir=str(upload_dir), **kwargs))
+
+
+def test_same_audio_under_another_name_is_stored_once(tmp_path):
+    digest, path, size, duplicate = save(b"RIFF clip bytes", "first.WAV", tmp_path)
+    again, again_path, _, again_duplicate = save(b"RIFF clip bytes", "copy.mp3", tmp_path)
+    assert (digest, path, size, duplicate) == (again, again_path, 15, False)
+    assert again_duplicate
+    assert sorted(os.listdir(tmp_path)) == [digest, f"{digest}.json"]
+    # The sidecar keeps the name of the first upload
+    assert read_upload_meta(path) == {"filename": "first.WAV", "content_type": "audio/wav", "extension": ".wav"}
+
+
+def test_find_upload_is_a_direct_path_check(tmp_path):
+    digest, path, _, _ = save(b"RIFF clip bytes", "clip.wav", tmp_path)
+    assert find_upload(digest, str(tmp_path)) == path
+    assert find_upload("0" * 64, str(tmp_path)) is None
+    assert find_upload(digest[:12], str(tmp_path)) is None
+    assert find_upload("../" + digest, str(tmp_path)) is None
+
+
+def test_oversized_upload_is_cut_off_and_leaves_nothing_behind(tmp_path):
+    with pytest.raises(HTTPException) as rejected:
+        save(b"x" * 64, "clip.wav", tmp_path, max_bytes=16)
+    assert rejected.value.status_code == 413
+    assert os.listdir(tmp_path) == []
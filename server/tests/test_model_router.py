@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from app.agents.model_router import ModelRouter, NoHealthyModelError, is_provider_error, is_rate_limit_error
+from app.agents.task_manager import Task, TaskFailedError
+
+CLASSES = {"fast": [("google", "gemini-2.0-flash"), ("openai", "gpt-4o"), ("deepseek", "deepseek-chat")]}
+CREDENTIALS = {"openai": {"api_key": "sk-server", "base_url": None}, "deepseek": {"api_key": "ds-server", "base_url": "https://ds"}}
+
+
+def test_routes_only_to_members_with_server_credentials():
+    router = ModelRouter(CLASSES, credentials=CREDENTIALS)
+    assert router.routable("fast") == [("openai", "gpt-4o"), ("deepseek", "deepseek-chat")]
+    first = router.choose("fast")
+    second = router.choose("fast", exclude=[first])
+    assert {first, second} == set(router.routable("fast"))
+    try:
+        router.choose("fast", exclude=[first, second])
+    except NoHealthyModelError:
+        pass
+    else:
+        raise AssertionError("google has no credentials and must not be routed to")
+
+
+def test_routed_settings_never_carry_the_clients_key():
+    router = ModelRouter(CLASSES, credentials=CREDENTIALS)
+    client = {
+        "llmProvider": "google", "llmApiKey": "client-key", "llmBaseUrl": "https://client",
+        "plannerLlmProvider": "google", "plannerLlmApiKey": "client-key", "maxSteps": 10,
+    }
+    openai = router.settings_for(("openai", "gpt-4o"), client)
+    assert openai == {"llmProvider": "openai", "llmModelName": "gpt-4o", "llmApiKey": "sk-server", "maxSteps": 10}
+    deepseek = router.settings_for(("deepseek", "deepseek-chat"), openai)
+    assert deepseek["llmApiKey"] == "ds-server"
+    assert deepseek["llmBaseUrl"] == "https://ds"
+
+
+def test_provider_errors_are_http_and_quota_signatures_only():
+    assert is_provider_error("Error code: 429 - {'error': {'type': 'rate_limit_exceeded'}}")
+    assert is_provider_error("Error code: 503 - upstream unavailable")
+    assert is_provider_error("429 Resource has been exhausted (e.g. check quota).")
+    assert is_provider_error("Error code: 401 - invalid_api_key")
+    assert not is_provider_error("Timeout 30000ms exceeded waiting for selector")
+    assert not is_provider_error("net::ERR_CONNECTION_REFUSED at https://example.com")
+    assert not is_provider_error("Stopped after 500 steps")
+
+
+def test_rate_limits_are_the_quota_subset_of_provider_errors():
+    for message in (
+        "Error code: 429 - {'error': {'type': 'rate_limit_exceeded'}}",
+        "429 Too Many Requests",
+        "429 Resource has been exhausted (e.g. check quota).",
+        "RESOURCE_EXHAUSTED",
+    ):
+        assert is_rate_limit_error(message) and is_provider_error(message)
+    for message in ("Error code: 503 - upstream unavailable", "Error code: 401 - invalid_api_key", "Overloaded"):
+        assert is_provider_error(message) and not is_rate_limit_error(message)
+    # Bare numbers are not status codes
+    assert not is_rate_limit_error("Clicked 1429 times")
+    assert not is_rate_limit_error("Opened order #429")
+
+
+def failover_run(bridge, monkeypatch, steps_before_failing: int):
+    """Route a task whose first model hits a rate limit after ``steps_before_failing`` steps"""
+    router = ModelRouter(CLASSES, credentials=CREDENTIALS)
+    monkeypatch.setattr(bridge, "model_router", router)
+    runs = []
+
+    async def run_on_model(task, route):
+        runs.append(route)
+        if len(runs) == 1:
+            task.upstream_steps = steps_before_failing
+            raise TaskFailedError("Error code: 429 - rate_limit_exceeded")
+        return {"message": f"done on {route[0]}"}
+
+    monkeypatch.setattr(bridge, "run_on_model", run_on_model)
+    task = Task("open example.com", "browser_use", {"modelClass": "fast"}, {})
+    return asyncio.run(bridge.run_agent_task(task)), runs
+
+
+def test_fails_over_when_no_step_ran(bridge, monkeypatch):
+    result, runs = failover_run(bridge, monkeypatch, steps_before_failing=0)
+    assert len(runs) == 2
+    assert runs[0] != runs[1]
+    assert result == {"message": f"done on {runs[1][0]}"}
+
+
+def test_surfaces_the_error_once_steps_ran(bridge, monkeypatch):
+    with pytest.raises(TaskFailedError, match="after 3 steps; not failing over"):
+        failover_run(bridge, monkeypatch, steps_before_failing=3)
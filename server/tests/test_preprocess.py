@@ -0,0 +1,94 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.speech.preprocess import EndpointDetector, Resampler, resample, trim_silence
+
+
+def reference_resample(samples: np.ndarray, rate: int, target_rate: int) -> np.ndarray:
+    """Upsample by zero-stuffing, filter with the full FIR, then decimate"""
+    divisor = math.gcd(rate, target_rate)
+    up, down = target_rate // divisor, rate // divisor
+    half = 10 * max(up, down)
+    n = np.arange(-half, half + 1)
+    taps = np.sinc(n / max(up, down)) * np.kaiser(len(n), 5.0)
+    taps *= up / taps.sum()
+    stuffed = np.zeros(len(samples) * up)
+    stuffed[::up] = samples
+    filtered = np.convolve(stuffed, taps)[half:half + len(stuffed)]
+    return filtered[::down][: -(-len(samples) * up // down)]
+
+
+def rms(samples: np.ndarray) -> float:
+    return float(np.sqrt(np.mean(samples.astype(np.float64) ** 2)))
+
+
+@pytest.mark.parametrize("rate", [48000, 44100, 22050, 8000])
+def test_resample_matches_the_direct_filter(rate):
+    samples = np.random.default_rng(rate).standard_normal(600).astype(np.float32)
+    expected = reference_resample(samples.astype(np.float64), rate, 16000)
+    np.testing.assert_allclose(resample(samples, rate), expected, atol=1e-5)
+
+
+def test_downsampling_removes_content_above_the_new_nyquist():
+    t = np.arange(48000) / 48000
+    speech_band = resample(np.sin(2 * np.pi * 1000 * t).astype(np.float32), 48000)
+    # 12 kHz would alias to 4 kHz without the low-pass filter
+    above_nyquist = resample(np.sin(2 * np.pi * 12000 * t).astype(np.float32), 48000)
+    assert rms(speech_band[800:-800]) == pytest.approx(math.sqrt(0.5), rel=0.01)
+    assert rms(above_nyquist[800:-800]) < 0.005
+
+
+def test_streamed_chunks_resample_like_the_whole_clip():
+    rng = np.random.default_rng(1)
+    samples = rng.standard_normal(5000).astype(np.float32)
+    resampler = Resampler(44100)
+    parts, position = [], 0
+    while position < len(samples):
+        size = int(rng.integers(1, 400))
+        parts.append(resampler.push(samples[position:position + size]))
+        position += size
+    parts.append(resampler.flush())
+    np.testing.assert_array_equal(np.concatenate(parts), resample(samples, 44100))
+
+
+def speech_between_silences(lead_s: float, speech_s: float, tail_s: float, rate: int = 16000) -> np.ndarray:
+    """A 440 Hz tone between stretches of faint noise"""
+    rng = np.random.default_rng(0)
+    lead, speech, tail = (int(seconds * rate) for seconds in (lead_s, speech_s, tail_s))
+    samples = rng.standard_normal(lead + speech + tail).astype(np.float32) * 1e-4
+    t = np.arange(speech) / rate
+    samples[lead:lead + speech] += 0.5 * np.sin(2 * np.pi * 440 * t).astype(np.float32)
+    return samples
+
+
+def test_trim_silence_keeps_speech_and_padding():
+    samples = speech_between_silences(1.0, 0.5, 1.0)
+    trimmed = trim_silence(samples, 16000, padding_ms=150)
+    # 20 ms frames line up with the tone, so only the padding is added around it
+    np.testing.assert_array_equal(trimmed, samples[16000 - 2400:24000 + 2400])
+
+
+def test_trim_silence_clips_padding_at_the_edges():
+    samples = speech_between_silences(0.0, 0.5, 1.0)
+    trimmed = trim_silence(samples, 16000, padding_ms=150)
+    np.testing.assert_array_equal(trimmed, samples[:8000 + 2400])
+
+
+def test_trim_silence_drops_clips_without_speech():
+    silence = np.random.default_rng(0).standard_normal(16000).astype(np.float32) * 1e-4
+    assert len(trim_silence(silence, 16000)) == 0
+    assert len(trim_silence(np.zeros(0, dtype=np.float32), 16000)) == 0
+
+
+def test_endpoint_detector_ends_after_trailing_silence():
+    samples = speech_between_silences(0.2, 0.5, 1.0)
+    detector = EndpointDetector(end_silence_ms=700)
+    ended_at = None
+    for start in range(0, len(samples), 1600):
+        if detector.push(samples[start:start + 1600]):
+            ended_at = start + 1600
+            break
+    # Speech ends at 0.7 s, so the utterance ends once 0.7 s of silence has followed
+    assert ended_at == int(1.4 * 16000)
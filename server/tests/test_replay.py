@@ -0,0 +1,96 @@
+import sqlite3
+import threading
+
+from app.agents.replay import ReplayDiverged, TraceStore, extract_trace, final_result_text, side_effects_ran
+
+STEPS = [
+    {"action": "go_to_url", "params": {"url": "https://example.com"}},
+    {"action": "scroll_down", "params": {}},
+    {"action": "click_element", "params": {}, "xpath": "//button"},
+    {"action": "done", "params": {"text": "Order placed"}},
+]
+
+
+def test_divergence_before_any_click_can_fall_back():
+    assert not side_effects_ran(STEPS, ReplayDiverged(2, "element not found"))
+
+
+def test_divergence_after_a_click_started_cannot_fall_back():
+    assert side_effects_ran(STEPS, ReplayDiverged(2, "click failed", acted=True))
+    assert side_effects_ran(STEPS, ReplayDiverged(3, "page changed"))
+
+
+def test_final_result_prefers_done_text():
+    assert final_result_text({"message": "Task completed"}, STEPS) == "Order placed"
+    assert final_result_text({"message": "Task completed"}, STEPS[:3]) == "Task completed"
+
+
+def test_trace_store_adds_result_column_to_old_tables(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE action_traces (trace_key TEXT PRIMARY KEY, instruction TEXT NOT NULL, steps TEXT NOT NULL, "
+            "source_task_id TEXT, created_at REAL NOT NULL, replays INTEGER NOT NULL DEFAULT 0, "
+            "failures INTEGER NOT NULL DEFAULT 0)"
+        )
+    store = TraceStore(path)
+    store.open()
+    store.save("key", "buy it", STEPS, "task_1", "Order placed")
+    record = store.get("key")
+    assert record["result"] == "Order placed"
+    assert record["steps"] == STEPS
+
+
+def test_runs_that_typed_a_secret_are_not_recorded():
+    login = [
+        {"action": "go_to_url", "params": {"url": "https://mail.example.com"}},
+        {"action": "input_text", "params": {"text": "me@example.com"}, "xpath": "//input[@id='email']"},
+    ]
+    assert extract_trace({"action_trace": login}) == login
+    password = {"action": "input_text", "params": {"text": "hunter2"}, "xpath": "//input[@name='password']"}
+    assert extract_trace({"action_trace": login + [password]}) is None
+    placeholder = {"action": "input_text", "params": {"text": "<secret>pin</secret>"}, "xpath": "//input[2]"}
+    assert extract_trace({"action_trace": login + [placeholder]}) is None
+
+
+def test_history_marks_password_fields_as_secret():
+    history = [{
+        "state": {
+            "url": "https://mail.example.com/login",
+            "interacted_element": [{"xpath": "html/body/form/input[2]", "attributes": {"type": "password"}}],
+        },
+        "model_output": {"action": [{"input_text": {"index": 4, "text": "hunter2"}}]},
+    }]
+    assert extract_trace({"history": history}) is None
+
+
+def test_trace_store_closes_connections_of_every_thread(tmp_path):
+    store = TraceStore(str(tmp_path / "tasks.db"))
+    store.open()
+    worker = threading.Thread(target=store.save, args=("key", "buy it", STEPS))
+    worker.start()
+    worker.join()
+    store.close()
+    # Reopening after close starts from fresh connections
+    store.open()
+    assert store.get("key")["steps"] == STEPS
+    store.close()
+
+
+class DetachFails:
+    def quit(self):
+        raise RuntimeError("chromedriver went away")
+
+
+def test_failing_to_detach_keeps_the_replay_outcome(bridge, monkeypatch):
+    monkeypatch.setattr(bridge, "attach_chrome", lambda cdp_url: DetachFails())
+    monkeypatch.setattr(bridge, "replay_trace", lambda driver, steps: len(steps))
+    assert bridge.replay_in_agent_browser("localhost:9222", STEPS) == (4, None)
+
+    def diverge(driver, steps):
+        raise ReplayDiverged(2, "click failed", acted=True)
+
+    monkeypatch.setattr(bridge, "replay_trace", diverge)
+    replayed, diverged = bridge.replay_in_agent_browser("localhost:9222", STEPS)
+    assert replayed == 2
+    assert diverged.acted
@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import httpx
+
+from app.utils.route_negotiator import RouteNegotiator
+from app.utils.upstream import UpstreamClient
+
+
+class FakeGradio:
+    """Answers only on /run/predict, and only to the ``{"data": [...]}`` payload"""
+
+    def __init__(self):
+        self.posts = []
+        self.up = True
+
+    def __call__(self, request):
+        path = request.url.path
+        if request.method == "GET":
+            return httpx.Response(405 if path == "/run/predict" else 404)
+        body = json.loads(request.content)
+        self.posts.append((path, sorted(body)))
+        if self.up and path == "/run/predict" and sorted(body) == ["data"]:
+            return httpx.Response(200, json={"data": ["started"]})
+        return httpx.Response(422)
+
+
+def run(gradio, scenario):
+    async def main():
+        client = UpstreamClient(transport=httpx.MockTransport(gradio))
+        await client.start()
+        try:
+            return await scenario(RouteNegotiator(client, "http://web-ui"))
+        finally:
+            await client.close()
+
+    return asyncio.run(main())
+
+
+def test_negotiates_once_then_uses_the_cached_route():
+    gradio = FakeGradio()
+
+    async def scenario(negotiator):
+        first = await negotiator.submit("open example.com")
+        posts_to_negotiate = len(gradio.posts)
+        second = await negotiator.submit("open example.org")
+        return first, posts_to_negotiate, second, negotiator.snapshot()
+
+    first, posts_to_negotiate, second, snapshot = run(gradio, scenario)
+    assert first[0] == second[0] == "/run/predict"
+    # Missing endpoints are never posted to; only shapes on the existing one are tried
+    assert {path for path, _ in gradio.posts[:posts_to_negotiate]} == {"/run/predict"}
+    assert len(gradio.posts) == posts_to_negotiate + 1
+    assert snapshot["payload_shape"] == "data"
+
+
+def test_caches_a_miss_until_it_expires():
+    gradio = FakeGradio()
+    gradio.up = False
+
+    async def scenario(negotiator):
+        assert await negotiator.submit("open example.com") is None
+        posts = len(gradio.posts)
+        assert await negotiator.submit("open example.com") is None
+        assert len(gradio.posts) == posts
+        negotiator._no_route_until = 0.0
+        gradio.up = True
+        return await negotiator.submit("open example.com")
+
+    endpoint, response = run(gradio, scenario)
+    assert endpoint == "/run/predict"
+    assert response.status_code == 200
+
+
+def test_renegotiates_when_the_cached_route_stops_working():
+    gradio = FakeGradio()
+
+    async def scenario(negotiator):
+        await negotiator.submit("open example.com")
+        gradio.up = False
+        result = await negotiator.submit("open example.org")
+        return result, negotiator.cached_route()
+
+    result, route = run(gradio, scenario)
+    assert result is None
+    assert route is None
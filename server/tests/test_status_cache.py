@@ -0,0 +1,105 @@
+import asyncio
+
+from app.utils.status_cache import StatusCache
+
+
+def test_concurrent_lookups_share_one_fetch():
+    async def scenario():
+        calls = []
+        release = asyncio.Event()
+
+        async def fetch(task_id):
+            calls.append(task_id)
+            await release.wait()
+            return {"status": "running", "progress": "step 3"}
+
+        cache = StatusCache(fetch, running_ttl=60)
+        waiters = [asyncio.create_task(cache.get("t1")) for _ in range(10)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+        assert calls == ["t1"]
+        assert all(result["progress"] == "step 3" for result in results)
+        assert (cache.misses, cache.coalesced) == (1, 9)
+        await cache.get("t1")
+        assert cache.hits == 1
+
+    asyncio.run(scenario())
+
+
+def test_one_caller_going_away_does_not_cancel_the_shared_fetch():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def fetch(task_id):
+            await release.wait()
+            return {"status": "completed"}
+
+        cache = StatusCache(fetch)
+        impatient = asyncio.create_task(cache.get("t1"))
+        patient = asyncio.create_task(cache.get("t1"))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        release.set()
+        assert (await patient)["status"] == "completed"
+        assert impatient.cancelled()
+
+    asyncio.run(scenario())
+
+
+def test_failed_fetch_is_shared_but_not_cached():
+    async def scenario():
+        attempts = []
+
+        async def fetch(task_id):
+            attempts.append(task_id)
+            await asyncio.sleep(0)
+            if len(attempts) == 1:
+                raise ConnectionError("upstream down")
+            return {"status": "running"}
+
+        cache = StatusCache(fetch)
+        results = await asyncio.gather(cache.get("t1"), cache.get("t1"), return_exceptions=True)
+        assert [type(result) for result in results] == [ConnectionError, ConnectionError]
+        assert (await cache.get("t1"))["status"] == "running"
+        assert len(attempts) == 2
+        assert cache.stats()["inflight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_running_states_expire_and_terminal_states_stay(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.utils.status_cache.time.monotonic", lambda: now[0])
+    cache = StatusCache(None, running_ttl=1.0)
+    cache.put("running", {"status": "running"})
+    cache.put("done", {"status": "completed"})
+    now[0] += 5
+    assert cache.peek("running") is None
+    assert cache.peek("done") == {"status": "completed"}
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = StatusCache(None, max_entries=2)
+    cache.put("a", {"status": "completed"})
+    cache.put("b", {"status": "completed"})
+    cache.peek("a")
+    cache.put("c", {"status": "completed"})
+    assert cache.peek("b") is None
+    assert cache.peek("a") is not None
+
+
+def test_invalidate_forces_a_fresh_fetch():
+    async def scenario():
+        states = iter([{"status": "running"}, {"status": "cancelled"}])
+
+        async def fetch(task_id):
+            return next(states)
+
+        cache = StatusCache(fetch, running_ttl=60)
+        assert (await cache.get("t1"))["status"] == "running"
+        cache.invalidate("t1")
+        assert (await cache.get("t1"))["status"] == "cancelled"
+        assert cache.misses == 2
+
+    asyncio.run(scenario())
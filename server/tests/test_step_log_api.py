@@ -0,0 +1,53 @@
+import asyncio
+
+
+def test_step_log_polls_get_304_until_something_changes(call_bridge, bridge):
+    async def scenario(client):
+        task = bridge.task_manager.submit("steps-a: open example.com", "browser_use", {}, {})
+        for _ in range(10):
+            await asyncio.sleep(0)
+        url = f"/api/task/{task.task_id}/steps"
+
+        first = await client.get(url)
+        etag = first.headers["etag"]
+        unchanged = await client.get(url, headers={"If-None-Match": etag})
+        other_page = await client.get(url, params={"limit": 1}, headers={"If-None-Match": etag})
+
+        task.progress = "Clicked 'Compose'"
+        bridge.task_manager.touch(task)
+        changed = await client.get(url, params={"since": first.json()["next_since"]}, headers={"If-None-Match": etag})
+        return first, unchanged, other_page, changed
+
+    first, unchanged, other_page, changed = call_bridge(scenario)
+    assert first.status_code == 200
+    assert [step["status"] for step in first.json()["steps"]] == ["queued", "running"]
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    # A different page size is a different document
+    assert other_page.status_code == 200
+    assert other_page.json()["has_more"]
+    assert changed.status_code == 200
+    assert [step["progress"] for step in changed.json()["steps"]] == ["Clicked 'Compose'"]
+    assert changed.headers["etag"] != first.headers["etag"]
+
+
+def test_status_delta_carries_only_new_steps(call_bridge, bridge):
+    async def scenario(client):
+        task = bridge.task_manager.submit("steps-b: open example.com", "browser_use", {}, {})
+        for _ in range(10):
+            await asyncio.sleep(0)
+        response = await client.get(f"/api/task/{task.task_id}/status", params={"since": 1})
+        return response.json()
+
+    delta = call_bridge(scenario)
+    assert delta["status"] == "running"
+    assert [step["seq"] for step in delta["steps"]] == [2]
+    assert delta["next_since"] == delta["last_seq"] == 2
+    assert "result" not in delta
+
+
+def test_unknown_task_has_no_step_log(call_bridge):
+    async def scenario(client):
+        return await client.get("/api/task/task_missing/steps")
+
+    assert call_bridge(scenario).status_code == 404
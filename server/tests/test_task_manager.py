@@ -0,0 +1,250 @@
+import asyncio
+from contextlib import nullcontext
+
+import pytest
+
+from app.agents.llm_scheduler import LLMScheduler
+from app.agents.task_manager import InvalidTaskStateError, TaskManager, TaskStatus
+
+
+def submit(manager, instruction, **kwargs):
+    return manager.submit(instruction, "browser-use", {}, {}, **kwargs)
+
+
+def test_run_waiting_for_quota_lends_its_worker_out():
+    async def scenario():
+        quota, finish = asyncio.Event(), asyncio.Event()
+        order = []
+        manager = None
+
+        async def runner(task):
+            if task.instruction == "needs quota":
+                async with manager.released(task):
+                    await quota.wait()
+            elif task.instruction == "has quota":
+                await finish.wait()
+            order.append(task.instruction)
+            return {}
+
+        manager = TaskManager(runner, concurrency=1, interactive_reserve=0)
+        await manager.start()
+        blocked = submit(manager, "needs quota")
+        free = submit(manager, "has quota")
+        for _ in range(20):
+            await asyncio.sleep(0)
+        assert blocked.status == free.status == TaskStatus.RUNNING
+
+        later = submit(manager, "queued after")
+        quota.set()
+        for _ in range(20):
+            await asyncio.sleep(0)
+        # No worker is free yet, so the run that got its quota waits too
+        assert order == []
+        finish.set()
+        for _ in range(20):
+            await asyncio.sleep(0)
+        # It gets the next free worker ahead of the queue, and the stand-in retires
+        assert order == ["has quota", "needs quota", "queued after"]
+        assert later.status == TaskStatus.COMPLETED
+        assert len([worker for worker in manager._workers if not worker.done()]) == 1
+        await manager.stop()
+
+    asyncio.run(scenario())
+
+
+def test_scheduler_waits_inside_idle_only_when_out_of_quota():
+    async def scenario():
+        scheduler = LLMScheduler({"openai": {"concurrency": 1}})
+        idled = []
+
+        def idle():
+            idled.append(True)
+            return nullcontext()
+
+        settings = {"llmProvider": "openai", "llmModelName": "gpt-4o"}
+        async with scheduler.reserve(settings, idle=idle):
+            assert idled == []
+            second = asyncio.create_task(_reserve_once(scheduler, settings, idle))
+            await asyncio.sleep(0)
+            assert idled == [True]
+        await second
+
+    asyncio.run(scenario())
+
+
+async def _reserve_once(scheduler, settings, idle):
+    async with scheduler.reserve(settings, idle=idle):
+        pass
+
+
+def test_cancelling_a_run_that_lent_its_worker_keeps_the_worker_count():
+    async def scenario():
+        manager = None
+
+        async def runner(task):
+            async with manager.released(task):
+                await asyncio.Event().wait()
+
+        manager = TaskManager(runner, concurrency=2, interactive_reserve=1)
+        await manager.start()
+        task = submit(manager, "needs quota")
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert manager._running_batch == 0
+        await manager.cancel(task.task_id)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert task.status == TaskStatus.CANCELLED
+        assert manager._running_batch == 0
+        assert len([worker for worker in manager._workers if not worker.done()]) == 2
+        await manager.stop()
+
+    asyncio.run(scenario())
+
+
+def test_priority_orders_a_clients_own_queue_but_not_its_share():
+    async def scenario():
+        order = []
+
+        async def runner(task):
+            order.append(task.instruction)
+            return {}
+
+        manager = TaskManager(runner, concurrency=1, interactive_reserve=0)
+        await manager.start()
+        # Submitted before any worker runs, so the whole backlog is scheduled together
+        for index in range(3):
+            submit(manager, f"a{index}", client_id="a", priority=100 + index)
+        for index in range(3):
+            submit(manager, f"b{index}", client_id="b")
+        for _ in range(40):
+            await asyncio.sleep(0)
+        await manager.stop()
+        assert order == ["a2", "b0", "a1", "b1", "a0", "b2"]
+
+    asyncio.run(scenario())
+
+
+def test_scheduler_splits_limits_between_bridge_workers():
+    scheduler = LLMScheduler({"openai": {"rpm": 60, "tpm": 900000, "concurrency": 4}}, workers=3)
+    limiter = scheduler._limiter("openai/gpt-4o")
+    assert limiter.requests.rate * 60 == pytest.approx(20)
+    assert limiter.tokens.rate * 60 == pytest.approx(300000)
+    assert limiter.concurrency == 1
+
+
+async def drain(rounds: int = 50):
+    for _ in range(rounds):
+        await asyncio.sleep(0)
+
+
+def test_weighted_fair_queuing_shares_workers_by_weight():
+    async def scenario():
+        order = []
+
+        async def runner(task):
+            order.append(task.client_id)
+            return {}
+
+        manager = TaskManager(runner, concurrency=1, interactive_reserve=0)
+        await manager.start()
+        for index in range(6):
+            submit(manager, f"heavy {index}", client_id="heavy", weight=2.0)
+        for index in range(3):
+            submit(manager, f"light {index}", client_id="light")
+        await drain()
+        await manager.stop()
+        # A weight-2 client runs two tasks for every one of a weight-1 client
+        for window in (3, 6, 9):
+            assert order[:window].count("heavy") == 2 * window // 3
+
+    asyncio.run(scenario())
+
+
+def test_interactive_tasks_skip_queued_batch_work():
+    async def scenario():
+        order = []
+
+        async def runner(task):
+            order.append(task.instruction)
+            return {}
+
+        manager = TaskManager(runner, concurrency=1, interactive_reserve=0)
+        await manager.start()
+        for index in range(3):
+            submit(manager, f"batch {index}")
+        submit(manager, "voice", interactive=True)
+        await drain()
+        await manager.stop()
+        assert order[0] == "voice"
+
+    asyncio.run(scenario())
+
+
+def test_paused_task_waits_until_resumed():
+    async def scenario():
+        order = []
+
+        async def runner(task):
+            order.append(task.instruction)
+            return {}
+
+        manager = TaskManager(runner, concurrency=1, interactive_reserve=0)
+        await manager.start()
+        first = submit(manager, "first")
+        manager.pause(first.task_id)
+        second = submit(manager, "second")
+        await drain()
+        assert order == ["second"]
+        assert first.status == TaskStatus.PAUSED
+        manager.resume(first.task_id)
+        await drain()
+        await manager.stop()
+        assert order == ["second", "first"]
+        assert first.status == second.status == TaskStatus.COMPLETED
+
+    asyncio.run(scenario())
+
+
+def test_only_queued_tasks_can_be_paused():
+    async def scenario():
+        manager = TaskManager(lambda task: asyncio.Event().wait(), concurrency=1, interactive_reserve=0)
+        await manager.start()
+        task = submit(manager, "long run")
+        await drain()
+        assert task.status == TaskStatus.RUNNING
+        with pytest.raises(InvalidTaskStateError):
+            manager.pause(task.task_id)
+        with pytest.raises(InvalidTaskStateError):
+            manager.resume(task.task_id)
+        await manager.stop()
+
+    asyncio.run(scenario())
+
+
+def test_cancel_stops_running_and_queued_tasks():
+    async def scenario():
+        cleaned_up = []
+
+        async def runner(task):
+            try:
+                await asyncio.Event().wait()
+            finally:
+                cleaned_up.append(task.instruction)
+
+        manager = TaskManager(runner, concurrency=1, interactive_reserve=0)
+        await manager.start()
+        running = submit(manager, "running")
+        queued = submit(manager, "queued")
+        await drain()
+        await manager.cancel(queued.task_id)
+        await manager.cancel(running.task_id)
+        await drain()
+        assert running.status == queued.status == TaskStatus.CANCELLED
+        # Only the running task had a runner to clean up, and the queued one never starts
+        assert cleaned_up == ["running"]
+        with pytest.raises(InvalidTaskStateError):
+            await manager.cancel(running.task_id)
+        await manager.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from app.agents.task_manager import TaskManager, TaskStatus
+from app.agents.task_store import MemoryTaskStore, TaskStore
+from app.ws.task_stream import TaskStreamHub
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def workers(request, tmp_path):
+    """Store views of two bridge workers sharing one task store"""
+    if request.param == "memory":
+        shared = MemoryTaskStore()
+        yield shared.for_worker("worker-a"), shared.for_worker("worker-b")
+        return
+    path = str(tmp_path / "tasks.db")
+    views = [TaskStore(path, flush_interval=0.05, worker_id=worker_id) for worker_id in ("worker-a", "worker-b")]
+    for view in views:
+        view.open()
+    yield views
+    for view in views:
+        view.close()
+
+
+async def settle(store, rounds: int = 20):
+    for _ in range(rounds):
+        await asyncio.sleep(0)
+    await asyncio.to_thread(store.flush)
+
+
+def test_other_worker_reads_task_and_step_log(workers):
+    own, other = workers
+
+    async def scenario():
+        manager = TaskManager(lambda task: asyncio.sleep(0, {"message": "done"}), concurrency=1, on_update=own.save)
+        await manager.start()
+        task = manager.submit("open example.com", "browser-use", {}, {})
+        await settle(own)
+        await manager.stop()
+        return task.task_id
+
+    task_id = asyncio.run(scenario())
+    record = other.get(task_id)
+    assert record["status"] == TaskStatus.COMPLETED
+    assert record["owner"] == "worker-a"
+    steps, last_seq = other.steps(task_id)
+    assert [step["status"] for step in steps] == ["queued", "running", "completed"]
+    assert other.steps(task_id, since=2) == (steps[2:], last_seq)
+
+
+def test_other_worker_streams_task_to_completion(workers):
+    own, other = workers
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def runner(task):
+            task.progress = "step 1"
+            manager.touch(task)
+            await release.wait()
+            return {}
+
+        manager = TaskManager(runner, concurrency=1, on_update=own.save)
+        await manager.start()
+        task = manager.submit("open example.com", "browser-use", {}, {})
+        await settle(own)
+
+        hub = TaskStreamHub(lambda task_id: asyncio.to_thread(other.get, task_id), interval=0.01)
+        seen = []
+
+        async def follow():
+            async for message in hub.messages(task.task_id):
+                seen.append(message["content"]["status"])
+
+        follower = asyncio.create_task(follow())
+        while not seen:
+            await asyncio.sleep(0.01)
+        release.set()
+        await settle(own)
+        await asyncio.wait_for(follower, 5)
+        await manager.stop()
+        return seen
+
+    seen = asyncio.run(scenario())
+    assert seen[0] == TaskStatus.RUNNING
+    assert seen[-1] == TaskStatus.COMPLETED
+
+
+def test_other_worker_cancels_through_controls(workers):
+    own, other = workers
+
+    async def scenario():
+        manager = TaskManager(lambda task: asyncio.Event().wait(), concurrency=1, on_update=own.save)
+        await manager.start()
+        task = manager.submit("open example.com", "browser-use", {}, {})
+        await settle(own)
+
+        record = await asyncio.to_thread(other.get, task.task_id)
+        await asyncio.to_thread(other.request_control, task.task_id, record["owner"], "cancel")
+        assert await asyncio.to_thread(other.take_controls) == []
+        controls = await asyncio.to_thread(own.take_controls)
+        assert controls == [(task.task_id, "cancel")]
+        for task_id, _ in controls:
+            await manager.cancel(task_id)
+        await settle(own)
+        await manager.stop()
+        assert await asyncio.to_thread(own.take_controls) == []
+        return task.task_id
+
+    task_id = asyncio.run(scenario())
+    assert other.get(task_id)["status"] == TaskStatus.CANCELLED
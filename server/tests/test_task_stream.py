@@ -0,0 +1,55 @@
+import asyncio
+
+from app.ws.task_stream import TaskStreamHub
+
+
+def test_subscribers_share_one_poller_and_get_only_transitions():
+    states = iter(
+        [{"status": "running", "progress": "step 1"}] * 3
+        + [{"status": "running", "progress": "step 2"}, {"status": "dispatched"}]
+    )
+    fetches = []
+
+    async def fetch_status(task_id):
+        fetches.append(task_id)
+        return next(states)
+
+    async def scenario():
+        hub = TaskStreamHub(fetch_status, interval=0)
+
+        async def follow():
+            return [message["content"] async for message in hub.messages("task-1")]
+
+        first, second = await asyncio.gather(follow(), follow())
+        return hub, first, second
+
+    hub, first, second = asyncio.run(scenario())
+    expected = [
+        {"status": "running", "progress": "step 1"},
+        {"status": "running", "progress": "step 2"},
+        {"status": "dispatched"},
+    ]
+    assert first == second == expected
+    # One poll per state for both subscribers, ending at the handed-off state
+    assert len(fetches) == 5
+    assert hub.stats() == {"watched_tasks": 0, "subscribers": 0}
+
+
+def test_late_subscriber_gets_the_latest_state_first():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def fetch_status(task_id):
+            if release.is_set():
+                return {"status": "completed"}
+            return {"status": "running"}
+
+        hub = TaskStreamHub(fetch_status, interval=0.01)
+        async with hub.subscribe("task-1") as early:
+            assert (await early.get())["content"]["status"] == "running"
+            async with hub.subscribe("task-1") as late:
+                assert (await late.get())["content"]["status"] == "running"
+                release.set()
+                assert (await late.get())["content"]["status"] == "completed"
+
+    asyncio.run(scenario())
@@ -0,0 +1,52 @@
+import os
+
+from app.speech.transcript_cache import TranscriptCache
+
+
+def test_entries_survive_a_restart_through_the_disk_tier(tmp_path):
+    key = TranscriptCache.make_key("a" * 64, "local:faster-whisper-base-int8:trimmed")
+    TranscriptCache(str(tmp_path)).put(key, "open my inbox", audio={"duration_s": 1.2})
+
+    restarted = TranscriptCache(str(tmp_path))
+    assert restarted.get(key)["transcript"] == "open my inbox"
+    assert restarted.get(key)["audio"] == {"duration_s": 1.2}
+    assert restarted.stats()["disk_hits"] == 1
+    assert restarted.stats()["memory_hits"] == 1
+
+
+def test_another_engine_version_misses(tmp_path):
+    cache = TranscriptCache(str(tmp_path))
+    cache.put(TranscriptCache.make_key("a" * 64, "local:faster-whisper-base-int8:trimmed"), "open my inbox")
+    assert cache.get(TranscriptCache.make_key("a" * 64, "local:faster-whisper-small-int8:trimmed")) is None
+    assert cache.get(TranscriptCache.make_key("a" * 64, "local:faster-whisper-base-int8:raw")) is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_disk_tier_evicts_least_recently_used_first(tmp_path):
+    keys = [TranscriptCache.make_key(str(index) * 64, "stub:1:raw") for index in range(4)]
+    probe = TranscriptCache(str(tmp_path / "probe"))
+    probe.put(keys[0], "x" * 100)
+    entry_bytes = os.path.getsize(probe._path(keys[0]))
+
+    # Room for three entries; the memory tier holds one, so reads below come from disk
+    cache = TranscriptCache(str(tmp_path / "cache"), max_memory_entries=1, max_disk_bytes=3 * entry_bytes + 10)
+    for age, key in enumerate(keys[:3]):
+        cache.put(key, "x" * 100)
+        # Spread the mtimes so the eviction order does not depend on timer resolution
+        os.utime(cache._path(key), (1000 + age, 1000 + age))
+    cache.put(keys[3], "x" * 100)
+
+    assert cache.stats()["disk_bytes"] <= 3 * entry_bytes + 10
+    assert not os.path.exists(cache._path(keys[0]))
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2])["transcript"] == "x" * 100
+
+
+def test_unreadable_entries_are_dropped(tmp_path):
+    cache = TranscriptCache(str(tmp_path))
+    key = TranscriptCache.make_key("a" * 64, "stub:1:raw")
+    os.makedirs(tmp_path, exist_ok=True)
+    with open(cache._path(key), "w") as broken:
+        broken.write("{not json")
+    assert cache.get(key) is None
+    assert not os.path.exists(cache._path(key))
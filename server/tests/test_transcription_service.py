@@ -0,0 +1,97 @@
+import asyncio
+import hashlib
+import os
+import wave
+
+import pytest
+
+from app.speech import engines
+from app.speech.engines import EngineUnavailableError, StubEngine
+from app.speech.service import TranscriptionService
+
+
+def write_clip(path, seed: int) -> str:
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(bytes([seed % 256]) * 3200)
+    return str(path)
+
+
+def expected_transcript(path: str) -> str:
+    with open(path, "rb") as audio:
+        return f"stub transcript {hashlib.sha256(audio.read()).hexdigest()[:12]}"
+
+
+def test_short_clips_are_transcribed_together_on_the_pool(tmp_path):
+    clips = [write_clip(tmp_path / f"{i}.wav", i) for i in range(3)]
+
+    async def run():
+        service = TranscriptionService(StubEngine.name, max_workers=1, batch_window=0.2, preprocess_audio=False)
+        await service.start()
+        try:
+            return await asyncio.gather(*(
+                service.transcribe(f"clip{i}", path, os.path.getsize(path)) for i, path in enumerate(clips)
+            ))
+        finally:
+            await service.stop()
+
+    jobs = asyncio.run(run())
+    assert [job.status for job in jobs] == ["completed"] * 3
+    assert [job.transcript for job in jobs] == [expected_transcript(path) for path in clips]
+
+
+def test_pool_is_replaced_after_a_worker_dies(tmp_path):
+    clip = write_clip(tmp_path / "clip.wav", 7)
+
+    async def run():
+        service = TranscriptionService(StubEngine.name, max_workers=1, batch_window=0.01, preprocess_audio=False)
+        await service.start()
+        try:
+            broken = service._executor
+            try:
+                await asyncio.get_running_loop().run_in_executor(broken, os._exit, 1)
+            except Exception:
+                pass
+            job = await service.transcribe("clip", clip, os.path.getsize(clip))
+            return job, service._executor is not broken
+        finally:
+            await service.stop()
+
+    job, replaced = asyncio.run(run())
+    assert replaced
+    assert job.status == "completed"
+    assert job.transcript == expected_transcript(clip)
+
+
+def test_stop_fails_waiting_jobs_instead_of_leaving_them_hanging(tmp_path):
+    clip = write_clip(tmp_path / "clip.wav", 3)
+
+    async def run():
+        service = TranscriptionService(StubEngine.name, max_workers=1, batch_window=30, preprocess_audio=False)
+        await service.start()
+        waiting = asyncio.create_task(service.transcribe("clip", clip, os.path.getsize(clip)))
+        await asyncio.sleep(0.05)
+        await service.stop()
+        return await asyncio.wait_for(waiting, timeout=5)
+
+    job = asyncio.run(run())
+    assert job.status == "error"
+    assert job.error == "Transcription service stopped"
+
+
+def test_start_fails_clearly_when_the_engine_is_not_installed(monkeypatch):
+    monkeypatch.setattr(engines.importlib.util, "find_spec", lambda name: None)
+
+    async def run(engine_name):
+        service = TranscriptionService(engine_name, max_workers=1)
+        try:
+            await service.start()
+        finally:
+            await service.stop()
+
+    with pytest.raises(EngineUnavailableError, match="faster_whisper"):
+        asyncio.run(run("local"))
+    with pytest.raises(ValueError, match="Unknown transcription engine"):
+        asyncio.run(run("cloud"))
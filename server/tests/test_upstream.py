@@ -0,0 +1,48 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.utils.upstream import DEFAULT_TIMEOUT, UpstreamClient
+
+
+def recording_transport(seen):
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json={"ok": True})
+
+    return httpx.MockTransport(handler)
+
+
+def test_calls_share_one_client_with_per_route_timeouts():
+    async def scenario():
+        seen = []
+        upstream = UpstreamClient(route_timeouts={"status": 1.5}, transport=recording_transport(seen))
+        await upstream.start()
+        client = upstream.client
+        await upstream.start()
+        assert upstream.client is client
+
+        await upstream.get("http://web-ui/health", route="health")
+        await upstream.get("http://web-ui/status/1", route="status")
+        await upstream.post("http://web-ui/run", json={})
+        await upstream.close()
+        return seen
+
+    seen = asyncio.run(scenario())
+    timeouts = [request.extensions["timeout"] for request in seen]
+    assert [timeout["read"] for timeout in timeouts] == [5.0, 1.5, DEFAULT_TIMEOUT]
+    assert {timeout["pool"] for timeout in timeouts} == {5.0}
+
+
+def test_requests_need_a_started_client():
+    async def scenario():
+        upstream = UpstreamClient(transport=recording_transport([]))
+        with pytest.raises(RuntimeError):
+            await upstream.get("http://web-ui/health")
+        await upstream.start()
+        await upstream.close()
+        with pytest.raises(RuntimeError):
+            await upstream.get("http://web-ui/health")
+
+    asyncio.run(scenario())
@@ -0,0 +1,133 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.utils.upstream import UpstreamClient
+from app.utils.verifier_client import VerifierBatcher, VerifierUnavailable
+
+
+def verifier_transport(batches, delay=0.0, status_code=200):
+    """Fake ``/java/verifier:batch`` that rejects instructions mentioning a wire transfer"""
+    async def handler(request):
+        instructions = json.loads(request.content)["instructions"]
+        batches.append(instructions)
+        await asyncio.sleep(delay)
+        results = [
+            {"index": index, "verified": "wire transfer" not in instruction,
+             "reason": "forbidden action" if "wire transfer" in instruction else None}
+            for index, instruction in enumerate(instructions)
+        ]
+        return httpx.Response(status_code, json={"results": results})
+
+    return httpx.MockTransport(handler)
+
+
+async def started(transport):
+    upstream = UpstreamClient(transport=transport)
+    await upstream.start()
+    return upstream
+
+
+def test_concurrent_verifies_share_one_batch():
+    async def scenario():
+        batches = []
+        upstream = await started(verifier_transport(batches))
+        verifier = VerifierBatcher(upstream, "http://verifier/", max_delay=0.01)
+        verdicts = await asyncio.gather(
+            verifier.verify("open example.com"),
+            verifier.verify("make a wire transfer"),
+            verifier.verify("read my inbox"),
+        )
+        await upstream.close()
+        return batches, verdicts, verifier.stats()
+
+    batches, verdicts, stats = asyncio.run(scenario())
+    assert batches == [["open example.com", "make a wire transfer", "read my inbox"]]
+    # Each caller gets the verdict for its own item
+    assert [verdict["verified"] for verdict in verdicts] == [True, False, True]
+    assert verdicts[1]["reason"] == "forbidden action"
+    assert stats == {"batches": 1, "items": 3, "avg_batch_size": 3.0, "rejected": 1, "failed_batches": 0}
+
+
+def test_full_batch_is_sent_without_waiting_for_the_delay():
+    async def scenario():
+        batches = []
+        upstream = await started(verifier_transport(batches))
+        verifier = VerifierBatcher(upstream, "http://verifier", max_batch=2, max_delay=60)
+        verdicts = await asyncio.wait_for(
+            asyncio.gather(*(verifier.verify(f"open page {index}") for index in range(4))), 5
+        )
+        await upstream.close()
+        return batches, verdicts
+
+    batches, verdicts = asyncio.run(scenario())
+    assert batches == [["open page 0", "open page 1"], ["open page 2", "open page 3"]]
+    assert all(verdict["verified"] for verdict in verdicts)
+
+
+def test_failed_batch_fails_every_caller():
+    async def scenario():
+        upstream = await started(verifier_transport([], status_code=503))
+        verifier = VerifierBatcher(upstream, "http://verifier")
+        results = await asyncio.gather(
+            verifier.verify("open example.com"), verifier.verify("read my inbox"), return_exceptions=True
+        )
+        await upstream.close()
+        return results, verifier.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert all(isinstance(result, VerifierUnavailable) for result in results)
+    assert stats["failed_batches"] == 1
+
+
+@pytest.fixture
+def slow_verifier(bridge, monkeypatch):
+    """A verifier that answers after 10 ms, wired into the bridge"""
+    batches = []
+    upstream = UpstreamClient(transport=verifier_transport(batches, delay=0.01))
+    monkeypatch.setattr(bridge, "verifier", VerifierBatcher(upstream, "http://verifier"))
+    # The stand-in runner never dispatches, so don't wait for it
+    monkeypatch.setattr(bridge, "DISPATCH_WAIT_TIMEOUT", 0)
+    return upstream, batches
+
+
+def test_concurrent_identical_starts_run_once(call_bridge, slow_verifier):
+    upstream, batches = slow_verifier
+
+    async def scenario(client):
+        await upstream.start()
+        try:
+            request = {"instruction": "verify-a: open example.com"}
+            return await asyncio.gather(*(
+                client.post("/api/agents/start", headers={"X-Client-Id": "verify-a"}, json=request)
+                for _ in range(2)
+            ))
+        finally:
+            await upstream.close()
+
+    responses = call_bridge(scenario)
+    assert [response.status_code for response in responses] == [200, 200]
+    bodies = [response.json() for response in responses]
+    assert bodies[0]["task_id"] == bodies[1]["task_id"]
+    assert [bool(body.get("deduplicated")) for body in bodies].count(True) == 1
+    # Both checks went out together before either request reached the dedup lookup
+    assert batches == [["verify-a: open example.com"] * 2]
+
+
+def test_rejected_instruction_is_not_started(call_bridge, slow_verifier):
+    upstream, _ = slow_verifier
+
+    async def scenario(client):
+        await upstream.start()
+        try:
+            return await client.post("/api/agents/start", headers={"X-Client-Id": "verify-b"}, json={
+                "instruction": "verify-b: make a wire transfer",
+            })
+        finally:
+            await upstream.close()
+
+    response = call_bridge(scenario)
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Instruction rejected: forbidden action"
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import voice_routes
+
+
+@pytest.fixture
+def voice(monkeypatch):
+    """A voice-only app whose transcriptions wait for ``release`` and whose dispatches are recorded"""
+    release = threading.Event()
+    release.set()
+    started = []
+
+    async def transcribe_samples(samples, sample_rate):
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        return {"transcript": f"utterance of {len(samples)} samples", "processing_ms": 1.0}
+
+    async def start_instruction(instruction, options, client_id):
+        started.append((instruction, options))
+        return {"task_id": f"task-{len(started)}", "status": "started"}
+
+    monkeypatch.setattr(voice_routes.transcription_service, "transcribe_samples", transcribe_samples)
+    app = FastAPI()
+    app.include_router(voice_routes.router)
+    app.state.start_instruction = start_instruction
+    app.state.find_config_preset = find_config_preset
+    return TestClient(app), release, started
+
+
+PRESETS = {"c" * 64: {"agent_settings": {"llmProvider": "openai"}, "browser_settings": {}}}
+
+
+async def find_config_preset(config_ref):
+    return PRESETS.get(config_ref)
+
+
+def pcm(seconds: float, rate: int) -> bytes:
+    t = np.arange(int(seconds * rate)) / rate
+    return (0.5 * np.sin(2 * np.pi * 440 * t) * 32767).astype("<i2").tobytes()
+
+
+def test_invalid_sample_rate_is_rejected_and_the_session_stays_open(voice):
+    client, _, _ = voice
+    with client.websocket_connect("/stream") as ws:
+        for bad in (0, -16000, "fast", None):
+            ws.send_json({"type": "config", "sample_rate": bad})
+            reply = ws.receive_json()
+            assert reply["type"] == "error"
+            assert "sample_rate" in reply["detail"]
+        ws.send_json({"type": "config", "sample_rate": 48000})
+        assert ws.receive_json() == {"type": "ready", "sample_rate": 48000}
+
+
+def test_end_of_stream_flushes_the_resampler(voice):
+    client, _, _ = voice
+    with client.websocket_connect("/stream") as ws:
+        ws.send_json({"type": "config", "sample_rate": 48000, "auto_submit": False})
+        ws.receive_json()
+        ws.send_bytes(pcm(0.5, 48000))
+        ws.send_json({"type": "end"})
+        final = ws.receive_json()
+    # Every input sample comes out, including the filter's tail
+    assert final["type"] == "final"
+    assert final["audio"]["original_duration_s"] == 0.5
+
+
+def test_receive_loop_keeps_going_while_an_utterance_is_transcribed(voice):
+    client, release, started = voice
+    release.clear()
+    with client.websocket_connect("/stream") as ws:
+        ws.send_bytes(pcm(0.5, 16000))
+        ws.send_json({"type": "end"})
+        # Answered while the first utterance is still being transcribed
+        ws.send_json({"type": "config", "sample_rate": 16000, "agent_type": "browser_use"})
+        assert ws.receive_json()["type"] == "ready"
+        ws.send_bytes(pcm(0.25, 16000))
+        ws.send_json({"type": "end"})
+        release.set()
+        replies = [ws.receive_json() for _ in range(4)]
+    # Replies and dispatches keep the order the utterances were spoken in
+    assert [reply["type"] for reply in replies] == ["final", "task", "final", "task"]
+    assert [reply["task_id"] for reply in replies if reply["type"] == "task"] == ["task-1", "task-2"]
+    assert [options for _, options in started] == [{}, {"agent_type": "browser_use"}]
+
+
+def test_disconnect_cancels_pending_utterances(voice, monkeypatch):
+    client, release, started = voice
+    release.clear()
+    cancelled = threading.Event()
+    transcribe = voice_routes.transcription_service.transcribe_samples
+
+    async def tracked(samples, sample_rate):
+        try:
+            return await transcribe(samples, sample_rate)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    monkeypatch.setattr(voice_routes.transcription_service, "transcribe_samples", tracked)
+    with client.websocket_connect("/stream") as ws:
+        ws.send_bytes(pcm(0.5, 16000))
+        ws.send_json({"type": "end"})
+        ws.send_json({"type": "config"})
+        ws.receive_json()
+    assert cancelled.wait(2)
+    assert started == []
+
+
+def test_config_ref_is_checked_and_passed_to_dispatch(voice):
+    client, _, started = voice
+    with client.websocket_connect("/stream") as ws:
+        ws.send_json({"type": "config", "config_ref": "d" * 64, "priority": 5})
+        assert ws.receive_json() == {"type": "error", "status_code": 422, "detail": f"Unknown config_ref '{'d' * 64}'"}
+        ws.send_json({"type": "config", "config_ref": "c" * 64})
+        assert ws.receive_json()["type"] == "ready"
+        ws.send_bytes(pcm(0.5, 16000))
+        ws.send_json({"type": "end"})
+        assert ws.receive_json()["type"] == "final"
+        assert ws.receive_json()["type"] == "task"
+    # The rejected config left nothing behind, not even its other fields
+    assert started[0][1] == {"config_ref": "c" * 64}
+
+
+def test_voice_dispatch_expands_the_preset(call_bridge, bridge, monkeypatch):
+    # The stand-in runner never dispatches, so don't wait for it
+    monkeypatch.setattr(bridge, "DISPATCH_WAIT_TIMEOUT", 0)
+    config_ref, _, _ = bridge.preset_store.put({"llm_provider": "openai", "max_steps": 12}, {"headless": True})
+
+    async def scenario(client):
+        assert await bridge.app.state.find_config_preset(config_ref) is not None
+        assert await bridge.app.state.find_config_preset("e" * 64) is None
+        response = await bridge.app.state.start_instruction(
+            "voice-a: open my inbox", {"config_ref": config_ref, "agent_settings": {"maxSteps": 3}}, "voice-a"
+        )
+        return bridge.task_manager.find(response["task_id"])
+
+    task = call_bridge(scenario)
+    assert task.interactive
+    assert task.agent_settings["maxSteps"] == 3
+    assert task.browser_settings["headless"] is True
@@ -77,6 +77,47 @@ export const WebUIManager = ({ children }) => {
     setBrowserSettings(prev => ({ ...prev, ...updates }));
   }, []);
 
+  // Apply a task status update to the chat; returns true once the task has finished
+  const applyTaskUpdate = useCallback((taskData) => {
+    // Update chat with progress
+    if (taskData.progress && taskData.progress !== 'Task queued for execution') {
+      setChatHistory(prev => {
+        const lastMessage = prev[prev.length - 1];
+        if (lastMessage && lastMessage.role === 'assistant' && lastMessage.content.includes('processing')) {
+          return [...prev.slice(0, -1), {
+            ...lastMessage,
+            content: `${lastMessage.content}\n\n📊 Status: ${taskData.progress}`
+          }];
+        }
+        return prev;
+      });
+    }
+    
+    // Check if task is completed
+    if (taskData.status === 'completed') {
+      setChatHistory(prev => [...prev, {
+        role: 'assistant',
+        content: `✅ Task completed successfully!\n\nResult: ${taskData.result?.message || 'Browser automation completed'}`,
+        timestamp: new Date(),
+      }]);
+      setIsRunning(false);
+      return true;
+    }
+    
+    // Check if task failed
+    if (taskData.status === 'error' || taskData.status === 'cancelled') {
+      setChatHistory(prev => [...prev, {
+        role: 'assistant',
+        content: `❌ Task failed: ${taskData.error || 'Unknown error occurred'}`,
+        timestamp: new Date(),
+      }]);
+      setIsRunning(false);
+      return true;
+    }
+    
+    return false;
+  }, []);
+
   // Poll task status from the direct API server
   const pollTaskStatus = useCallback(async (taskId, pollingUrl) => {
     const maxAttempts = 30; // Poll for up to 5 minutes (10s intervals)
@@ -92,44 +133,12 @@ export const WebUIManager = ({ children }) => {
         
         console.log('Task status:', taskData);
         
-        // Update chat with progress
-        if (taskData.progress && taskData.progress !== 'Task queued for execution') {
-          setChatHistory(prev => {
-            const lastMessage = prev[prev.length - 1];
-            if (lastMessage && lastMessage.role === 'assistant' && lastMessage.content.includes('processing')) {
-              return [...prev.slice(0, -1), {
-                ...lastMessage,
-                content: `${lastMessage.content}\n\n📊 Status: ${taskData.progress}`
-              }];
-            }
-            return prev;
-          });
-        }
-        
-        // Check if task is completed
-        if (taskData.status === 'completed') {
-          setChatHistory(prev => [...prev, {
-            role: 'assistant',
-            content: `✅ Task completed successfully!\n\nResult: ${taskData.result?.message || 'Browser automation completed'}`,
-            timestamp: new Date(),
-          }]);
-          setIsRunning(false);
-          return;
-        }
-        
-        // Check if task failed
-        if (taskData.status === 'error') {
-          setChatHistory(prev => [...prev, {
-            role: 'assistant',
-            content: `❌ Task failed: ${taskData.error || 'Unknown error occurred'}`,
-            timestamp: new Date(),
-          }]);
-          setIsRunning(false);
+        if (applyTaskUpdate(taskData)) {
           return;
         }
         
         // Continue polling if task is still running
-        if (taskData.status === 'running' || taskData.status === 'initializing' || taskData.status === 'configuring' || taskData.status === 'starting_browser') {
+        if (taskData.status === 'running' || taskData.status === 'queued' || taskData.status === 'paused' || taskData.status === 'initializing' || taskData.status === 'configuring' || taskData.status === 'starting_browser') {
           if (attempts < maxAttempts) {
             setTimeout(poll, 10000); // Poll every 10 seconds
           } else {
@@ -159,7 +168,29 @@ export const WebUIManager = ({ children }) => {
     
     // Start polling after a short delay
     setTimeout(poll, 2000);
-  }, []);
+  }, [applyTaskUpdate]);
+
+  // Follow task status over the server's WebSocket push, falling back to polling
+  const watchTaskStatus = useCallback((taskId, pollingUrl) => {
+    let finished = false;
+    const socket = new WebSocket(`${PYTHON_SERVER_URL.replace(/^http/, 'ws')}/ws/agent/${taskId}`);
+    
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      console.log('Task update:', message);
+      if (applyTaskUpdate(message.content)) {
+        finished = true;
+        socket.close();
+      }
+    };
+    
+    socket.onclose = () => {
+      if (!finished) {
+        console.warn('Task stream closed early, falling back to polling');
+        pollTaskStatus(taskId, pollingUrl);
+      }
+    };
+  }, [applyTaskUpdate, pollTaskStatus]);
 
   // Start agent execution
   const startAgent = useCallback(async (instruction) => {
@@ -201,7 +232,7 @@ export const WebUIManager = ({ children }) => {
       });
 
       if (response.data.status === 'started') {
-        setCurrentTask(prev => ({ ...prev, status: 'running' }));
+        setCurrentTask(prev => ({ ...prev, status: 'running', taskId: response.data.task_id }));
         
         // Add agent response to chat
         let responseMessage = `Agent started successfully! Task ID: ${response.data.task_id}.`;
@@ -228,7 +259,7 @@ export const WebUIManager = ({ children }) => {
         if (response.data.execution_status === 'processing') {
           // Start polling for task status if we have a polling URL
           if (response.data.polling_url) {
-            pollTaskStatus(response.data.task_id, response.data.polling_url);
+            watchTaskStatus(response.data.task_id, response.data.polling_url);
           } else {
             // Fallback to simulated progress
             setTimeout(() => {
@@ -270,19 +301,34 @@ export const WebUIManager = ({ children }) => {
         timestamp: new Date(),
       }]);
     }
-  }, [agentSettings, browserSettings, PYTHON_SERVER_URL]);
+  }, [agentSettings, browserSettings, PYTHON_SERVER_URL, watchTaskStatus]);
 
   // Stop agent execution
-  const stopAgent = useCallback(() => {
+  const stopAgent = useCallback(async () => {
+    if (currentTask?.taskId) {
+      try {
+        await axios.post(`${PYTHON_SERVER_URL}/api/agents/${currentTask.taskId}/stop`);
+      } catch (error) {
+        console.error('Error stopping agent:', error);
+      }
+    }
     setIsRunning(false);
     setIsPaused(false);
     setCurrentTask(null);
-  }, []);
+  }, [currentTask, PYTHON_SERVER_URL]);
 
   // Pause/Resume agent
-  const togglePause = useCallback(() => {
+  const togglePause = useCallback(async () => {
+    if (currentTask?.taskId) {
+      try {
+        await axios.post(`${PYTHON_SERVER_URL}/api/agents/${currentTask.taskId}/${isPaused ? 'resume' : 'pause'}`);
+      } catch (error) {
+        console.error('Error toggling pause:', error);
+        return;
+      }
+    }
     setIsPaused(prev => !prev);
-  }, []);
+  }, [currentTask, isPaused, PYTHON_SERVER_URL]);
 
   // Clear chat history
   const clearChat = useCallback(() => {